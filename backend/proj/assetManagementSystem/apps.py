@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AssetmanagementsystemConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'assetManagementSystem'
+
+    def ready(self):
+        from . import authentication, events, outbox, sync  # noqa: F401
@@ -0,0 +1,168 @@
+"""
+Async versions of the high-concurrency read endpoints, mounted under
+``async/``. The sync DRF views in views.py stay the reference implementation.
+
+Single-row lookups and the audit scan use Django's async ORM. Listings, the
+dashboard and analytics reuse the payload builders of the sync views through
+sync_to_async, so both return the same bytes; sync_to_async keeps one
+request's database work on one thread and connection.
+
+None of this frees a thread while the database works: Django has no async
+database driver, so the async ORM also runs each query on a worker thread.
+What the event loop saves is the thread for everything else, chiefly idle
+and slow clients.
+"""
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
+
+from .authentication import authenticate_request
+from .models import Asset, AuditSession
+from .routers import reads_from_replica
+from .serializers import AssetSerializer
+from .views import (
+    asset_metrics, asset_rows, asset_status_counts, asset_value_trend, category_distribution, dashboard_summary,
+    depreciation_summary, is_auditor, is_branch_user, ownership_changes, scoped_assets, search_assets,
+    utilization_rate
+)
+
+
+def api_response(data, status_code=status.HTTP_200_OK):
+    # Same bytes as DRF's JSONRenderer: compact separators, no ASCII escaping.
+    return JsonResponse(
+        data, status=status_code, safe=False, encoder=JSONEncoder,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')},
+    )
+
+
+def authenticated(permission=None):
+    """
+    Bearer-token authentication for async views, with an optional
+    ``permission(user)`` check. Sets ``request.user`` for the middleware and
+    @reads_from_replica, which must come below this decorator.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            user = await sync_to_async(authenticate_request)(request)
+            if user is None or not user.is_active:
+                return api_response({'error': 'Authentication credentials were not provided'}, status.HTTP_401_UNAUTHORIZED)
+            if permission is not None and not permission(user):
+                return api_response({'error': 'You do not have permission to perform this action'}, status.HTTP_403_FORBIDDEN)
+            request.user = user
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def is_admin(user):
+    return user.is_staff
+
+
+async def serialize_assets(assets, many=False):
+    return await sync_to_async(lambda: AssetSerializer(assets, many=many).data)()
+
+
+# Dashboard
+@require_GET
+@authenticated()
+async def dashboard(request):
+    return api_response(await sync_to_async(dashboard_summary)(scoped_assets(request.user)))
+
+
+# Assets
+@require_GET
+@authenticated(is_branch_user)
+async def asset_list(request):
+    assets = search_assets(scoped_assets(request.user), request.GET)
+    return api_response(await sync_to_async(asset_rows)(assets))
+
+
+@require_GET
+@authenticated(is_admin)
+async def asset_detail(request, asset_id):
+    try:
+        asset = await Asset.objects.select_related('assigned_to').aget(id=asset_id)
+    except Asset.DoesNotExist:
+        return api_response({'error': 'Asset not found'}, status.HTTP_404_NOT_FOUND)
+    return api_response(await serialize_assets(asset))
+
+
+# Audit
+@csrf_exempt
+@require_POST
+@authenticated(is_auditor)
+async def audit_scan(request):
+    try:
+        payload = json.loads(request.body) if request.content_type == 'application/json' else request.POST
+    except ValueError:
+        return api_response({'error': 'Malformed JSON'}, status.HTTP_400_BAD_REQUEST)
+    # The session is shared with the sync views; its async API loads it without blocking the loop.
+    audit_session_id = await request.session.aget('audit_session_id')
+    try:
+        asset = await Asset.objects.select_related('assigned_to').aget(qr_code_identifier=payload.get('qr_code'))
+        if is_auditor(request.user) and request.user.branch_id and asset.branch_id != request.user.branch_id:
+            return api_response({'error': 'Asset not in your branch'}, status.HTTP_403_FORBIDDEN)
+        audit_session = await AuditSession.objects.aget(id=audit_session_id)
+    except Asset.DoesNotExist:
+        return api_response({'error': 'Asset not found'}, status.HTTP_404_NOT_FOUND)
+    except AuditSession.DoesNotExist:
+        return api_response({'error': 'No active audit session'}, status.HTTP_400_BAD_REQUEST)
+    await audit_session.scanned_assets.aadd(asset)
+    return api_response({'asset': await serialize_assets(asset)})
+
+
+# Analytics
+@require_GET
+@authenticated()
+@reads_from_replica
+async def analytics_asset_status(request):
+    return api_response(await sync_to_async(asset_status_counts)(scoped_assets(request.user, request.GET.get('category', 'all'))))
+
+
+@require_GET
+@authenticated()
+@reads_from_replica
+async def analytics_ownership_changes(request):
+    return api_response(await sync_to_async(ownership_changes)(scoped_assets(request.user, request.GET.get('category', 'all'))))
+
+
+@require_GET
+@authenticated()
+@reads_from_replica
+async def analytics_asset_value_trend(request):
+    return api_response(await sync_to_async(asset_value_trend)(scoped_assets(request.user)))
+
+
+@require_GET
+@authenticated()
+@reads_from_replica
+async def analytics_category_distribution(request):
+    return api_response(await sync_to_async(category_distribution)(scoped_assets(request.user)))
+
+
+@require_GET
+@authenticated()
+@reads_from_replica
+async def analytics_utilization_rate(request):
+    return api_response(await sync_to_async(utilization_rate)(scoped_assets(request.user)))
+
+
+@require_GET
+@authenticated()
+@reads_from_replica
+async def analytics_depreciation(request):
+    return api_response(await sync_to_async(depreciation_summary)(scoped_assets(request.user)))
+
+
+@require_GET
+@authenticated()
+@reads_from_replica
+async def analytics_metrics(request):
+    return api_response(await sync_to_async(asset_metrics)(scoped_assets(request.user)))
@@ -0,0 +1,121 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from rest_framework import exceptions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import CustomUser
+
+CLAIM_FIELDS = ['username', 'user_type', 'branch_id', 'is_superuser', 'is_staff']
+TOKEN_VERSION_CLAIM = 'ver'
+# Longest a revocation can take to reach other workers (see CACHES in settings).
+TOKEN_VERSION_CACHE_SECONDS = 60
+
+
+def issue_tokens(user):
+    refresh = RefreshToken.for_user(user)
+    for field in CLAIM_FIELDS:
+        refresh[field] = getattr(user, field)
+    refresh[TOKEN_VERSION_CLAIM] = user.token_version
+    return refresh
+
+
+def _token_version_key(user_id):
+    return f"auth:token_version:{user_id}"
+
+
+def current_token_version(user_id):
+    key = _token_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = CustomUser.objects.filter(pk=user_id, is_active=True).values_list('token_version', flat=True).first()
+        # Deleted or deactivated users never match a token version.
+        version = -1 if version is None else version
+        cache.set(key, version, TOKEN_VERSION_CACHE_SECONDS)
+    return version
+
+
+def _forget_token_version(user_id):
+    # After commit, so a concurrent request cannot cache the old version again.
+    transaction.on_commit(lambda: cache.delete(_token_version_key(user_id)))
+
+
+def revoke_tokens(user):
+    CustomUser.objects.filter(pk=user.pk).update(token_version=F('token_version') + 1)
+    _forget_token_version(user.pk)
+
+
+@receiver(pre_save, sender=CustomUser)
+def revoke_on_claim_change(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Outstanding tokens carry the old claims, so any change to them revokes the tokens."""
+    if raw or instance.pk is None or instance._state.adding:
+        return
+    fields = CLAIM_FIELDS + ['is_active']
+    stored = CustomUser.objects.filter(pk=instance.pk).values('token_version', *fields).first()
+    if stored is None:
+        return
+    if update_fields is None or 'token_version' in update_fields:
+        # Never write back a version older than the stored one, e.g. from a stale instance.
+        instance.token_version = max(instance.token_version, stored['token_version'])
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields or field.removesuffix('_id') in update_fields]
+    if all(stored[field] == getattr(instance, field) for field in fields):
+        return
+    if update_fields is None or 'token_version' in update_fields:
+        instance.token_version += 1
+        _forget_token_version(instance.pk)
+    else:
+        revoke_tokens(instance)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Builds ``request.user`` from the token's claims instead of loading the
+    CustomUser row. The only per-request lookup is the (cached) token version,
+    which is bumped to revoke every outstanding token of a user.
+
+    The returned user is not a full row: views that need other fields or want
+    to save the user must fetch it from the database.
+    """
+
+    def get_user(self, validated_token):
+        if 'user_type' not in validated_token:
+            # Tokens issued before claims were added.
+            return super().get_user(validated_token)
+
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        if validated_token.get(TOKEN_VERSION_CLAIM, 0) != current_token_version(user_id):
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+
+        user = CustomUser(id=user_id, is_active=True, **{field: validated_token[field] for field in CLAIM_FIELDS})
+        user._state.adding = False
+        user._state.db = 'default'
+        return user
+
+
+def authenticate_request(request, query_param=None):
+    """
+    Authenticate a plain Django request (views outside DRF) with a bearer token,
+    or with the ``query_param`` query parameter when given. Returns None when
+    the token is missing or invalid. Reads the token version, so async views
+    must call it through sync_to_async.
+    """
+    authenticator = ClaimsJWTAuthentication()
+    raw_token = None
+    header = authenticator.get_header(request)
+    if header is not None:
+        raw_token = authenticator.get_raw_token(header)
+    if raw_token is None and query_param:
+        raw_token = request.GET.get(query_param)
+    if not raw_token:
+        return None
+    try:
+        validated_token = authenticator.get_validated_token(raw_token)
+        return authenticator.get_user(validated_token)
+    except (TokenError, exceptions.AuthenticationFailed):
+        return None
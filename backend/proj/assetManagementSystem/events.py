@@ -0,0 +1,211 @@
+import asyncio
+import contextvars
+import json
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
+
+from .authentication import authenticate_request
+from .models import Asset, AuditSession, Branch, Compliance
+from .signals import assets_bulk_changed
+from .views import dashboard_summary, is_auditor, is_branch_user
+
+ALL_BRANCHES = 'all'
+HEARTBEAT_SECONDS = 15
+COALESCE_SECONDS = 0.5
+# Fallback refresh so changes written by other worker processes still reach subscribers.
+REFRESH_SECONDS = 30
+QUEUE_SIZE = 16
+
+
+def audit_progress(branch_id=None):
+    total = Asset.objects.all()
+    scanned_filter = Q()
+    if branch_id:
+        total = total.filter(branch_id=branch_id)
+        scanned_filter = Q(scanned_assets__branch_id=branch_id)
+    total = total.count()
+    sessions = AuditSession.objects.filter(end_time__isnull=True).annotate(
+        scanned=Count('scanned_assets', filter=scanned_filter)
+    ).order_by('start_time')
+    return [
+        {
+            'session_id': session.id,
+            'start_time': session.start_time,
+            'scanned': session.scanned,
+            'total': total,
+        }
+        for session in sessions
+    ]
+
+
+def build_snapshot(scope):
+    # Runs outside the request cycle, so connection upkeep is done here.
+    close_old_connections()
+    branch_id = None if scope == ALL_BRANCHES else scope
+    assets = Asset.objects.all()
+    if branch_id:
+        assets = assets.filter(branch_id=branch_id)
+    snapshot = dashboard_summary(assets)
+    snapshot['audit_progress'] = audit_progress(branch_id)
+    # Round-trip through the encoder so deltas compare plain JSON values.
+    return json.loads(json.dumps(snapshot, cls=JSONEncoder))
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, cls=JSONEncoder)}\n\n"
+
+
+def visible(data, audit):
+    # audit_progress is only sent to users who may use the audit endpoints.
+    return data if audit else {key: value for key, value in data.items() if key != 'audit_progress'}
+
+
+class DashboardBroker:
+    """
+    Holds SSE subscribers per branch scope and pushes dashboard deltas to them.
+
+    Model signals only mark a scope as dirty; the snapshot is rebuilt once per
+    scope (coalesced) and fanned out to every subscriber, so database load does
+    not grow with the number of open screens. Subscribers map their queue to
+    whether they may see audit progress.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._subscribers = defaultdict(dict)
+        self._snapshots = {}
+        self._pending = set()
+        self._tickers = {}
+
+    def notify(self, scopes=None):
+        # Called from sync code (signal handlers running in worker threads);
+        # scopes=None refreshes every subscribed scope.
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        # A fresh context keeps the caller's sync_to_async state out of the refresh task.
+        loop.call_soon_threadsafe(self._schedule, scopes, context=contextvars.Context())
+
+    def _schedule(self, scopes):
+        if scopes is None:
+            scopes = list(self._subscribers)
+        for scope in set(scopes):
+            if self._subscribers.get(scope) and scope not in self._pending:
+                self._pending.add(scope)
+                self._loop.create_task(self._refresh(scope))
+
+    async def _refresh(self, scope):
+        await asyncio.sleep(COALESCE_SECONDS)
+        self._pending.discard(scope)
+        if not self._subscribers.get(scope):
+            return
+        snapshot = await sync_to_async(build_snapshot)(scope)
+        previous = self._snapshots.get(scope, {})
+        self._snapshots[scope] = snapshot
+        delta = {key: value for key, value in snapshot.items() if previous.get(key) != value}
+        messages = {}
+        for audit in (True, False):
+            data = visible(delta, audit)
+            if data:
+                messages[audit] = format_event('delta', data)
+        for queue, audit in list(self._subscribers.get(scope, {}).items()):
+            if audit not in messages:
+                continue
+            try:
+                queue.put_nowait(messages[audit])
+            except asyncio.QueueFull:
+                # A slow client missed deltas; replace its backlog with the full state.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(format_event('snapshot', visible(snapshot, audit)))
+
+    async def _tick(self, scope):
+        while self._subscribers.get(scope):
+            await asyncio.sleep(REFRESH_SECONDS)
+            self._schedule({scope})
+
+    async def stream(self, scope, audit=False):
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers[scope][queue] = audit
+        if scope not in self._tickers or self._tickers[scope].done():
+            self._tickers[scope] = self._loop.create_task(self._tick(scope))
+        try:
+            snapshot = self._snapshots.get(scope)
+            if snapshot is None:
+                snapshot = await sync_to_async(build_snapshot)(scope)
+                self._snapshots[scope] = snapshot
+            yield format_event('snapshot', visible(snapshot, audit))
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+        finally:
+            subscribers = self._subscribers.get(scope)
+            if subscribers is not None:
+                subscribers.pop(queue, None)
+                if not subscribers:
+                    del self._subscribers[scope]
+                    self._snapshots.pop(scope, None)
+
+
+broker = DashboardBroker()
+
+
+async def dashboard_stream(request):
+    # EventSource cannot set headers, so the access token may come as ?token=.
+    user = await sync_to_async(authenticate_request)(request, query_param='token')
+    if user is None or not user.is_active:
+        return JsonResponse({'error': 'Authentication credentials were not provided'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    if is_branch_user(user) and user.branch_id:
+        scope = str(user.branch_id)
+    else:
+        scope = request.GET.get('branch') or ALL_BRANCHES
+        if scope != ALL_BRANCHES:
+            try:
+                exists = await Branch.objects.filter(id=scope).aexists()
+            except (ValueError, ValidationError):
+                exists = False
+            if not exists:
+                return JsonResponse({'error': 'Branch not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    response = StreamingHttpResponse(broker.stream(scope, is_auditor(user)), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# Change notifications
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+def asset_changed(sender, instance, **kwargs):
+    scopes = [ALL_BRANCHES, str(instance.branch_id)]
+    previous_branch_id = getattr(instance, '_previous_branch_id', None)
+    if previous_branch_id is not None:
+        scopes.append(str(previous_branch_id))
+    transaction.on_commit(lambda: broker.notify(scopes))
+
+
+@receiver(assets_bulk_changed)
+def assets_bulk_updated(sender, branch_ids, **kwargs):
+    broker.notify([ALL_BRANCHES, *(str(branch_id) for branch_id in branch_ids)])
+
+
+@receiver(post_save, sender=Compliance)
+@receiver(post_delete, sender=Compliance)
+@receiver(post_save, sender=AuditSession)
+@receiver(post_delete, sender=AuditSession)
+@receiver(m2m_changed, sender=AuditSession.scanned_assets.through)
+def summary_changed(sender, **kwargs):
+    transaction.on_commit(broker.notify)
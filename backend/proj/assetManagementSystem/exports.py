@@ -0,0 +1,26 @@
+"""
+Tabular exports built with pandas. Like reports.py, import this module inside
+the views that use it so that pandas only loads on the first export.
+"""
+import pandas as pd
+
+
+def asset_export_rows(assets):
+    return [
+        {
+            'serial_number': asset.asset_serial_number,
+            'description': asset.description,
+            'branch': asset.branch.name if asset.branch else 'N/A',
+            'category': asset.category.name if asset.category else 'N/A',
+            'status': asset.status,
+            'condition': asset.condition,
+            'current_value': str(asset.current_value),
+            'purchase_date': asset.purchase_date,
+            'vendor': asset.vendor,
+        }
+        for asset in assets
+    ]
+
+
+def write_assets_csv(assets, out):
+    pd.DataFrame(asset_export_rows(assets)).to_csv(out, index=False)
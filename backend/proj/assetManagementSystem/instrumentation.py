@@ -0,0 +1,89 @@
+import contextvars
+import re
+import time
+from collections import Counter, defaultdict
+
+IN_LIST_RE = re.compile(r'\((?:%s, )+%s\)')
+WHITESPACE_RE = re.compile(r'\s+')
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+def fingerprint(sql):
+    # Parameters are passed separately, so only IN lists vary between executions of the same query.
+    return WHITESPACE_RE.sub(' ', IN_LIST_RE.sub('(...)', sql)).strip()
+
+
+class RequestMetrics:
+    """Timings collected for one request and reported as Server-Timing entries."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.fingerprints = Counter()
+        self.fingerprint_time = defaultdict(float)
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self._serializing = False
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            key = fingerprint(sql)
+            self.query_count += 1
+            self.db_time += elapsed
+            self.fingerprints[key] += 1
+            self.fingerprint_time[key] += elapsed
+
+    def repeated_queries(self, limit=5):
+        return [
+            {'sql': sql, 'count': count, 'ms': round(self.fingerprint_time[sql] * 1000, 2)}
+            for sql, count in self.fingerprints.most_common(limit)
+            if count > 1
+        ]
+
+    def server_timing(self, total):
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.query_count} queries"',
+            f'serialize;dur={self.serialize_time * 1000:.1f}',
+            f'render;dur={self.render_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+
+def current_metrics():
+    return _current.get()
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+class TimedRepresentationMixin:
+    """
+    Adds the time spent in the outermost ``to_representation`` call to the
+    request's serialize metric. Queries run lazily while serializing (N+1s)
+    are counted as DB time, not serialization time.
+    """
+
+    def to_representation(self, instance):
+        metrics = _current.get()
+        if metrics is None or metrics._serializing:
+            return super().to_representation(instance)
+        metrics._serializing = True
+        db_time = metrics.db_time
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serialize_time += time.perf_counter() - start - (metrics.db_time - db_time)
+            metrics._serializing = False
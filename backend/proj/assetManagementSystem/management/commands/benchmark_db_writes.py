@@ -0,0 +1,120 @@
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+
+from assetManagementSystem.models import Asset, AssetHistory, Branch, Category, CustomUser
+
+
+def _close_connections():
+    connections.close_all()
+    for conn in connections.all():
+        # psycopg pools hold threads and sockets that must not cross a fork.
+        if hasattr(conn, 'close_pool'):
+            conn.close_pool()
+
+
+def _run_worker(args):
+    asset_ids, user_ids, seconds, seed = args
+    rng = random.Random(seed)
+    committed = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        asset_id = rng.choice(asset_ids)
+        user_id = rng.choice(user_ids)
+        try:
+            # One assignment: the same write shape as a scan or an edit.
+            with transaction.atomic():
+                AssetHistory.objects.create(asset_id=asset_id, user_id=user_id)
+                Asset.objects.filter(id=asset_id).update(assigned_to_id=user_id)
+            committed += 1
+        except OperationalError:
+            errors += 1
+    _close_connections()
+    return committed, errors
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure write throughput of the configured database profile as the number of "
+        "concurrent worker processes grows. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', default='1,2,4,8', help='Comma separated worker counts to run.')
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each run.')
+        parser.add_argument('--assets', type=int, default=1000, help='Assets to seed.')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        try:
+            worker_counts = [int(count) for count in options['workers'].split(',')]
+        except ValueError:
+            raise CommandError('--workers must be a comma separated list of integers')
+        seconds = options['seconds']
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            if connection.vendor == 'sqlite':
+                # Worker processes need a shared on-disk file, not the in-memory test default.
+                connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(tmp_dir, 'benchmark.sqlite3')
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                asset_ids, user_ids = self._seed(options['assets'])
+                results = []
+                baseline = None
+                for workers in worker_counts:
+                    _close_connections()
+                    with multiprocessing.get_context('fork').Pool(workers) as pool:
+                        outcomes = pool.map(_run_worker, [(asset_ids, user_ids, seconds, seed) for seed in range(workers)])
+                    committed = sum(outcome[0] for outcome in outcomes)
+                    throughput = committed / seconds
+                    baseline = baseline or throughput
+                    results.append({
+                        'workers': workers,
+                        'transactions': committed,
+                        'errors': sum(outcome[1] for outcome in outcomes),
+                        'tps': round(throughput, 1),
+                        'speedup': round(throughput / baseline, 2) if baseline else 0,
+                    })
+            finally:
+                _close_connections()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        profile = {
+            'vendor': connection.vendor,
+            'options': {key: str(value) for key, value in connection.settings_dict.get('OPTIONS', {}).items()},
+            'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+        }
+        if options['json']:
+            self.stdout.write(json.dumps({'profile': profile, 'seconds': seconds, 'results': results}, indent=2))
+            return
+        self.stdout.write(f"{profile['vendor']} {profile['options'] or '(default options)'}")
+        self.stdout.write(f"{'workers':>8} {'txn':>8} {'txn/s':>10} {'errors':>8} {'speedup':>8}")
+        for row in results:
+            self.stdout.write(
+                f"{row['workers']:>8} {row['transactions']:>8} {row['tps']:>10} {row['errors']:>8} {row['speedup']:>8}"
+            )
+
+    def _seed(self, asset_count):
+        branch = Branch.objects.create(name='Main Branch', code='BENCH')
+        category = Category.objects.create(name='Electronics', code='BENCH')
+        users = CustomUser.objects.bulk_create(
+            [CustomUser(username=f'benchmark-{index}') for index in range(20)]
+        )
+        # bulk_create bypasses Asset.save(), so no QR images are rendered for seed data.
+        assets = Asset.objects.bulk_create([
+            Asset(
+                branch=branch,
+                category=category,
+                asset_serial_number=f'BENCH-BENCH-{index:06d}',
+                qr_code_identifier=str(uuid.uuid4()),
+            )
+            for index in range(asset_count)
+        ], batch_size=1000)
+        return [asset.id for asset in assets], [user.id for user in users]
@@ -0,0 +1,221 @@
+import json
+import re
+import subprocess
+import time
+import tracemalloc
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from assetManagementSystem.authentication import issue_tokens
+from assetManagementSystem.models import (
+    Asset, AssetHistory, Attachment, AttachmentUpload, AuditSession, Branch, Category, Compliance, CustomUser
+)
+from assetManagementSystem.urls import urlpatterns
+
+PARAM_RE = re.compile(r'<(?:(\w+):)?(\w+)>')
+SKIPPED = {
+    'dashboard_stream': 'server-sent event stream does not end',
+}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[round(fraction * (len(ordered) - 1))]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "GET every URL in assetManagementSystem/urls.py against the configured database and "
+        "report latency, query count and peak Python memory per endpoint as JSON. "
+        "Use --compare to check the results against an earlier run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=10, help='Timed requests per endpoint.')
+        parser.add_argument('--warmup', type=int, default=1, help='Untimed requests per endpoint.')
+        parser.add_argument('--username', help='User to authenticate as (default: first active superuser).')
+        parser.add_argument('--only', help='Comma separated URL names to run.')
+        parser.add_argument('--label', help='Run label stored in the results (default: git commit).')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout.')
+        parser.add_argument('--compare', help='Earlier results file to compare against.')
+        parser.add_argument('--threshold', type=float, default=1.25,
+                            help='p50 latency ratio above which --compare reports a regression.')
+
+    def handle(self, *args, **options):
+        user = self._user(options['username'])
+        samples = self._samples()
+        only = set(options['only'].split(',')) if options['only'] else None
+
+        # Server errors are recorded as a 500 result rather than aborting the run.
+        client = Client(raise_request_exception=False)
+        results = []
+        with override_settings(ROOT_URLCONF='assetManagementSystem.urls', ALLOWED_HOSTS=['testserver']):
+            for pattern in urlpatterns:
+                if only and pattern.name not in only:
+                    continue
+                path = '/' + PARAM_RE.sub(lambda match: self._fill(match, samples), str(pattern.pattern))
+                result = {'name': pattern.name, 'method': 'GET', 'path': path}
+                if pattern.name in SKIPPED:
+                    result['skipped'] = SKIPPED[pattern.name]
+                else:
+                    result.update(self._measure(client, user, path, options['iterations'], options['warmup']))
+                results.append(result)
+                self.stderr.write(self._summary(result))
+
+        report = {
+            'label': options['label'] or self._git_commit(),
+            'created': timezone.now().isoformat(),
+            'database': {'vendor': connection.vendor, 'debug': settings.DEBUG},
+            'dataset': {
+                model._meta.model_name: model.objects.count()
+                for model in [Branch, Category, CustomUser, Asset, AssetHistory, AuditSession, Compliance]
+            },
+            'iterations': options['iterations'],
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            self._compare(options['compare'], report, options['threshold'])
+
+    def _user(self, username):
+        users = CustomUser.objects.filter(is_active=True)
+        user = users.filter(username=username).first() if username else users.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError('No user to authenticate as; run generate_dataset or pass --username')
+        return user
+
+    def _samples(self):
+        # The busiest rows make the heaviest (and most telling) requests.
+        asset = Asset.objects.annotate(changes=Count('history')).order_by('-changes').first()
+        holder = CustomUser.objects.annotate(held=Count('assigned_assets')).order_by('-held').first()
+        branch = Branch.objects.annotate(total=Count('assets')).order_by('-total').first()
+        compliance = Compliance.objects.annotate(total=Count('assets')).order_by('-total').first()
+        media = Asset.objects.exclude(qr_code='').values_list('qr_code', flat=True).first()
+        return {
+            'asset_id': asset and asset.id,
+            'user_id': holder and holder.id,
+            'branch_id': branch and branch.id,
+            'category_id': Category.objects.values_list('id', flat=True).first(),
+            'compliance_id': compliance and compliance.id,
+            'assignment_id': AssetHistory.objects.values_list('id', flat=True).last(),
+            'attachment_id': Attachment.objects.values_list('id', flat=True).first(),
+            'upload_id': AttachmentUpload.objects.values_list('id', flat=True).first(),
+            'path': media or 'missing.png',
+        }
+
+    def _fill(self, match, samples):
+        converter, name = match.groups()
+        value = samples.get(name)
+        if converter == 'uuid' and not isinstance(value, uuid.UUID):
+            # Routes declared with a uuid converter cannot carry integer keys.
+            value = uuid.uuid4()
+        return str(value if value is not None else 0)
+
+    def _measure(self, client, user, path, iterations, warmup):
+        counter = QueryCounter()
+
+        def request():
+            # A fresh token per request: slow endpoints can outlive an access token's lifetime.
+            authorization = f'Bearer {issue_tokens(user).access_token}'
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(counter))
+                response = client.get(path, HTTP_AUTHORIZATION=authorization)
+                size = 0
+                if response.streaming:
+                    for chunk in response.streaming_content:
+                        size += len(chunk)
+                else:
+                    size = len(response.content)
+                response.close()
+            return response, size
+
+        for _ in range(warmup):
+            request()
+        timings = []
+        for _ in range(max(iterations, 1)):
+            counter.count = 0
+            start = time.perf_counter()
+            response, size = request()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        tracemalloc.start()
+        try:
+            request()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'status': response.status_code,
+            'bytes': size,
+            'queries': counter.count,
+            'p50_ms': round(percentile(timings, 0.5), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'mean_ms': round(sum(timings) / len(timings), 2),
+            'min_ms': round(min(timings), 2),
+            'peak_memory_kib': round(peak / 1024, 1),
+        }
+
+    def _summary(self, result):
+        if 'skipped' in result:
+            return f"{result['name']:<36} skipped: {result['skipped']}"
+        return (
+            f"{result['name']:<36} {result['status']:>4} {result['p50_ms']:>9.1f}ms p50 "
+            f"{result['p95_ms']:>9.1f}ms p95 {result['queries']:>6} queries {result['peak_memory_kib']:>10.0f} KiB"
+        )
+
+    def _git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ''
+
+    def _compare(self, baseline_path, report, threshold):
+        with open(baseline_path) as fh:
+            baseline = {result['name']: result for result in json.load(fh)['results'] if 'p50_ms' in result}
+        regressions = []
+        for result in report['results']:
+            before = baseline.get(result['name'])
+            if before is None or 'p50_ms' not in result:
+                continue
+            ratio = result['p50_ms'] / before['p50_ms'] if before['p50_ms'] else 1.0
+            problems = []
+            if ratio > threshold:
+                problems.append(f"p50 {before['p50_ms']}ms -> {result['p50_ms']}ms (x{ratio:.2f})")
+            if result['queries'] > before['queries']:
+                problems.append(f"queries {before['queries']} -> {result['queries']}")
+            if result['status'] != before['status']:
+                problems.append(f"status {before['status']} -> {result['status']}")
+            if problems:
+                regressions.append(f"{result['name']}: {', '.join(problems)}")
+        for line in regressions:
+            self.stderr.write(self.style.ERROR(line))
+        if regressions:
+            raise CommandError(f"{len(regressions)} endpoint(s) regressed against {baseline_path}")
+        self.stderr.write(self.style.SUCCESS(f"No regressions against {baseline_path}"))
@@ -0,0 +1,179 @@
+import datetime
+import hashlib
+import io
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from assetManagementSystem.models import Asset, AuditSession, Branch, Compliance
+
+MANIFEST = 'manifest.json'
+
+
+def write_file(directory, name, data):
+    """Write ``name`` via a temporary file so a crash never leaves a partial report."""
+    path = os.path.join(directory, name)
+    with open(path + '.tmp', 'wb') as out:
+        out.write(data)
+    os.replace(path + '.tmp', path)
+    return {'name': name, 'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+
+
+def render_branch(job):
+    """
+    Runs in a worker process. ``job`` holds everything the reports need, so
+    workers never query the database.
+    """
+    from assetManagementSystem.exports import write_assets_csv
+    from assetManagementSystem.reports import asset_row, audit_report_pdf, compliance_report_pdf
+
+    directory, assets = job['directory'], job['assets']
+    os.makedirs(directory, exist_ok=True)
+    files, skipped = [], []
+
+    export = io.StringIO()
+    write_assets_csv(assets, export)
+    files.append(write_file(directory, 'assets.csv', export.getvalue().encode()))
+
+    if job['audit_session'] is None:
+        skipped.append('audit_summary.pdf: no audit session in the period scanned this branch')
+    else:
+        scanned = [asset for asset in assets if asset.id in job['scanned_ids']]
+        missing = [asset for asset in assets if asset.id not in job['scanned_ids']]
+        summary_text = f"{len(scanned)} assets in {job['branch_name']}"
+        with audit_report_pdf(job['audit_session'], summary_text, scanned, missing) as pdf:
+            files.append(write_file(directory, 'audit_summary.pdf', pdf.read()))
+
+    by_id = {asset.id: asset for asset in assets}
+    for compliance, asset_ids in job['compliances']:
+        with compliance_report_pdf(compliance, [asset_row(by_id[asset_id]) for asset_id in asset_ids]) as pdf:
+            files.append(write_file(directory, f'compliance_{compliance.id}.pdf', pdf.read()))
+    return files, skipped
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the month-end audit summary, compliance reports and asset export for every "
+        "branch in parallel, into OUTPUT_DIR/PERIOD with a manifest.json. Rerunning the same "
+        "period skips branches the manifest records as done."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default='reports', help='Parent of the dated output directory.')
+        parser.add_argument('--period', help='Month to report on as YYYY-MM (default: current month).')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes.')
+        parser.add_argument('--force', action='store_true', help='Regenerate branches that are already done.')
+
+    def handle(self, *args, **options):
+        start, end, period = self._period(options['period'])
+        directory = os.path.join(options['output_dir'], period)
+        os.makedirs(directory, exist_ok=True)
+        manifest = self._load_manifest(directory, period)
+
+        branches = list(Branch.objects.filter(is_deleted=False).order_by('code'))
+        todo = [
+            branch for branch in branches
+            if options['force'] or not self._done(directory, manifest['branches'].get(str(branch.id)))
+        ]
+        self.stderr.write(f"{len(branches) - len(todo)} of {len(branches)} branches already done")
+        if not todo:
+            return
+
+        jobs = self._jobs(todo, directory, start, end)
+        # Forked workers must not share the parent's database connections.
+        connections.close_all()
+        failed = 0
+        with ProcessPoolExecutor(max_workers=max(options['workers'] or 1, 1), initializer=django.setup) as pool:
+            started = time.perf_counter()
+            futures = {pool.submit(render_branch, job): branch for branch, job in zip(todo, jobs)}
+            for future in as_completed(futures):
+                branch = futures[future]
+                entry = {'code': branch.code, 'name': branch.name, 'finished_at': timezone.now().isoformat()}
+                try:
+                    files, skipped = future.result()
+                except Exception as exc:
+                    failed += 1
+                    entry.update(status='failed', error=f"{type(exc).__name__}: {exc}")
+                else:
+                    entry.update(status='done', files=files, skipped=skipped)
+                manifest['branches'][str(branch.id)] = entry
+                self._save_manifest(directory, manifest)
+                self.stderr.write(f"{branch.code}: {entry['status']} after {time.perf_counter() - started:.1f}s")
+
+        if failed:
+            raise CommandError(f"{failed} branches failed; rerun the command to resume")
+        self.stdout.write(os.path.join(directory, MANIFEST))
+
+    def _period(self, value):
+        try:
+            first = datetime.datetime.strptime(value, '%Y-%m') if value else timezone.localtime().replace(tzinfo=None)
+        except ValueError:
+            raise CommandError('--period must be YYYY-MM')
+        first = first.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        following = (first + datetime.timedelta(days=32)).replace(day=1)
+        return timezone.make_aware(first), timezone.make_aware(following), first.strftime('%Y-%m')
+
+    def _jobs(self, branches, directory, start, end):
+        """One job per branch, built from a single set of queries for all of them."""
+        branch_ids = {branch.id for branch in branches}
+        assets = defaultdict(list)
+        for asset in Asset.objects.filter(branch_id__in=branch_ids).select_related('branch', 'category').order_by('asset_serial_number'):
+            assets[asset.branch_id].append(asset)
+        branch_of = {asset.id: branch_id for branch_id, rows in assets.items() for asset in rows}
+
+        # The latest session ended in the period that scanned each branch.
+        ended = AuditSession.objects.filter(end_time__gte=start, end_time__lt=end)
+        sessions = {session.id: session for session in ended}
+        scans = defaultdict(lambda: defaultdict(set))
+        for session_id, asset_id in AuditSession.scanned_assets.through.objects.filter(
+            auditsession__in=ended
+        ).values_list('auditsession_id', 'asset_id'):
+            if asset_id in branch_of:
+                scans[branch_of[asset_id]][session_id].add(asset_id)
+
+        compliances = {compliance.id: compliance for compliance in Compliance.objects.order_by('id')}
+        linked = defaultdict(lambda: defaultdict(list))
+        for compliance_id, asset_id in Compliance.assets.through.objects.filter(
+            asset__branch_id__in=branch_ids
+        ).order_by('compliance_id', 'asset__asset_serial_number').values_list('compliance_id', 'asset_id'):
+            linked[branch_of[asset_id]][compliance_id].append(asset_id)
+
+        jobs = []
+        for branch in branches:
+            session_id = max(scans[branch.id], key=lambda pk: sessions[pk].end_time, default=None)
+            jobs.append({
+                'directory': os.path.join(directory, f'branch-{branch.code}'),
+                'branch_name': branch.name,
+                'assets': assets[branch.id],
+                'audit_session': sessions.get(session_id),
+                'scanned_ids': scans[branch.id].get(session_id, set()),
+                'compliances': [(compliances[pk], asset_ids) for pk, asset_ids in linked[branch.id].items()],
+            })
+        return jobs
+
+    def _load_manifest(self, directory, period):
+        try:
+            with open(os.path.join(directory, MANIFEST)) as manifest:
+                return json.load(manifest)
+        except FileNotFoundError:
+            return {'period': period, 'branches': {}}
+
+    def _save_manifest(self, directory, manifest):
+        manifest['updated_at'] = timezone.now().isoformat()
+        write_file(directory, MANIFEST, json.dumps(manifest, indent=2).encode())
+
+    def _done(self, directory, entry):
+        if not entry or entry.get('status') != 'done':
+            return False
+        for file in entry['files']:
+            path = os.path.join(directory, f"branch-{entry['code']}", file['name'])
+            if not os.path.exists(path) or os.path.getsize(path) != file['size']:
+                return False
+        return True
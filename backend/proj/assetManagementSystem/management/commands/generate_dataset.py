@@ -0,0 +1,233 @@
+import datetime
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from assetManagementSystem.models import (
+    Asset, AssetHistory, AuditSession, Branch, Category, Compliance, CustomUser
+)
+
+BRANCH_NAMES = [name for name, _ in Branch._meta.get_field('name').choices]
+CATEGORY_NAMES = [name for name, _ in Category._meta.get_field('name').choices]
+DEPARTMENTS = [name for name, _ in CustomUser._meta.get_field('department').choices]
+VENDORS = ['Dell', 'HP', 'Lenovo', 'Apple', 'Steelcase', 'Herman Miller', 'Toyota', 'Bosch', 'Siemens', 'Cisco']
+STATUS_WEIGHTS = {'Active': 70, 'Inactive': 10, 'Under Maintenance': 8, 'Retired': 12}
+CONDITION_WEIGHTS = {'Excellent': 20, 'Good': 50, 'Fair': 20, 'Poor': 10}
+# Share of assets whose latest assignment is still open.
+ASSIGNED_SHARE = 0.6
+
+
+@contextmanager
+def explicit_dates(*fields):
+    # bulk_create runs pre_save, which would stamp auto_now_add fields with the current time.
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic dataset (branches, categories, employees, assets, "
+        "assignment history, audit sessions and compliance links) for benchmarking. "
+        "Rows are added to the configured database; serial numbers and codes use --prefix."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='GEN', help='Prefix for codes, serial numbers and usernames.')
+        parser.add_argument('--branches', type=int, default=10)
+        parser.add_argument('--categories', type=int, default=8)
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--assets', type=int, default=100000)
+        parser.add_argument('--history-per-asset', type=float, default=5.0, help='Average assignments per asset.')
+        parser.add_argument('--audit-sessions', type=int, default=200)
+        parser.add_argument('--scans-per-session', type=int, default=500)
+        parser.add_argument('--compliance', type=int, default=50)
+        parser.add_argument('--assets-per-compliance', type=int, default=200)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        prefix = options['prefix'].upper()
+        if len(prefix) > 6:
+            raise CommandError('--prefix must be at most 6 characters (branch and category codes are 10)')
+        if Branch.objects.filter(code__startswith=f'{prefix}B').exists():
+            raise CommandError(f"A dataset with prefix {prefix} already exists; pass another --prefix")
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        started = time.monotonic()
+
+        with transaction.atomic():
+            branches = Branch.objects.bulk_create([
+                Branch(name=BRANCH_NAMES[index % len(BRANCH_NAMES)], code=f'{prefix}B{index:03d}')
+                for index in range(options['branches'])
+            ])
+            categories = Category.objects.bulk_create([
+                Category(name=CATEGORY_NAMES[index % len(CATEGORY_NAMES)], code=f'{prefix}C{index:03d}')
+                for index in range(options['categories'])
+            ])
+            users = self._create_users(prefix, options['users'], branches)
+        self.stdout.write(f"{len(branches)} branches, {len(categories)} categories, {len(users)} users")
+
+        asset_ids, history_count = self._create_assets(
+            options['assets'], options['history_per_asset'], branches, categories, users
+        )
+        self.stdout.write(f"{len(asset_ids)} assets, {history_count} history rows")
+
+        scans = self._create_audit_sessions(options['audit_sessions'], options['scans_per_session'], asset_ids, users)
+        self.stdout.write(f"{options['audit_sessions']} audit sessions, {scans} scans")
+
+        links = self._create_compliance(prefix, options['compliance'], options['assets_per_compliance'], asset_ids)
+        self.stdout.write(f"{options['compliance']} compliance records, {links} asset links")
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.monotonic() - started:.1f}s"))
+
+    def _weighted(self, weights):
+        return self.rng.choices(list(weights), weights=list(weights.values()))[0]
+
+    def _create_users(self, prefix, count, branches):
+        password = make_password(None)
+        users = [
+            CustomUser(
+                username=f'{prefix.lower()}-admin', password=password, user_type='Admin',
+                is_staff=True, is_superuser=True,
+            )
+        ]
+        for index in range(count):
+            users.append(CustomUser(
+                username=f'{prefix.lower()}-user-{index:06d}',
+                email=f'{prefix.lower()}-user-{index:06d}@example.com',
+                password=password,
+                user_type=self.rng.choices(['Basic', 'Auditor', 'Admin'], weights=[90, 8, 2])[0],
+                branch=self.rng.choice(branches),
+                department=self.rng.choice(DEPARTMENTS),
+            ))
+        return CustomUser.objects.bulk_create(users, batch_size=self.batch_size)[1:]
+
+    def _create_assets(self, count, history_per_asset, branches, categories, users):
+        asset_ids = []
+        history_count = 0
+        today = self.now.date()
+        for start in range(0, count, self.batch_size):
+            assets, plans = [], []
+            for index in range(start, min(start + self.batch_size, count)):
+                purchase_date = today - datetime.timedelta(days=self.rng.randint(30, 3650))
+                price = Decimal(self.rng.randint(100, 50000))
+                age_years = (today - purchase_date).days / 365
+                history = self._history_plan(purchase_date, history_per_asset, users)
+                open_user = history[-1][0] if history and history[-1][2] is None else None
+                branch = self.rng.choice(branches)
+                category = self.rng.choice(categories)
+                assets.append(Asset(
+                    branch=branch,
+                    category=category,
+                    asset_serial_number=f'{branch.code}-{category.code}-{index:07d}',
+                    qr_code_identifier=str(uuid.uuid4()),
+                    description=f'{category.name} #{index}',
+                    status=self._weighted(STATUS_WEIGHTS),
+                    condition=self._weighted(CONDITION_WEIGHTS),
+                    purchase_price=price,
+                    current_value=(price * Decimal(max(0.0, 1 - age_years / 10))).quantize(Decimal('0.01')),
+                    purchase_date=purchase_date,
+                    vendor=self.rng.choice(VENDORS),
+                    next_audit_date=today + datetime.timedelta(days=self.rng.randint(-30, 365)),
+                    assigned_to=open_user,
+                ))
+                plans.append(history)
+
+            with transaction.atomic(), explicit_dates(AssetHistory._meta.get_field('assigned_date')):
+                # bulk_create skips Asset.save(), so no QR images are rendered.
+                assets = Asset.objects.bulk_create(assets)
+                rows = [
+                    AssetHistory(asset_id=asset.id, user=user, assigned_date=assigned, unassigned_date=unassigned)
+                    for asset, history in zip(assets, plans)
+                    for user, assigned, unassigned in history
+                ]
+                AssetHistory.objects.bulk_create(rows, batch_size=self.batch_size)
+            asset_ids.extend(asset.id for asset in assets)
+            history_count += len(rows)
+            self.stdout.write(f"  {len(asset_ids)}/{count} assets", ending='\r')
+        self.stdout.write('')
+        return asset_ids, history_count
+
+    def _history_plan(self, purchase_date, average, users):
+        count = self.rng.randint(0, int(average * 2))
+        if not count:
+            return []
+        start = timezone.make_aware(datetime.datetime.combine(purchase_date, datetime.time(9)))
+        span = (self.now - start).total_seconds()
+        # Sorted cut points split the asset's life into consecutive custody periods.
+        cuts = sorted(self.rng.uniform(0, span) for _ in range(count * 2 - 2))
+        moments = [start] + [start + datetime.timedelta(seconds=cut) for cut in cuts]
+        history = []
+        for index in range(count):
+            assigned = moments[index * 2]
+            unassigned = moments[index * 2 + 1] if index * 2 + 1 < len(moments) else None
+            history.append((self.rng.choice(users), assigned, unassigned))
+        if history[-1][2] is None and self.rng.random() > ASSIGNED_SHARE:
+            user, assigned, _ = history[-1]
+            history[-1] = (user, assigned, assigned + (self.now - assigned) / 2)
+        return history
+
+    def _create_audit_sessions(self, count, scans_per_session, asset_ids, users):
+        auditors = [user for user in users if user.user_type == 'Auditor'] or users
+        sessions = []
+        for _ in range(count):
+            start_time = self.now - datetime.timedelta(days=self.rng.randint(0, 730), hours=self.rng.randint(0, 23))
+            open_session = self.rng.random() < 0.05
+            sessions.append(AuditSession(
+                start_time=start_time,
+                end_time=None if open_session else start_time + datetime.timedelta(hours=self.rng.randint(1, 8)),
+                created_by=self.rng.choice(auditors),
+            ))
+        through = AuditSession.scanned_assets.through
+        scans = 0
+        with transaction.atomic(), explicit_dates(AuditSession._meta.get_field('start_time')):
+            sessions = AuditSession.objects.bulk_create(sessions, batch_size=self.batch_size)
+            for session in sessions:
+                sample = self.rng.sample(asset_ids, min(scans_per_session, len(asset_ids)))
+                through.objects.bulk_create(
+                    [through(auditsession_id=session.id, asset_id=asset_id) for asset_id in sample],
+                    batch_size=self.batch_size,
+                )
+                scans += len(sample)
+        return scans
+
+    def _create_compliance(self, prefix, count, assets_per_compliance, asset_ids):
+        categories = [name for name, _ in Compliance.CATEGORY_CHOICES]
+        statuses = [name for name, _ in Compliance.STATUS_CHOICES]
+        today = self.now.date()
+        through = Compliance.assets.through
+        links = 0
+        with transaction.atomic():
+            for index in range(count):
+                requirements = self.rng.randint(5, 40)
+                compliance = Compliance.objects.create(
+                    id=f'{prefix}-COMP-{index:04d}',
+                    title=f'{self.rng.choice(categories)} control {index}',
+                    category=self.rng.choice(categories),
+                    status=self.rng.choice(statuses),
+                    last_audit=today - datetime.timedelta(days=self.rng.randint(0, 365)),
+                    next_audit=today + datetime.timedelta(days=self.rng.randint(-30, 365)),
+                    score=self.rng.randint(40, 100),
+                    requirements=requirements,
+                    completed=self.rng.randint(0, requirements),
+                )
+                sample = self.rng.sample(asset_ids, min(assets_per_compliance, len(asset_ids)))
+                through.objects.bulk_create(
+                    [through(compliance_id=compliance.id, asset_id=asset_id) for asset_id in sample],
+                    batch_size=self.batch_size,
+                )
+                links += len(sample)
+        return links
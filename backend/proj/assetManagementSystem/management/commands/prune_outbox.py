@@ -0,0 +1,55 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from assetManagementSystem.models import ChangeCounter, OutboxEvent, OUTBOX_PRUNED
+from assetManagementSystem.outbox import ROW_EVENTS
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete outbox events older than the retention period and compact older row events: "
+        "a created or updated event is dropped once a later row event for the same record "
+        "exists. Run it periodically, e.g. hourly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=settings.OUTBOX_RETENTION_DAYS)
+        parser.add_argument('--compact-after-hours', type=int, default=settings.OUTBOX_COMPACT_AFTER_HOURS)
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows deleted per transaction.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        batch_size = options['batch_size']
+
+        expired = OutboxEvent.objects.filter(created_at__lt=now - datetime.timedelta(days=options['retention_days']))
+        last_expired = expired.order_by('-id').values_list('id', flat=True).first()
+        pruned = 0
+        if last_expired is not None:
+            # Record the cutoff first: the feed answers 410 to cursors behind it.
+            ChangeCounter.objects.update_or_create(name=OUTBOX_PRUNED, defaults={'value': last_expired})
+            pruned = self._delete(OutboxEvent.objects.filter(id__lte=last_expired), batch_size)
+
+        later = OutboxEvent.objects.filter(
+            aggregate=OuterRef('aggregate'), aggregate_id=OuterRef('aggregate_id'),
+            event__in=ROW_EVENTS, id__gt=OuterRef('id'),
+        )
+        superseded = OutboxEvent.objects.filter(
+            created_at__lt=now - datetime.timedelta(hours=options['compact_after_hours']),
+            event__in=['created', 'updated'],
+        ).filter(Exists(later))
+        compacted = self._delete(superseded, batch_size)
+        self.stdout.write(f"Pruned {pruned} expired and compacted {compacted} superseded outbox events")
+
+    def _delete(self, events, batch_size):
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                ids = list(events.order_by('id').values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    return deleted
+                deleted += OutboxEvent.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,106 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+CAS_PREFIX = 'cas/'
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+IMMUTABLE_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'private, no-cache'
+
+
+def _read_range(fh, length):
+    try:
+        while length > 0:
+            chunk = fh.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def _parse_range(header, size):
+    # Only single byte ranges are supported; anything else falls back to the full body.
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first == '':
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise ValueError
+    return start, end
+
+
+def serve_file(request, storage, name, as_attachment=False, filename=None):
+    """
+    Serve a stored file without reading it into memory.
+
+    Full responses use FileResponse, so WSGI servers can hand the file to
+    sendfile(); when MEDIA_ACCEL_REDIRECT_PREFIX is set the transfer is
+    delegated to the front-end proxy instead. Single byte ranges and
+    conditional requests are answered here. Content-addressed files never
+    change, so they are cached as immutable.
+    """
+    try:
+        full_path = storage.path(name)
+        stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError, SuspiciousFileOperation):
+        raise Http404('File not found')
+
+    size = stat.st_size
+    if name.startswith(CAS_PREFIX):
+        etag = quote_etag(os.path.splitext(os.path.basename(name))[0])
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        etag = quote_etag(f"{size:x}-{stat.st_mtime_ns:x}")
+        cache_control = REVALIDATE_CACHE_CONTROL
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        byte_range = None
+        range_header = request.META.get('HTTP_RANGE')
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if range_header and (not if_range or if_range == etag):
+            try:
+                byte_range = _parse_range(range_header, size)
+            except ValueError:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+        accel_prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', None)
+        if accel_prefix:
+            # The proxy serves the bytes (and ranges) itself via sendfile.
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + name
+        elif byte_range:
+            start, end = byte_range
+            fh = open(full_path, 'rb')
+            fh.seek(start)
+            response = StreamingHttpResponse(_read_range(fh, end - start + 1), status=206, content_type=content_type)
+            response['Content-Length'] = str(end - start + 1)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        else:
+            response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        if as_attachment or filename:
+            response['Content-Disposition'] = content_disposition_header(as_attachment, filename or os.path.basename(name))
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = cache_control
+    return response
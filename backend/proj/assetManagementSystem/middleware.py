@@ -0,0 +1,244 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+from urllib.parse import parse_qsl, urlencode
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.views.debug import SafeExceptionReporterFilter
+
+from .authentication import authenticate_request
+from .instrumentation import current_metrics, end_request, start_request
+from .models import RequestProfile
+from .profiling import make_profiler
+from .routers import pin_to_primary
+
+UNSAFE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+logger = logging.getLogger('assetManagementSystem.performance')
+
+
+class HybridMiddleware:
+    """
+    Base for middleware that runs natively in both sync and async chains, so
+    async views under ASGI are not pushed onto a thread. Subclasses implement
+    ``handle`` and ``ahandle``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.ahandle(request)
+        return self.handle(request)
+
+
+class ServerTimingMiddleware(HybridMiddleware):
+    """
+    Measures SQL count and time, serialization and render time per request and
+    returns them in a Server-Timing header. Requests slower than
+    SLOW_REQUEST_MS are logged with their most repeated query fingerprints.
+
+    Bodies of streaming responses are produced after this middleware returns,
+    so their queries are not counted.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.enabled = getattr(settings, 'SERVER_TIMING_ENABLED', True)
+        self.slow_request_ms = getattr(settings, 'SLOW_REQUEST_MS', 500)
+
+    def _recording(self, metrics):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics.record_query))
+        return stack
+
+    def handle(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        metrics, token = start_request()
+        try:
+            with self._recording(metrics):
+                response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self._report(request, response, metrics)
+
+    async def ahandle(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        # Connections are thread-local: install the wrappers on the thread
+        # that runs this request's sync_to_async database work.
+        metrics, token = start_request()
+        try:
+            recording = await sync_to_async(self._recording)(metrics)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(recording.close)()
+        finally:
+            end_request(token)
+        return self._report(request, response, metrics)
+
+    def _report(self, request, response, metrics):
+        total = time.perf_counter() - metrics.started
+        response['Server-Timing'] = metrics.server_timing(total)
+        if total * 1000 >= self.slow_request_ms:
+            logger.warning('slow_request %s', json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'user_id': getattr(getattr(request, 'user', None), 'pk', None),
+                'total_ms': round(total * 1000, 1),
+                'db_ms': round(metrics.db_time * 1000, 1),
+                'queries': metrics.query_count,
+                'serialize_ms': round(metrics.serialize_time * 1000, 1),
+                'render_ms': round(metrics.render_time * 1000, 1),
+                'repeated_queries': metrics.repeated_queries(),
+            }))
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook returns.
+        metrics = current_metrics()
+        if metrics is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                metrics.render_time += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+
+class ProfilingMiddleware(HybridMiddleware):
+    """
+    Profiles a PROFILING_SAMPLE_RATE fraction of requests, plus requests from
+    staff users that carry the PROFILING_TRIGGER_HEADER, and stores each
+    profile as a RequestProfile with secrets masked in its query string.
+    Other requests cost one random() call and a header lookup.
+
+    For async requests the profile covers the event loop thread while the
+    request is in flight, including other requests' coroutines; ORM calls run
+    in sync_to_async threads and show up as time spent awaiting them.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        self.mode = getattr(settings, 'PROFILING_MODE', 'cprofile')
+        self.interval = getattr(settings, 'PROFILING_SAMPLE_INTERVAL', 0.005)
+        self.header = 'HTTP_' + getattr(settings, 'PROFILING_TRIGGER_HEADER', 'X-Profile').upper().replace('-', '_')
+        self.max_profiles = getattr(settings, 'PROFILING_MAX_PROFILES', 500)
+
+    def _sampled(self):
+        return 'sampled' if self.sample_rate and random.random() < self.sample_rate else None
+
+    def _staff(self, request):
+        # Views authenticate later, so the header's sender is checked here, before profiling starts.
+        user = authenticate_request(request)
+        return user is not None and user.is_staff
+
+    def _start(self):
+        profiler = make_profiler(self.mode, self.interval)
+        try:
+            profiler.start()
+        except ValueError:
+            # Another request on this process is already being profiled.
+            return None
+        return profiler
+
+    def handle(self, request):
+        trigger = 'header' if request.META.get(self.header) and self._staff(request) else self._sampled()
+        profiler = trigger and self._start()
+        if not profiler:
+            return self.get_response(request)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            data = profiler.stop()
+        self._store(request, response, trigger, time.perf_counter() - start, data)
+        return response
+
+    async def ahandle(self, request):
+        if request.META.get(self.header) and await sync_to_async(self._staff)(request):
+            trigger = 'header'
+        else:
+            trigger = self._sampled()
+        profiler = trigger and self._start()
+        if not profiler:
+            return await self.get_response(request)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            data = profiler.stop()
+        await sync_to_async(self._store)(request, response, trigger, time.perf_counter() - start, data)
+        return response
+
+    def _query_string(self, request):
+        hidden = SafeExceptionReporterFilter()
+        params = parse_qsl(request.META.get('QUERY_STRING', ''), keep_blank_values=True)
+        return urlencode([
+            (key, hidden.cleansed_substitute if hidden.hidden_settings.search(key) else value)
+            for key, value in params
+        ], safe='*')
+
+    def _store(self, request, response, trigger, duration, data):
+        # A lost profile must not fail the request it measured.
+        try:
+            self._save_profile(request, response, trigger, duration, data)
+        except Exception:
+            logger.exception('Could not store the profile of %s %s', request.method, request.path)
+
+    def _save_profile(self, request, response, trigger, duration, data):
+        metrics = current_metrics()
+        user = getattr(request, 'user', None)
+        match = getattr(request, 'resolver_match', None)
+        profile = RequestProfile.objects.create(
+            method=request.method,
+            path=request.path[:500],
+            query_string=self._query_string(request),
+            view_name=(match.view_name if match else '')[:200],
+            status_code=response.status_code,
+            user_id=user.pk if user is not None and user.is_authenticated else None,
+            duration_ms=duration * 1000,
+            query_count=metrics.query_count if metrics else None,
+            db_ms=metrics.db_time * 1000 if metrics else None,
+            mode=self.mode,
+            trigger=trigger,
+            data=data,
+        )
+        if profile.id % 50 == 0:
+            # Keep only the newest PROFILING_MAX_PROFILES rows.
+            cutoff = list(RequestProfile.objects.order_by('-id').values_list('id', flat=True)[self.max_profiles:self.max_profiles + 1])
+            if cutoff:
+                RequestProfile.objects.filter(id__lte=cutoff[0]).delete()
+
+
+class ReplicaStickinessMiddleware(HybridMiddleware):
+    """After a user's write, keep their replica-routed reads on the primary for a while."""
+
+    def handle(self, request):
+        response = self.get_response(request)
+        if request.method in UNSAFE_METHODS:
+            # DRF copies the token-authenticated user onto the underlying request.
+            pin_to_primary(getattr(request, 'user', None))
+        return response
+
+    async def ahandle(self, request):
+        response = await self.get_response(request)
+        if request.method in UNSAFE_METHODS:
+            await sync_to_async(pin_to_primary)(getattr(request, 'user', None))
+        return response
@@ -0,0 +1,156 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:57
+
+import assetManagementSystem.storage
+import django.contrib.auth.models
+import django.contrib.auth.validators
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Branch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(choices=[('Main Branch', 'Main Branch'), ('North Branch', 'North Branch'), ('East Branch', 'East Branch')], max_length=100)),
+                ('code', models.CharField(max_length=10, unique=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(choices=[('Electronics', 'Electronics'), ('Furniture', 'Furniture'), ('Vehicles', 'Vehicles'), ('Equipment', 'Equipment')], max_length=100)),
+                ('code', models.CharField(max_length=10, unique=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('size', models.BigIntegerField()),
+                ('refcount', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CustomUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('username', models.CharField(error_messages={'unique': 'A user with that username already exists.'}, help_text='Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.', max_length=150, unique=True, validators=[django.contrib.auth.validators.UnicodeUsernameValidator()], verbose_name='username')),
+                ('first_name', models.CharField(blank=True, max_length=150, verbose_name='first name')),
+                ('last_name', models.CharField(blank=True, max_length=150, verbose_name='last name')),
+                ('email', models.EmailField(blank=True, max_length=254, verbose_name='email address')),
+                ('is_staff', models.BooleanField(default=False, help_text='Designates whether the user can log into this admin site.', verbose_name='staff status')),
+                ('is_active', models.BooleanField(default=True, help_text='Designates whether this user should be treated as active. Unselect this instead of deleting accounts.', verbose_name='active')),
+                ('date_joined', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date joined')),
+                ('user_type', models.CharField(choices=[('Basic', 'View Branch Data and Create Branch Assets'), ('Auditor', 'Create Audit Reports'), ('Admin', 'Full Access')], default='Basic', max_length=50)),
+                ('department', models.CharField(blank=True, choices=[('Engineering', 'Engineering'), ('Marketing', 'Marketing'), ('Design', 'Design'), ('HR', 'HR')], max_length=100, null=True)),
+                ('token_version', models.PositiveIntegerField(default=0)),
+                ('groups', models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups')),
+                ('user_permissions', models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions')),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='assetManagementSystem.branch')),
+            ],
+            options={
+                'verbose_name': 'user',
+                'verbose_name_plural': 'users',
+                'abstract': False,
+            },
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Asset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset_serial_number', models.CharField(blank=True, max_length=50, unique=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('qr_code', models.ImageField(blank=True, upload_to='qr_codes/')),
+                ('qr_code_identifier', models.CharField(blank=True, max_length=100, unique=True)),
+                ('photo', models.ImageField(blank=True, null=True, storage=assetManagementSystem.storage.content_addressed_storage, upload_to='asset_photos/')),
+                ('status', models.CharField(choices=[('Active', 'Active'), ('Inactive', 'Inactive'), ('Under Maintenance', 'Under Maintenance'), ('Retired', 'Retired')], default='Active', max_length=50)),
+                ('condition', models.CharField(choices=[('Excellent', 'Excellent'), ('Good', 'Good'), ('Fair', 'Fair'), ('Poor', 'Poor')], default='Good', max_length=50)),
+                ('purchase_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('current_value', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('purchase_date', models.DateField(blank=True, null=True)),
+                ('vendor', models.CharField(blank=True, max_length=100, null=True)),
+                ('next_audit_date', models.DateField(blank=True, null=True)),
+                ('assigned_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_assets', to=settings.AUTH_USER_MODEL)),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='assets', to='assetManagementSystem.branch')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='assetManagementSystem.category')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AssetHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assigned_date', models.DateTimeField(auto_now_add=True)),
+                ('unassigned_date', models.DateTimeField(blank=True, null=True)),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='history', to='assetManagementSystem.asset')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Attachment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(storage=assetManagementSystem.storage.content_addressed_storage, upload_to='attachments/')),
+                ('file_type', models.CharField(blank=True, max_length=100)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='assetManagementSystem.assethistory')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AttachmentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.BigIntegerField()),
+                ('offset', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='assetManagementSystem.assethistory')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AuditSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.DateTimeField(auto_now_add=True)),
+                ('end_time', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('scanned_assets', models.ManyToManyField(related_name='audit_sessions', to='assetManagementSystem.asset')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Compliance',
+            fields=[
+                ('id', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('category', models.CharField(choices=[('Security', 'Security'), ('Financial', 'Financial'), ('Privacy', 'Privacy'), ('Environmental', 'Environmental')], max_length=50)),
+                ('status', models.CharField(choices=[('Compliant', 'Compliant'), ('Action Required', 'Action Required'), ('Non-Compliant', 'Non-Compliant')], max_length=50)),
+                ('last_audit', models.DateField(blank=True, null=True)),
+                ('next_audit', models.DateField(blank=True, null=True)),
+                ('score', models.IntegerField(default=0)),
+                ('requirements', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('assets', models.ManyToManyField(blank=True, related_name='compliances', to='assetManagementSystem.asset')),
+            ],
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assetManagementSystem', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['branch', 'status'], name='asset_branch_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['branch', 'category'], name='asset_branch_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['next_audit_date'], name='asset_next_audit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assethistory',
+            index=models.Index(fields=['asset', 'assigned_date'], name='history_asset_assigned_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assethistory',
+            index=models.Index(fields=['user', 'assigned_date'], name='history_user_assigned_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assethistory',
+            index=models.Index(fields=['asset', 'unassigned_date'], name='history_asset_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assethistory',
+            index=models.Index(fields=['user', 'unassigned_date'], name='history_user_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compliance',
+            index=models.Index(fields=['next_audit'], name='compliance_next_audit_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assetManagementSystem', '0003_request_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset_id', models.BigIntegerField()),
+                ('version', models.BigIntegerField(db_index=True)),
+                ('reason', models.CharField(choices=[('deleted', 'Deleted'), ('transferred', 'Transferred')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ChangeCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='version',
+            field=models.BigIntegerField(db_index=True, default=0),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['branch', 'version'], name='asset_branch_version_idx'),
+        ),
+        migrations.AddField(
+            model_name='assettombstone',
+            name='branch',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asset_tombstones', to='assetManagementSystem.branch'),
+        ),
+        migrations.AddIndex(
+            model_name='assettombstone',
+            index=models.Index(fields=['branch', 'version'], name='tombstone_branch_version_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:54
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assetManagementSystem', '0004_asset_change_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('aggregate', models.CharField(choices=[('asset', 'Asset'), ('assignment', 'Assignment'), ('audit_session', 'Audit session'), ('compliance', 'Compliance')], max_length=20)),
+                ('aggregate_id', models.CharField(max_length=50)),
+                ('event', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted'), ('linked', 'Linked'), ('unlinked', 'Unlinked')], max_length=20)),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['aggregate', 'aggregate_id'], name='outbox_aggregate_idx')],
+            },
+        ),
+    ]
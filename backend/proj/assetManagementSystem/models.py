@@ -1,7 +1,9 @@
 from django.db import models
 
 # Create your models here.
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from django.core.files import File
@@ -9,6 +11,7 @@ import qrcode
 import uuid
 from io import BytesIO
 import datetime
+from .storage import content_addressed_storage
 
 USER_TYPES = [
     ('Basic', 'View Branch Data and Create Branch Assets'),
@@ -16,6 +19,13 @@ USER_TYPES = [
     ('Admin', 'Full Access'),
 ]
 
+class AtomicSaveMixin:
+    """Runs save() and its post_save receivers, which write OutboxEvents, in one transaction."""
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 class Branch(models.Model):
     name = models.CharField(max_length=100, choices=[
         ('Main Branch', 'Main Branch'),
@@ -42,6 +52,7 @@ class CustomUser(AbstractUser):
         ('Design', 'Design'),
         ('HR', 'HR'),
     ], null=True, blank=True)
+    token_version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.username
@@ -79,7 +90,7 @@ class Asset(models.Model):
     description = models.TextField(blank=True, null=True)
     qr_code = models.ImageField(upload_to='qr_codes/', blank=True)
     qr_code_identifier = models.CharField(max_length=100, unique=True, blank=True)
-    photo = models.ImageField(upload_to='asset_photos/', blank=True, null=True)
+    photo = models.ImageField(upload_to='asset_photos/', storage=content_addressed_storage, blank=True, null=True)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='Active')
     condition = models.CharField(max_length=50, choices=CONDITION_CHOICES, default='Good')
     purchase_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
@@ -88,6 +99,17 @@ class Asset(models.Model):
     vendor = models.CharField(max_length=100, blank=True, null=True)
     next_audit_date = models.DateField(null=True, blank=True)
     assigned_to = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_assets')
+    updated_at = models.DateTimeField(auto_now=True)
+    # Value of the ASSET_CHANGES counter at the last write; drives /assets/changes/.
+    version = models.BigIntegerField(default=0, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['branch', 'status'], name='asset_branch_status_idx'),
+            models.Index(fields=['branch', 'category'], name='asset_branch_category_idx'),
+            models.Index(fields=['next_audit_date'], name='asset_next_audit_idx'),
+            models.Index(fields=['branch', 'version'], name='asset_branch_version_idx'),
+        ]
 
     def __str__(self):
         return self.asset_serial_number
@@ -98,7 +120,22 @@ class Asset(models.Model):
         if not self.qr_code_identifier:
             self.qr_code_identifier = str(uuid.uuid4())
         self.generate_qr_code()
-        super().save(*args, **kwargs)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'version', 'updated_at'}
+        # The counter row stays locked until commit, so versions commit in order.
+        with transaction.atomic():
+            previous_branch_id = None
+            if self.pk is not None:
+                previous_branch_id = Asset.objects.filter(pk=self.pk).values_list('branch_id', flat=True).first()
+            self.version = ChangeCounter.next(ASSET_CHANGES)
+            # Read by the dashboard stream, which refreshes both branches after a transfer.
+            self._previous_branch_id = previous_branch_id
+            if previous_branch_id is not None and previous_branch_id != self.branch_id:
+                AssetTombstone.objects.create(
+                    asset_id=self.pk, branch_id=previous_branch_id, version=self.version,
+                    reason=AssetTombstone.TRANSFERRED
+                )
+            super().save(*args, **kwargs)
 
     def generate_unique_serial_number(self):
         branch_code = self.branch.code
@@ -120,7 +157,61 @@ class Asset(models.Model):
         buffer.seek(0)
         self.qr_code.save(f"qr_{self.asset_serial_number}.png", File(buffer), save=False)
 
-class AuditSession(models.Model):
+class ChangeCounter(models.Model):
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+    @classmethod
+    def next(cls, name):
+        """
+        Increment and return the counter. Call inside a transaction: the
+        UPDATE's row lock is held until commit, which serializes writers.
+        """
+        if not cls.objects.filter(name=name).update(value=F('value') + 1):
+            cls.objects.get_or_create(name=name)
+            cls.objects.filter(name=name).update(value=F('value') + 1)
+        return cls.objects.values_list('value', flat=True).get(name=name)
+
+    @classmethod
+    def lock(cls, name):
+        """
+        Take the same row lock as ``next`` without changing the value. A no-op
+        UPDATE rather than select_for_update, so it also works in autocommit.
+        """
+        if not cls.objects.filter(name=name).update(value=F('value')):
+            cls.objects.get_or_create(name=name)
+            cls.objects.filter(name=name).update(value=F('value'))
+
+ASSET_CHANGES = 'assets'
+OUTBOX_PRUNED = 'outbox-pruned'
+
+class AssetTombstone(models.Model):
+    """An asset that left ``branch`` (deleted or transferred) at ``version``."""
+    DELETED = 'deleted'
+    TRANSFERRED = 'transferred'
+    REASON_CHOICES = [
+        (DELETED, 'Deleted'),
+        (TRANSFERRED, 'Transferred'),
+    ]
+
+    asset_id = models.BigIntegerField()
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE, related_name='asset_tombstones')
+    version = models.BigIntegerField(db_index=True)
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['branch', 'version'], name='tombstone_branch_version_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.asset_id} {self.reason} at {self.version}"
+
+class AuditSession(AtomicSaveMixin, models.Model):
     start_time = models.DateTimeField(auto_now_add=True)
     end_time = models.DateTimeField(null=True, blank=True)
     scanned_assets = models.ManyToManyField(Asset, related_name='audit_sessions')
@@ -129,7 +220,7 @@ class AuditSession(models.Model):
     def __str__(self):
         return f"Audit Session {self.id} - {self.start_time}"
 
-class Compliance(models.Model):
+class Compliance(AtomicSaveMixin, models.Model):
     STATUS_CHOICES = [
         ('Compliant', 'Compliant'),
         ('Action Required', 'Action Required'),
@@ -154,21 +245,34 @@ class Compliance(models.Model):
     description = models.TextField(blank=True, null=True)
     assets = models.ManyToManyField(Asset, related_name='compliances', blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_audit'], name='compliance_next_audit_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
-class AssetHistory(models.Model):
+class AssetHistory(AtomicSaveMixin, models.Model):
     asset = models.ForeignKey(Asset, on_delete=models.CASCADE, related_name='history')
     user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
     assigned_date = models.DateTimeField(auto_now_add=True)
     unassigned_date = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['asset', 'assigned_date'], name='history_asset_assigned_idx'),
+            models.Index(fields=['user', 'assigned_date'], name='history_user_assigned_idx'),
+            models.Index(fields=['asset', 'unassigned_date'], name='history_asset_open_idx'),
+            models.Index(fields=['user', 'unassigned_date'], name='history_user_open_idx'),
+        ]
+
     def __str__(self):
         return f"{self.asset.serial_number} - {self.user.username if self.user else 'N/A'}"
 
 class Attachment(models.Model):
     assignment = models.ForeignKey(AssetHistory, on_delete=models.CASCADE, related_name='attachments')
-    file = models.FileField(upload_to='attachments/')
+    file = models.FileField(upload_to='attachments/', storage=content_addressed_storage)
     file_type = models.CharField(max_length=100, blank=True)
 
     def save(self, *args, **kwargs):
@@ -177,4 +281,84 @@ class Attachment(models.Model):
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return self.file.name
\ No newline at end of file
+        return self.file.name
+
+class AttachmentUpload(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    assignment = models.ForeignKey(AssetHistory, on_delete=models.CASCADE, related_name='uploads')
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    created_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+class StoredBlob(models.Model):
+    name = models.CharField(max_length=255, primary_key=True)
+    size = models.BigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} refs)"
+
+class RequestProfile(models.Model):
+    MODE_CHOICES = [
+        ('cprofile', 'cProfile'),
+        ('sample', 'Stack sampling'),
+    ]
+    TRIGGER_CHOICES = [
+        ('sampled', 'Sampled'),
+        ('header', 'Trigger header'),
+    ]
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    query_string = models.TextField(blank=True)
+    view_name = models.CharField(max_length=200, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='request_profiles')
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField(null=True, blank=True)
+    db_ms = models.FloatField(null=True, blank=True)
+    mode = models.CharField(max_length=20, choices=MODE_CHOICES)
+    trigger = models.CharField(max_length=20, choices=TRIGGER_CHOICES)
+    data = models.BinaryField()
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+class OutboxEvent(models.Model):
+    """
+    Append-only change log for integrations, written in the same transaction
+    as the change (see outbox.py). ``id`` is the feed cursor.
+    """
+    AGGREGATE_CHOICES = [
+        ('asset', 'Asset'),
+        ('assignment', 'Assignment'),
+        ('audit_session', 'Audit session'),
+        ('compliance', 'Compliance'),
+    ]
+    EVENT_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+        ('linked', 'Linked'),
+        ('unlinked', 'Unlinked'),
+    ]
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    aggregate = models.CharField(max_length=20, choices=AGGREGATE_CHOICES)
+    aggregate_id = models.CharField(max_length=50)
+    event = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['aggregate', 'aggregate_id'], name='outbox_aggregate_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.id} {self.aggregate} {self.aggregate_id} {self.event}"
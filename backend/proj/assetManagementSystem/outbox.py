@@ -0,0 +1,116 @@
+"""
+Transactional outbox for Asset, AssetHistory (assignments), AuditSession and
+Compliance changes, read by integrations through ``/outbox/``.
+
+Events are written by signal receivers and, for set-based writes that skip
+signals, by the views through ``record_rows`` and ``record_instances``; always
+inside the writing transaction. Writers first lock the ASSET_CHANGES counter
+row until commit, so event ids become visible in increasing order and a
+consumer can page by id without missing late commits. Sharing the row with
+asset versions means every writer takes the same single lock, so writers
+cannot deadlock on lock order.
+
+created, updated and deleted events carry the full row (field attnames);
+linked and unlinked events carry the ids added to or removed from a
+many-to-many relation. prune_outbox removes events past the retention
+period and compacts row events superseded by a later row event for the same
+aggregate.
+"""
+from django.db.models.fields.files import FieldFile
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Asset, AssetHistory, AuditSession, ChangeCounter, Compliance, OutboxEvent, ASSET_CHANGES
+
+AGGREGATES = {
+    Asset: 'asset',
+    AssetHistory: 'assignment',
+    AuditSession: 'audit_session',
+    Compliance: 'compliance',
+}
+ROW_EVENTS = ['created', 'updated', 'deleted']
+
+
+def row(instance):
+    data = {}
+    for field in instance._meta.concrete_fields:
+        value = getattr(instance, field.attname)
+        data[field.attname] = value.name if isinstance(value, FieldFile) else value
+    return data
+
+
+def record(model, events):
+    """Append ``(aggregate_id, event, payload)`` tuples. Call inside the writing transaction."""
+    if not events:
+        return
+    # Only the lock is needed; incrementing here would use up asset versions.
+    ChangeCounter.lock(ASSET_CHANGES)
+    aggregate = AGGREGATES[model]
+    OutboxEvent.objects.bulk_create([
+        OutboxEvent(aggregate=aggregate, aggregate_id=str(pk), event=event, payload=payload)
+        for pk, event, payload in events
+    ], batch_size=1000)
+
+
+def record_instances(instances, event):
+    instances = list(instances)
+    if instances:
+        record(type(instances[0]), [(instance.pk, event, row(instance)) for instance in instances])
+
+
+def record_rows(model, ids, event='updated'):
+    """Record the current rows with primary keys ``ids``, e.g. right after a set-based update."""
+    ids = list(ids)
+    fields = [field.attname for field in model._meta.concrete_fields]
+    for start in range(0, len(ids), 1000):
+        rows = model._default_manager.filter(pk__in=ids[start:start + 1000]).order_by('pk').values(*fields)
+        record(model, [(values[model._meta.pk.attname], event, values) for values in rows])
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_save, sender=AssetHistory)
+@receiver(post_save, sender=AuditSession)
+@receiver(post_save, sender=Compliance)
+def saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        record(sender, [(instance.pk, 'created' if created else 'updated', row(instance))])
+
+
+@receiver(post_delete, sender=Asset)
+@receiver(post_delete, sender=AssetHistory)
+@receiver(post_delete, sender=AuditSession)
+@receiver(post_delete, sender=Compliance)
+def deleted(sender, instance, **kwargs):
+    record(sender, [(instance.pk, 'deleted', row(instance))])
+
+
+def _cleared_key(sender):
+    return f"_outbox_cleared_{sender._meta.db_table}"
+
+
+@receiver(m2m_changed, sender=AuditSession.scanned_assets.through)
+@receiver(m2m_changed, sender=Compliance.assets.through)
+def linked(sender, instance, action, reverse, model, pk_set, **kwargs):
+    owner = Compliance if sender is Compliance.assets.through else AuditSession
+    relation = 'assets' if owner is Compliance else 'scanned_assets'
+    if action == 'pre_clear':
+        # post_clear carries no pk_set: remember which rows the clear removes.
+        field = owner._meta.get_field(relation)
+        source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+        if reverse:
+            source, target = target, source
+        cleared = sender.objects.filter(**{source: instance.pk}).values_list(target, flat=True)
+        setattr(instance, _cleared_key(sender), set(cleared))
+        return
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop(_cleared_key(sender), None)
+    elif action not in ('post_add', 'post_remove'):
+        return
+    if not pk_set:
+        return
+    event = 'linked' if action == 'post_add' else 'unlinked'
+    if not reverse:
+        record(owner, [(instance.pk, event, {'relation': relation, 'ids': sorted(pk_set)})])
+    else:
+        # Changed from the asset side: one event per session or compliance record.
+        record(owner, [(pk, event, {'relation': relation, 'ids': [instance.pk]}) for pk in sorted(pk_set)])
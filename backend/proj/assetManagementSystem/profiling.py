@@ -0,0 +1,73 @@
+import cProfile
+import io
+import marshal
+import sys
+import threading
+from collections import Counter
+
+# Download format per mode: (file extension, content type).
+PROFILE_FORMATS = {
+    'cprofile': ('prof', 'application/octet-stream'),
+    'sample': ('txt', 'text/plain; charset=utf-8'),
+}
+
+
+class CProfileProfiler:
+    """Deterministic profile of the current thread; the result loads with pstats or snakeviz."""
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        # Raises ValueError when another profiler is active (process-wide on Python 3.12+).
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+        self._profile.create_stats()
+        return marshal.dumps(self._profile.stats)
+
+
+class StackSampler:
+    """
+    Samples the current thread's stack from a background thread every
+    ``interval`` seconds. Cheaper than cProfile on long requests; the result
+    is in collapsed-stack format ("frame;frame;frame count") for flame graphs.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._samples = Counter()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._target = None
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_filename}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self._samples[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        out = io.StringIO()
+        for stack, count in self._samples.most_common():
+            out.write(f"{stack} {count}\n")
+        return out.getvalue().encode()
+
+
+def make_profiler(mode, interval):
+    if mode == 'sample':
+        return StackSampler(interval)
+    return CProfileProfiler()
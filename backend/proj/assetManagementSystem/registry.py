@@ -0,0 +1,115 @@
+import copy
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Branch, Category
+
+# Longest a change made in another worker can take to show up (see CACHES in settings).
+REGISTRY_MAX_AGE_SECONDS = 60
+
+
+class _Snapshot:
+    def __init__(self, version, rows):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.rows = rows
+        self.representations = {}
+
+
+class ReferenceRegistry:
+    """
+    Process-local copy of a small, rarely changing table.
+
+    The whole table is loaded on first use and kept until its version in the
+    Django cache changes (bumped on every save or delete) or it gets too old.
+    Lookups return copies, so callers can never alter the shared rows.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._version_key = f"registry:version:{model._meta.label_lower}"
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        # Serializer fields are deep-copied per serializer instance; the registry is shared.
+        return self
+
+    def version(self):
+        return cache.get(self._version_key, 0)
+
+    def _current(self):
+        version = self.version()
+        snapshot = self._snapshot
+        if (snapshot is None or snapshot.version != version
+                or time.monotonic() - snapshot.loaded_at > REGISTRY_MAX_AGE_SECONDS):
+            with self._lock:
+                if self._snapshot is snapshot:
+                    self._snapshot = _Snapshot(version, {obj.pk: obj for obj in self.model._default_manager.all()})
+                snapshot = self._snapshot
+        return snapshot
+
+    def _lookup(self, pk):
+        snapshot = self._current()
+        obj = snapshot.rows.get(pk)
+        if obj is None and self.model._default_manager.filter(pk=pk).exists():
+            # Created in another process since the snapshot was taken.
+            self.reset()
+            snapshot = self._current()
+            obj = snapshot.rows.get(pk)
+        return snapshot, obj
+
+    def get(self, pk, include_deleted=False):
+        obj = self._lookup(pk)[1]
+        if obj is None or (obj.is_deleted and not include_deleted):
+            return None
+        return copy.copy(obj)
+
+    def representation(self, pk, serializer_class):
+        """``serializer_class(obj).data`` for the row ``pk``, built once per snapshot."""
+        snapshot, obj = self._lookup(pk)
+        if obj is None:
+            return None
+        key = (serializer_class, pk)
+        data = snapshot.representations.get(key)
+        if data is None:
+            data = snapshot.representations[key] = dict(serializer_class(obj).data)
+        return dict(data)
+
+    def reset(self):
+        self._snapshot = None
+
+    def invalidate(self):
+        self.reset()
+        try:
+            cache.incr(self._version_key)
+        except ValueError:
+            cache.set(self._version_key, 1, None)
+
+
+branches = ReferenceRegistry(Branch)
+categories = ReferenceRegistry(Category)
+
+
+def _invalidate(registry):
+    registry.reset()
+    # Other processes reload once the change is committed.
+    transaction.on_commit(registry.invalidate)
+
+
+# Covers create, update, soft delete and restore, which all go through save().
+@receiver(post_save, sender=Branch)
+@receiver(post_delete, sender=Branch)
+def branch_changed(sender, **kwargs):
+    _invalidate(branches)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    _invalidate(categories)
@@ -0,0 +1,32 @@
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# DRF escapes these two separators so its output is also valid JavaScript.
+LINE_SEPARATORS = [('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029')]
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer producing the same bytes with orjson. Strings, numbers,
+    dicts and lists are encoded natively; Decimal, dates and times go through
+    DRF's JSONEncoder, whose formats differ from orjson's (datetimes are cut
+    to milliseconds, UTC is written as Z). Indented output
+    (``Accept: application/json; indent=4``) and a missing orjson use the
+    stdlib renderer.
+    """
+    encoder_default = JSONEncoder().default
+    options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=self.encoder_default, option=self.options)
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
@@ -0,0 +1,170 @@
+"""
+PDF documents built with ReportLab. Import this module inside the views that
+use it: ReportLab is slow to import and most processes never render a PDF.
+
+Builders return an open temporary file positioned at the start, so large
+reports are written to disk and streamed by FileResponse rather than held in
+memory. The file is removed when it is closed.
+"""
+import tempfile
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+
+CONTENT_WIDTH = letter[0] - 60
+ASSET_COLUMNS = ["Serial Number", "Description", "Branch", "Category"]
+
+
+def _document(buffer):
+    return SimpleDocTemplate(buffer, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
+
+
+def _add_page_number(canvas, doc):
+    canvas.setFont("Helvetica", 9)
+    canvas.drawRightString(letter[0] - 30, 15, f"Page {canvas.getPageNumber()}")
+
+
+def _build(elements, **kwargs):
+    out = tempfile.TemporaryFile()
+    _document(out).build(elements, **kwargs)
+    out.seek(0)
+    return out
+
+
+def _numbered(elements):
+    return _build(elements, onFirstPage=_add_page_number, onLaterPages=_add_page_number)
+
+
+def _info_table(lines, body_style, vertical_padding=False):
+    table = Table([[Paragraph(line, body_style)] for line in lines], colWidths=[CONTENT_WIDTH])
+    style = [
+        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#cce5ff')),
+        ('BOX', (0, 0), (-1, -1), 0.5, colors.blue),
+        ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.blue),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ]
+    if vertical_padding:
+        style += [
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ]
+    table.setStyle(TableStyle(style))
+    return table
+
+
+def _grid_table(data, col_widths):
+    table = Table(data, colWidths=col_widths)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#003366')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#cce5ff')),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#99ccff')),
+    ]))
+    return table
+
+
+def asset_row(asset):
+    return [
+        asset.asset_serial_number,
+        asset.description or 'N/A',
+        asset.branch.name if asset.branch else 'N/A',
+        asset.category.name if asset.category else 'N/A',
+    ]
+
+
+def sticker_pdf(qr_code_path):
+    return _build([Image(qr_code_path, width=200, height=200, hAlign='CENTER')])
+
+
+def audit_report_pdf(audit_session, summary_text, scanned_assets, missing_assets):
+    """``scanned_assets`` and ``missing_assets`` are iterables of Asset instances."""
+    stylesheet = getSampleStyleSheet()
+    body_style = stylesheet['BodyText']
+    heading_style = stylesheet['Heading2']
+    summary_header_style = ParagraphStyle(
+        'SummaryHeader',
+        parent=stylesheet['Heading2'],
+        fontSize=16,
+        leading=20,
+        alignment=1
+    )
+
+    scanned_data = [["Description", "Serial Number", "Branch", "Category", "Photo"]]
+    for asset in scanned_assets:
+        photo_obj = Paragraph("No Photo", body_style)
+        if asset.photo:
+            try:
+                photo_obj = Image(asset.photo.path, width=50, height=50)
+            except Exception:
+                pass
+        serial_number, description, branch, category = asset_row(asset)
+        scanned_data.append([description, serial_number, branch, category, photo_obj])
+    missing_data = [ASSET_COLUMNS] + [asset_row(asset) for asset in missing_assets]
+
+    return _numbered([
+        Paragraph("Asset Audit Report", stylesheet['Title']),
+        Spacer(1, 20),
+        _info_table([
+            f"<b>Session ID:</b> {audit_session.id}",
+            f"<b>Start Time:</b> {audit_session.start_time.strftime('%Y-%m-%d %H:%M:%S')}",
+            f"<b>End Time:</b> {audit_session.end_time.strftime('%Y-%m-%d %H:%M:%S')}",
+        ], body_style, vertical_padding=True),
+        Spacer(1, 20),
+        Paragraph("Summary:", summary_header_style),
+        Paragraph(summary_text, body_style),
+        Spacer(1, 20),
+        Paragraph("Scanned Assets", heading_style),
+        Spacer(1, 12),
+        _grid_table(scanned_data, [(CONTENT_WIDTH - 50) / 4] * 4 + [50]),
+        Spacer(1, 20),
+        Paragraph("Missing Assets", heading_style),
+        Spacer(1, 12),
+        _grid_table(missing_data, [CONTENT_WIDTH / 4] * 4),
+    ])
+
+
+def compliance_report_pdf(compliance, asset_rows):
+    """``asset_rows`` are [serial number, description, branch, category] lists."""
+    stylesheet = getSampleStyleSheet()
+    body_style = stylesheet['BodyText']
+    return _numbered([
+        Paragraph(f"Compliance Report: {compliance.title}", stylesheet['Title']),
+        Spacer(1, 20),
+        _info_table([
+            f"<b>ID:</b> {compliance.id}",
+            f"<b>Category:</b> {compliance.category}",
+            f"<b>Status:</b> {compliance.status}",
+            f"<b>Score:</b> {compliance.score}",
+            f"<b>Requirements:</b> {compliance.completed}/{compliance.requirements}",
+            f"<b>Last Audit:</b> {compliance.last_audit or 'N/A'}",
+            f"<b>Next Audit:</b> {compliance.next_audit or 'N/A'}",
+            f"<b>Description:</b> {compliance.description or 'N/A'}",
+        ], body_style),
+        Spacer(1, 20),
+        Paragraph("Associated Assets", stylesheet['Heading2']),
+        Spacer(1, 12),
+        _grid_table([ASSET_COLUMNS] + list(asset_rows), [CONTENT_WIDTH / 4] * 4),
+    ])
+
+
+def assignment_agreement_pdf(assignment):
+    stylesheet = getSampleStyleSheet()
+    asset = assignment.asset
+    return _numbered([
+        Paragraph("Asset Assignment Agreement", stylesheet['Title']),
+        Spacer(1, 20),
+        _info_table([
+            f"<b>User:</b> {assignment.user.username}",
+            f"<b>Asset:</b> {asset.asset_serial_number}",
+            f"<b>Assigned Date:</b> {assignment.assigned_date.strftime('%Y-%m-%d %H:%M:%S')}",
+            f"<b>Branch:</b> {asset.branch.name if asset.branch else 'N/A'}",
+            f"<b>Category:</b> {asset.category.name if asset.category else 'N/A'}",
+        ], stylesheet['BodyText']),
+    ])
@@ -0,0 +1,88 @@
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+# Set while a read-only view or report job runs; the router only sends reads to
+# the replica inside such a block, so everything else keeps reading the primary.
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+def replica_alias():
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', 'replica')
+    if alias not in settings.DATABASES:
+        return None
+    replica, primary = connections[alias].settings_dict, connections['default'].settings_dict
+    # A replica pointing at the primary itself (as test mirrors do) would only add a
+    # second connection that cannot see the first one's open transaction.
+    if all(replica.get(key) == primary.get(key) for key in ('NAME', 'HOST', 'PORT')):
+        return None
+    return alias
+
+
+def _pin_key(user_id):
+    return f"db:primary_pin:{user_id}"
+
+
+def pin_to_primary(user):
+    """Route ``user``'s replica reads to the primary until the replica has caught up with their write."""
+    if user is not None and user.is_authenticated and replica_alias():
+        cache.set(_pin_key(user.pk), True, getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 10))
+
+
+def is_pinned(user):
+    return user is not None and user.is_authenticated and cache.get(_pin_key(user.pk), False)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def reads_from_replica(view):
+    """
+    Run a read-only view against the replica. Goes directly above the view
+    function (below @api_view) so the user is already authenticated and a
+    user who just wrote keeps reading their own writes from the primary.
+    Async views must be below the decorator that authenticates the user.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            pinned = await sync_to_async(is_pinned)(getattr(request, 'user', None))
+            with replica_reads(not pinned):
+                return await view(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with replica_reads(not is_pinned(getattr(request, 'user', None))):
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Reads inside replica_reads() go to DATABASE_REPLICA_ALIAS; all writes go to the primary."""
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        databases = {'default', replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -1,35 +1,80 @@
 from rest_framework import serializers
-from .models import Branch, Category, Asset, CustomUser, AuditSession, Compliance, AssetHistory, Attachment
+import decimal
+import os
+from .models import (
+    Branch, Category, Asset, CustomUser, AuditSession, Compliance, AssetHistory, Attachment, AttachmentUpload,
+    OutboxEvent, RequestProfile
+)
 from django.utils import timezone
+from .instrumentation import TimedRepresentationMixin
+from .registry import branches, categories
 
-class BranchSerializer(serializers.ModelSerializer):
+class BranchSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = Branch
         fields = ['id', 'name', 'code', 'is_deleted']
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'code', 'is_deleted']
 
-class UserSerializer(serializers.ModelSerializer):
-    branch = BranchSerializer(read_only=True)
-    branch_id = serializers.PrimaryKeyRelatedField(
-        queryset=Branch.objects.filter(is_deleted=False), source='branch', write_only=True, required=False
+class RegistryRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field validated against a ReferenceRegistry; deleted rows are rejected."""
+
+    def __init__(self, registry, **kwargs):
+        self.registry = registry
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            obj = self.registry.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
+class RegistryNestedField(serializers.Field):
+    """Read-only nested representation of a registry row, identical to ``serializer_class(row).data``."""
+
+    def __init__(self, registry, serializer_class, **kwargs):
+        self.registry = registry
+        self.serializer_class = serializer_class
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, pk):
+        return self.registry.representation(pk, self.serializer_class)
+
+class UserSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    branch = RegistryNestedField(branches, BranchSerializer, source='branch_id')
+    branch_id = RegistryRelatedField(
+        branches, queryset=Branch.objects.filter(is_deleted=False), source='branch', write_only=True, required=False
     )
 
     class Meta:
         model = CustomUser
         fields = ['id', 'username', 'email', 'user_type', 'branch', 'branch_id', 'department']
 
-class AssetSerializer(serializers.ModelSerializer):
-    branch = BranchSerializer(read_only=True)
-    category = CategorySerializer(read_only=True)
-    branch_id = serializers.PrimaryKeyRelatedField(
-        queryset=Branch.objects.filter(is_deleted=False), source='branch', write_only=True
+class EmployeeAssetSummarySerializer(UserSerializer):
+    asset_count = serializers.IntegerField(read_only=True)
+    total_value = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    oldest_assignment = serializers.DateTimeField(read_only=True)
+
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ['asset_count', 'total_value', 'oldest_assignment']
+
+class AssetSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    branch = RegistryNestedField(branches, BranchSerializer, source='branch_id')
+    category = RegistryNestedField(categories, CategorySerializer, source='category_id')
+    branch_id = RegistryRelatedField(
+        branches, queryset=Branch.objects.filter(is_deleted=False), source='branch', write_only=True
     )
-    category_id = serializers.PrimaryKeyRelatedField(
-        queryset=Category.objects.filter(is_deleted=False), source='category', write_only=True
+    category_id = RegistryRelatedField(
+        categories, queryset=Category.objects.filter(is_deleted=False), source='category', write_only=True
     )
     assigned_to = UserSerializer(read_only=True)
     assigned_to_id = serializers.PrimaryKeyRelatedField(
@@ -45,7 +90,97 @@ class AssetSerializer(serializers.ModelSerializer):
             'assigned_to', 'assigned_to_id'
         ]
 
-class AuditSessionSerializer(serializers.ModelSerializer):
+def decimal_formatter(model_field):
+    """DecimalField.to_representation for ``model_field`` with the default COERCE_DECIMAL_TO_STRING."""
+    exponent = decimal.Decimal('.1') ** model_field.decimal_places
+    context = decimal.Context(prec=model_field.max_digits)
+
+    def to_string(value):
+        if value is None:
+            return None
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return '{:f}'.format(value.quantize(exponent, context=context))
+    return to_string
+
+class AssetRowListSerializer(TimedRepresentationMixin, serializers.ListSerializer):
+    # Rows are fetched while the list is built, so the timing covers the whole loop.
+    pass
+
+class AssetRowSerializer(TimedRepresentationMixin, serializers.BaseSerializer):
+    """
+    Read-only fast path for large asset listings: produces AssetSerializer's
+    output from ``values()`` rows (see ``rows()``) without per-field
+    serializer machinery. Use with many=True. AssetSerializer stays the
+    reference; tests.AssetRowSerializerTests checks the output is identical.
+    """
+    ASSET_FIELDS = [
+        'id', 'branch_id', 'category_id', 'asset_serial_number', 'description', 'qr_code',
+        'qr_code_identifier', 'photo', 'status', 'condition', 'purchase_price', 'current_value',
+        'purchase_date', 'vendor', 'next_audit_date',
+    ]
+    USER_FIELDS = ['id', 'username', 'email', 'user_type', 'branch_id', 'department']
+
+    class Meta:
+        list_serializer_class = AssetRowListSerializer
+
+    qr_code_storage = Asset._meta.get_field('qr_code').storage
+    photo_storage = Asset._meta.get_field('photo').storage
+    purchase_price = staticmethod(decimal_formatter(Asset._meta.get_field('purchase_price')))
+    current_value = staticmethod(decimal_formatter(Asset._meta.get_field('current_value')))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # One registry lookup per branch and category for the whole listing.
+        self._related = {}
+
+    @classmethod
+    def rows(cls, assets, *extra_fields):
+        return assets.values(*cls.ASSET_FIELDS, *extra_fields, *(f'assigned_to__{field}' for field in cls.USER_FIELDS))
+
+    def related(self, registry, serializer_class, pk):
+        key = (serializer_class, pk)
+        if key not in self._related:
+            self._related[key] = registry.representation(pk, serializer_class)
+        return self._related[key]
+
+    def file_url(self, storage, name):
+        if not name:
+            return None
+        url = storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+    def to_representation(self, row):
+        purchase_date, next_audit_date = row['purchase_date'], row['next_audit_date']
+        user_id, user_branch_id = row['assigned_to__id'], row['assigned_to__branch_id']
+        return {
+            'id': row['id'],
+            'branch': self.related(branches, BranchSerializer, row['branch_id']),
+            'category': self.related(categories, CategorySerializer, row['category_id']),
+            'asset_serial_number': row['asset_serial_number'],
+            'description': row['description'],
+            'qr_code': self.file_url(self.qr_code_storage, row['qr_code']),
+            'qr_code_identifier': row['qr_code_identifier'],
+            'photo': self.file_url(self.photo_storage, row['photo']),
+            'status': row['status'],
+            'condition': row['condition'],
+            'purchase_price': self.purchase_price(row['purchase_price']),
+            'current_value': self.current_value(row['current_value']),
+            'purchase_date': purchase_date.isoformat() if purchase_date else None,
+            'vendor': row['vendor'],
+            'next_audit_date': next_audit_date.isoformat() if next_audit_date else None,
+            'assigned_to': None if user_id is None else {
+                'id': user_id,
+                'username': row['assigned_to__username'],
+                'email': row['assigned_to__email'],
+                'user_type': row['assigned_to__user_type'],
+                'branch': None if user_branch_id is None else self.related(branches, BranchSerializer, user_branch_id),
+                'department': row['assigned_to__department'],
+            },
+        }
+
+class AuditSessionSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     scanned_assets = AssetSerializer(many=True, read_only=True)
     created_by = UserSerializer(read_only=True)
 
@@ -53,7 +188,7 @@ class AuditSessionSerializer(serializers.ModelSerializer):
         model = AuditSession
         fields = ['id', 'start_time', 'end_time', 'scanned_assets', 'created_by']
 
-class ComplianceSerializer(serializers.ModelSerializer):
+class ComplianceSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     assets = AssetSerializer(many=True, read_only=True)
     asset_ids = serializers.PrimaryKeyRelatedField(
         many=True, queryset=Asset.objects.all(), source='assets', write_only=True, required=False
@@ -66,7 +201,18 @@ class ComplianceSerializer(serializers.ModelSerializer):
             'requirements', 'completed', 'description', 'assets', 'asset_ids'
         ]
 
-class AssetHistorySerializer(serializers.ModelSerializer):
+class ComplianceSummarySerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    asset_count = serializers.IntegerField(read_only=True)
+    total_value = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = Compliance
+        fields = [
+            'id', 'title', 'category', 'status', 'last_audit', 'next_audit', 'score',
+            'requirements', 'completed', 'description', 'asset_count', 'total_value'
+        ]
+
+class AssetHistorySerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     asset = AssetSerializer(read_only=True)
     user = UserSerializer(read_only=True)
     asset_id = serializers.PrimaryKeyRelatedField(
@@ -80,7 +226,7 @@ class AssetHistorySerializer(serializers.ModelSerializer):
         model = AssetHistory
         fields = ['id', 'asset', 'asset_id', 'user', 'user_id', 'assigned_date', 'unassigned_date']
 
-class AttachmentSerializer(serializers.ModelSerializer):
+class AttachmentSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     assignment = AssetHistorySerializer(read_only=True)
     assignment_id = serializers.PrimaryKeyRelatedField(
         queryset=AssetHistory.objects.all(), source='assignment', write_only=True
@@ -88,4 +234,90 @@ class AttachmentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Attachment
-        fields = ['id', 'assignment', 'assignment_id', 'file', 'file_type']
\ No newline at end of file
+        fields = ['id', 'assignment', 'assignment_id', 'file', 'file_type']
+
+class AttachmentUploadSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    assignment_id = serializers.PrimaryKeyRelatedField(
+        queryset=AssetHistory.objects.all(), source='assignment', write_only=True
+    )
+
+    class Meta:
+        model = AttachmentUpload
+        fields = ['id', 'assignment_id', 'filename', 'size', 'offset', 'created_at']
+        read_only_fields = ['offset', 'created_at']
+
+    def validate_filename(self, value):
+        filename = os.path.basename(value)
+        if not filename:
+            raise serializers.ValidationError('A file name is required')
+        return filename
+
+    def validate_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('Size must be positive')
+        return value
+
+class AssignmentCreateSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField()
+    asset_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+class BulkAssignmentSerializer(serializers.Serializer):
+    SELECTORS = ['asset_ids', 'user_id', 'branch_id', 'category_id']
+
+    action = serializers.ChoiceField(choices=['unassign', 'reassign', 'transfer'])
+    asset_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    user_id = serializers.IntegerField(required=False)
+    branch_id = serializers.IntegerField(required=False)
+    category_id = serializers.IntegerField(required=False)
+    to_user_id = serializers.PrimaryKeyRelatedField(
+        queryset=CustomUser.objects.all(), source='to_user', required=False
+    )
+    to_branch_id = RegistryRelatedField(
+        branches, queryset=Branch.objects.filter(is_deleted=False), source='to_branch', required=False
+    )
+
+    def validate(self, data):
+        selectors = [key for key in self.SELECTORS if key in data]
+        if len(selectors) != 1:
+            raise serializers.ValidationError(f"Provide exactly one selector: {', '.join(self.SELECTORS)}")
+        if data['action'] == 'reassign' and 'to_user' not in data:
+            raise serializers.ValidationError({'to_user_id': 'Required for reassign'})
+        if data['action'] == 'transfer' and 'to_branch' not in data:
+            raise serializers.ValidationError({'to_branch_id': 'Required for transfer'})
+        return data
+
+class AssetPatchSerializer(serializers.ModelSerializer):
+    """Fields a bulk update may set. None of them feed the serial number or QR code."""
+    class Meta:
+        model = Asset
+        fields = ['description', 'status', 'condition', 'purchase_price', 'current_value', 'vendor', 'next_audit_date']
+
+class BulkAssetUpdateSerializer(serializers.Serializer):
+    FILTERS = ['asset_ids', 'branch_id', 'category_id', 'status', 'vendor']
+
+    asset_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    branch_id = serializers.IntegerField(required=False)
+    category_id = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Asset.STATUS_CHOICES, required=False)
+    vendor = serializers.CharField(required=False)
+    patch = AssetPatchSerializer()
+
+    def validate_patch(self, value):
+        if not value:
+            raise serializers.ValidationError('Provide at least one field to update')
+        return value
+
+    def validate(self, data):
+        if not any(key in data for key in self.FILTERS):
+            raise serializers.ValidationError(f"Provide at least one filter: {', '.join(self.FILTERS)}")
+        return data
+
+class RequestProfileSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    class Meta:
+        model = RequestProfile
+        exclude = ['data']
+
+class OutboxEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OutboxEvent
+        fields = ['id', 'created_at', 'aggregate', 'aggregate_id', 'event', 'payload']
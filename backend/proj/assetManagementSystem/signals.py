@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent after set-based writes that bypass Asset.save() (and so post_save).
+# Receivers get ``branch_ids``: the branches whose assets were touched.
+assets_bulk_changed = Signal()
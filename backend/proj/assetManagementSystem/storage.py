@@ -0,0 +1,131 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores each distinct file once under ``cas/<aa>/<bb>/<sha256><ext>``.
+
+    ``StoredBlob`` keeps a reference count per stored file: saving identical
+    content only bumps the count, and the bytes are removed when the last
+    reference is deleted.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content in _save().
+        return name
+
+    def _digest(self, content):
+        digest = getattr(content, 'sha256', None)
+        if digest:
+            return digest
+        hasher = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        return hasher.hexdigest()
+
+    def _write(self, name, content):
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        if hasattr(content, 'temporary_file_path'):
+            os.replace(content.temporary_file_path(), full_path)
+        else:
+            # Write to a temp file and rename, so concurrent writers of the same blob cannot clash.
+            fd, tmp_path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, 'wb') as fh:
+                for chunk in content.chunks():
+                    fh.write(chunk)
+            os.replace(tmp_path, full_path)
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+
+    def _save(self, name, content):
+        from .models import StoredBlob
+
+        digest = self._digest(content)
+        extension = os.path.splitext(name)[1].lower()
+        name = f"cas/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+        with transaction.atomic():
+            blob, created = StoredBlob.objects.select_for_update().get_or_create(
+                name=name, defaults={'size': content.size}
+            )
+            if created or not self.exists(name):
+                self._write(name, content)
+            StoredBlob.objects.filter(name=name).update(refcount=F('refcount') + 1)
+        return name
+
+    def delete(self, name):
+        from .models import StoredBlob
+
+        if not name:
+            raise ValueError("The name must be given to delete().")
+        with transaction.atomic():
+            if StoredBlob.objects.filter(name=name, refcount__gt=1).update(refcount=F('refcount') - 1):
+                return
+            StoredBlob.objects.filter(name=name).delete()
+            transaction.on_commit(lambda: self._unlink(name))
+
+    def _unlink(self, name):
+        from .models import StoredBlob
+
+        # A concurrent _save() may have stored the same content again since the row was
+        # deleted. Holding a placeholder row blocks it until the file is gone; files saved
+        # before content addressing have no row at all and are removed the same way.
+        with transaction.atomic():
+            blob, created = StoredBlob.objects.select_for_update().get_or_create(name=name, defaults={'size': 0})
+            if created or not blob.refcount:
+                super().delete(name)
+                blob.delete()
+
+
+cas_storage = ContentAddressedStorage()
+
+
+def content_addressed_storage():
+    return cas_storage
+
+
+@receiver(post_delete, sender='assetManagementSystem.Attachment')
+def release_attachment_file(sender, instance, **kwargs):
+    if instance.file:
+        instance.file.delete(save=False)
+
+
+@receiver(post_delete, sender='assetManagementSystem.Asset')
+def release_asset_photo(sender, instance, **kwargs):
+    if instance.photo:
+        instance.photo.delete(save=False)
+
+
+def _release_replaced(sender, instance, field_name, update_fields):
+    if instance._state.adding or (update_fields is not None and field_name not in update_fields):
+        return
+    previous = sender._default_manager.filter(pk=instance.pk).values_list(field_name, flat=True).first()
+    if previous and previous != getattr(instance, field_name).name:
+        # Released once the new row is committed; a failed save keeps the old file.
+        storage = sender._meta.get_field(field_name).storage
+        transaction.on_commit(lambda: storage.delete(previous))
+
+
+@receiver(pre_save, sender='assetManagementSystem.Attachment')
+def release_replaced_attachment_file(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        _release_replaced(sender, instance, 'file', update_fields)
+
+
+@receiver(pre_save, sender='assetManagementSystem.Asset')
+def release_replaced_asset_photo(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        _release_replaced(sender, instance, 'photo', update_fields)
@@ -0,0 +1,109 @@
+"""
+Change feed for offline clients (``/assets/changes/``).
+
+Every asset write takes the next value of the ASSET_CHANGES counter as the
+asset's ``version``; assets that leave a branch, by deletion or transfer,
+leave an AssetTombstone with the version of that write. The counter row is
+locked until the writing transaction commits, so a client that has seen
+every change up to version N will never later see a new change at or below
+N. A page only covers versions up to the counter value read before its
+queries, so changes committed while it is assembled are left for the next
+page rather than skipped. Sync tokens encode the position
+``(version, kind, id)`` of the last change a client received.
+"""
+from django.db.models import Q
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Asset, AssetHistory, AssetTombstone, ChangeCounter, CustomUser, ASSET_CHANGES
+from .outbox import record_rows
+
+TOMBSTONE, UPSERT = 0, 1
+
+
+def versioned(**fields):
+    """
+    ``update()`` kwargs for set-based asset writes, which skip Asset.save().
+    Call inside the writing transaction.
+    """
+    return dict(fields, version=ChangeCounter.next(ASSET_CHANGES), updated_at=timezone.now())
+
+
+def format_token(position):
+    return '.'.join(str(part) for part in position)
+
+
+def parse_token(token):
+    """Return the position encoded in ``token``; raises ValueError if malformed."""
+    version, kind, pk = (int(part) for part in token.split('.'))
+    if kind not in (TOMBSTONE, UPSERT):
+        raise ValueError(token)
+    return version, kind, pk
+
+
+def after(position, kind):
+    """Filter for changes of ``kind`` that sort after ``position``."""
+    version, position_kind, pk = position
+    later = Q(version__gt=version)
+    if kind > position_kind:
+        later |= Q(version=version)
+    elif kind == position_kind:
+        later |= Q(version=version, id__gt=pk)
+    return later
+
+
+def changes_page(rows, tombstones, position, limit):
+    """
+    Merge ``rows`` (asset ``values()`` including ``version``) and
+    ``tombstones`` after ``position`` into one page of at most ``limit``
+    changes. A full sync (``position`` None) skips tombstones. Returns
+    ``(rows, deleted_asset_ids, next_position, has_more)``.
+    """
+    ceiling = ChangeCounter.objects.filter(name=ASSET_CHANGES).values_list('value', flat=True).first() or 0
+    rows = rows.filter(version__lte=ceiling)
+    tombstones = tombstones.filter(version__lte=ceiling)
+    if position is not None:
+        rows = rows.filter(after(position, UPSERT))
+        tombstones = tombstones.filter(after(position, TOMBSTONE))
+    changes = [((row['version'], UPSERT, row['id']), row) for row in rows.order_by('version', 'id')[:limit + 1]]
+    if position is not None:
+        changes += [
+            ((tombstone['version'], TOMBSTONE, tombstone['id']), tombstone)
+            for tombstone in tombstones.order_by('version', 'id').values('id', 'version', 'asset_id')[:limit + 1]
+        ]
+    changes.sort(key=lambda change: change[0])
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    page_rows = [change for key, change in changes if key[1] == UPSERT]
+    # An asset that left the branch and came back within this page only needs its upsert.
+    current = {row['id'] for row in page_rows}
+    deleted = list(dict.fromkeys(
+        change['asset_id'] for key, change in changes if key[1] == TOMBSTONE and change['asset_id'] not in current
+    ))
+    next_position = changes[-1][0] if changes else position
+    return page_rows, deleted, next_position, has_more
+
+
+@receiver(post_delete, sender=Asset)
+def asset_deleted(sender, instance, **kwargs):
+    # Runs inside the deletion's transaction.
+    AssetTombstone.objects.create(
+        asset_id=instance.pk, branch_id=instance.branch_id,
+        version=ChangeCounter.next(ASSET_CHANGES), reason=AssetTombstone.DELETED
+    )
+
+
+@receiver(pre_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    # on_delete=SET_NULL would clear these rows without a version or an outbox
+    # event, so clear them first, inside the deletion's transaction.
+    asset_ids = list(Asset.objects.filter(assigned_to=instance).values_list('id', flat=True))
+    if asset_ids:
+        Asset.objects.filter(id__in=asset_ids).update(**versioned(assigned_to=None))
+        record_rows(Asset, asset_ids)
+    assignment_ids = list(AssetHistory.objects.filter(user=instance).values_list('id', flat=True))
+    if assignment_ids:
+        AssetHistory.objects.filter(id__in=assignment_ids).update(user=None)
+        record_rows(AssetHistory, assignment_ids)
@@ -1,3 +1,1074 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import uuid
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from decimal import Decimal
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from . import events
+from .authentication import issue_tokens
+from .middleware import ReplicaStickinessMiddleware, ServerTimingMiddleware
+from .models import (
+    ASSET_CHANGES, Asset, AssetHistory, Attachment, AuditSession, Branch, Category, ChangeCounter, Compliance, CustomUser,
+    OutboxEvent, RequestProfile, StoredBlob
+)
+from .registry import ReferenceRegistry, branches, categories
+from .renderers import ORJSONRenderer
+from .routers import ReplicaRouter, reads_from_replica, replica_alias, replica_reads
+from .serializers import AssetRowSerializer, AssetSerializer
+from .storage import cas_storage
+
+HOT_TABLES = {Asset._meta.db_table, AssetHistory._meta.db_table, Compliance._meta.db_table}
+
+# Importing pandas and ReportLab at startup took about 1.2s and 105 MiB on Linux.
+# The budgets depend on the runner, so they can be raised per environment.
+STARTUP_BUDGET_SECONDS = float(os.environ.get('STARTUP_BUDGET_SECONDS', '2.0'))
+STARTUP_BUDGET_RSS_MIB = float(os.environ.get('STARTUP_BUDGET_RSS_MIB', '80'))
+LAZY_MODULES = ['pandas', 'reportlab']
+STARTUP_SCRIPT = '''
+import json, resource, sys, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+import assetManagementSystem.urls
+print(json.dumps({
+    'seconds': time.perf_counter() - start,
+    'rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'loaded': [name for name in %r if name in sys.modules],
+}))
+'''
+
+
+def create_assets(branch, category, count, **fields):
+    # bulk_create skips Asset.save(), so no QR images are rendered.
+    start = Asset.objects.count()
+    return Asset.objects.bulk_create([
+        Asset(
+            branch=branch,
+            category=category,
+            asset_serial_number=f'{branch.code}-{category.code}-{start + index:06d}',
+            qr_code_identifier=str(uuid.uuid4()),
+            **fields
+        )
+        for index in range(count)
+    ])
+
+
+def full_scans(sql):
+    """Return the hot tables that ``sql`` reads with a full table scan."""
+    aliases = {alias: table for table, alias in re.findall(r'"(\w+)" (?:AS )?(U\d+|T\d+|V\d+)', sql)}
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            details = [row[-1] for row in cursor.fetchall()]
+            scanned = [match.group(1) for detail in details if (match := re.match(r'SCAN (\w+)', detail))]
+        else:
+            # Small test tables make a sequential scan the cheapest plan; only accept it
+            # when no usable index exists.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql)
+            scanned = re.findall(r'Seq Scan on (\w+)(?: (\w+))?', '\n'.join(row[0] for row in cursor.fetchall()))
+            scanned = [alias or table for table, alias in scanned]
+    return sorted({aliases.get(name, name) for name in scanned} & HOT_TABLES)
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class HotQueryPlanTests(TestCase):
+    """EXPLAIN every query issued by the hot views and fail on full scans of the large tables."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.create(name='Main Branch', code='MB')
+        cls.other_branch = Branch.objects.create(name='North Branch', code='NB')
+        cls.category = Category.objects.create(name='Electronics', code='EL')
+        cls.admin = CustomUser.objects.create_user('admin', password='x', user_type='Admin', is_staff=True)
+        cls.branch_user = CustomUser.objects.create_user('basic', password='x', user_type='Basic', branch=cls.branch)
+        cls.auditor = CustomUser.objects.create_user('auditor', password='x', user_type='Auditor', branch=cls.branch)
+        cls.employee = CustomUser.objects.create_user('employee', password='x', branch=cls.branch, department='HR')
+
+        today = timezone.now().date()
+        assets = create_assets(cls.branch, cls.category, 20, next_audit_date=today, current_value=100)
+        create_assets(cls.other_branch, cls.category, 20, status='Retired')
+        AssetHistory.objects.bulk_create([AssetHistory(asset=asset, user=cls.employee) for asset in assets[:5]])
+        Asset.objects.filter(id__in=[asset.id for asset in assets[:5]]).update(assigned_to=cls.employee)
+        compliance = Compliance.objects.create(
+            id='COMP-001', title='Data retention', category='Privacy', status='Compliant', next_audit=today
+        )
+        compliance.assets.add(*assets[:3])
+        cls.asset = assets[0]
+
+    def assertIndexedQueries(self, user, method, path, data=None):
+        client = APIClient()
+        client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as captured:
+            response = getattr(client, method)(path, data, format='json')
+            if hasattr(response, 'streaming_content'):
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400, getattr(response, 'data', None))
+        selects = [query['sql'] for query in captured.captured_queries if query['sql'].startswith('SELECT')]
+        self.assertTrue(selects, f'{path} issued no SELECT queries')
+        for sql in selects:
+            self.assertEqual(full_scans(sql), [], f'Full table scan in {method.upper()} {path}:\n{sql}')
+
+    def test_branch_asset_list_by_status(self):
+        self.assertIndexedQueries(self.branch_user, 'get', '/assets/', {'status': 'Active'})
+
+    def test_branch_asset_list_by_category(self):
+        self.assertIndexedQueries(self.branch_user, 'get', '/assets/', {'category': self.category.id})
+
+    def test_branch_dashboard_assets(self):
+        client = APIClient()
+        client.force_authenticate(self.branch_user)
+        with CaptureQueriesContext(connection) as captured:
+            client.get('/dashboard/')
+        asset_queries = [query['sql'] for query in captured.captured_queries if Asset._meta.db_table in query['sql']]
+        for sql in asset_queries:
+            self.assertEqual(full_scans(sql), [], sql)
+
+    def test_branch_analytics(self):
+        for path in ['/analytics/asset-status/', '/analytics/ownership-changes/',
+                     '/analytics/category-distribution/', '/analytics/utilization-rate/',
+                     '/analytics/depreciation/', '/analytics/metrics/']:
+            with self.subTest(path=path):
+                self.assertIndexedQueries(self.branch_user, 'get', path)
+
+    def test_audit_tasks(self):
+        self.assertIndexedQueries(self.auditor, 'get', '/audit/tasks/')
+
+    def test_compliance_timeline(self):
+        self.assertIndexedQueries(self.auditor, 'get', '/compliance/timeline/')
+
+    def test_employees_with_assets(self):
+        self.assertIndexedQueries(self.admin, 'get', '/assignments/employees/')
+
+    def test_bulk_unassign_by_user(self):
+        self.assertIndexedQueries(self.admin, 'post', '/assignments/bulk/', {
+            'action': 'unassign', 'user_id': self.employee.id
+        })
+
+    def test_asset_custody_as_of(self):
+        self.assertIndexedQueries(self.admin, 'get', f'/custody/assets/{self.asset.id}/', {
+            'at': timezone.now().isoformat()
+        })
+
+    def test_user_custody_range(self):
+        self.assertIndexedQueries(self.admin, 'get', f'/custody/users/{self.employee.id}/', {
+            'start': '2020-01-01', 'end': timezone.now().isoformat()
+        })
+
+
+def aware(*args):
+    return timezone.make_aware(datetime.datetime(*args))
+
+
+def backdated_assignment(asset, user, assigned_date, unassigned_date=None):
+    # assigned_date is auto_now_add, so it is set with an update afterwards.
+    row = AssetHistory.objects.create(asset=asset, user=user, unassigned_date=unassigned_date)
+    AssetHistory.objects.filter(id=row.id).update(assigned_date=assigned_date)
+    return row
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class CustodyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        branch = Branch.objects.create(name='Main Branch', code='MB')
+        cls.laptop, cls.phone = create_assets(branch, Category.objects.create(name='Electronics', code='EL'), 2)
+        cls.admin = CustomUser.objects.create_user('admin', password='x', is_staff=True)
+        cls.first = CustomUser.objects.create_user('first', password='x', branch=branch)
+        second = CustomUser.objects.create_user('second', password='x', branch=branch)
+        cls.history = {}
+        for name, asset, user, assigned, unassigned in [
+            ('first_laptop', cls.laptop, cls.first, aware(2024, 1, 1), aware(2024, 3, 1)),
+            ('second_laptop', cls.laptop, second, aware(2024, 3, 1), None),
+            ('first_phone', cls.phone, cls.first, aware(2024, 2, 1), aware(2024, 2, 15)),
+        ]:
+            cls.history[name] = backdated_assignment(asset, user, assigned, unassigned).id
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def custody(self, path, **params):
+        response = self.client.get(path, params)
+        self.assertEqual((response.status_code, response['Content-Type']), (200, 'application/json'))
+        return json.loads(b''.join(response.streaming_content))
+
+    def ids(self, path, **params):
+        return [row['id'] for row in self.custody(path, **params)]
+
+    def test_asset_as_of(self):
+        laptop = f'/custody/assets/{self.laptop.id}/'
+        self.assertEqual(self.ids(laptop, at='2023-12-31'), [])
+        self.assertEqual(self.ids(laptop, at='2024-02-01'), [self.history['first_laptop']])
+        # The handover instant belongs to the new holder only.
+        self.assertEqual(self.ids(laptop, at='2024-03-01'), [self.history['second_laptop']])
+        self.assertEqual(self.ids(laptop, at='2030-01-01'), [self.history['second_laptop']])
+        # The latest assignment before `at` was already closed.
+        self.assertEqual(self.ids(f'/custody/assets/{self.phone.id}/', at='2024-02-20'), [])
+
+    def test_user_range_overlap(self):
+        user = f'/custody/users/{self.first.id}/'
+        self.assertEqual(
+            self.ids(user, start='2024-02-10', end='2024-02-20'), [self.history['first_laptop'], self.history['first_phone']]
+        )
+        self.assertEqual(self.ids(user, start='2024-02-15', end='2024-02-20'), [self.history['first_laptop']])
+        self.assertEqual(self.ids(user, start='2024-03-01', end='2024-04-01'), [])
+        self.assertEqual(self.ids(user, start='2023-01-01', end='2023-12-31'), [])
+
+    def test_row_shape(self):
+        rows = self.custody(f'/custody/users/{self.first.id}/')
+        self.assertEqual(rows[0], {
+            'id': self.history['first_laptop'], 'asset_id': self.laptop.id, 'user_id': self.first.id,
+            'assigned_date': '2024-01-01T00:00:00Z', 'unassigned_date': '2024-03-01T00:00:00Z',
+            'asset_serial_number': self.laptop.asset_serial_number, 'username': 'first',
+        })
+        self.assertEqual(len(rows), 2)
+
+    def test_invalid_ranges(self):
+        for params in ({'start': '2024-03-01', 'end': '2024-02-01'}, {'at': 'yesterday'}, {'start': '2024-13-01'}):
+            with self.subTest(params=params):
+                response = self.client.get(f'/custody/users/{self.first.id}/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class EmployeeAssetsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        branch = Branch.objects.create(name='Main Branch', code='MB')
+        category = Category.objects.create(name='Electronics', code='EL')
+        cls.admin = CustomUser.objects.create_user('admin', password='x', is_staff=True)
+        cls.alice = CustomUser.objects.create_user('alice', password='x', branch=branch, department='HR')
+        cls.bob = CustomUser.objects.create_user('bob', password='x', branch=branch, department='IT')
+        CustomUser.objects.create_user('carol', password='x', branch=branch, department='HR')
+        for user, values, dates in [
+            (cls.alice, ['100.00', '200.00', '50.25'], [aware(2024, 2, 1), aware(2024, 1, 5), aware(2024, 3, 1)]),
+            (cls.bob, ['500.00'], [aware(2024, 3, 1)]),
+        ]:
+            for value, assigned in zip(values, dates):
+                asset = create_assets(branch, category, 1, assigned_to=user, current_value=Decimal(value))[0]
+                backdated_assignment(asset, user, assigned)
+        # A closed, older assignment does not count towards oldest_assignment.
+        backdated_assignment(asset, cls.alice, aware(2023, 1, 1), aware(2023, 6, 1))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def employees(self, **params):
+        response = self.client.get('/assignments/employees/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_totals(self):
+        rows = {row['username']: row for row in self.employees()['results']}
+        self.assertEqual(list(rows), ['alice', 'bob'])
+        self.assertEqual(
+            [(row['asset_count'], row['total_value'], row['oldest_assignment']) for row in rows.values()],
+            [(3, '350.25', '2024-01-05T00:00:00Z'), (1, '500.00', '2024-03-01T00:00:00Z')]
+        )
+
+    def test_pagination_and_ordering(self):
+        page = self.employees(ordering='-asset_count', page_size=1)
+        self.assertEqual((page['count'], page['previous']), (2, None))
+        self.assertIn('page=2', page['next'])
+        self.assertEqual([row['username'] for row in page['results']], ['alice'])
+        self.assertEqual([row['username'] for row in self.employees(ordering='-total_value')['results']], ['bob', 'alice'])
+        self.assertEqual([row['username'] for row in self.employees(department='HR')['results']], ['alice'])
+
+        for ordering in ('password', '-email'):
+            response = self.client.get('/assignments/employees/', {'ordering': ordering})
+            self.assertEqual(response.status_code, 400, ordering)
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class ComplianceAssetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        branch = Branch.objects.create(name='Main Branch', code='MB')
+        category = Category.objects.create(name='Electronics', code='EL')
+        cls.auditor = CustomUser.objects.create_user('auditor', password='x', user_type='Auditor', branch=branch)
+        cls.assets = [
+            create_assets(branch, category, 1, current_value=Decimal(value))[0] for value in ('10.00', '20.00', '30.50')
+        ]
+        next_audit = timezone.now().date()
+        cls.covered = Compliance.objects.create(
+            id='COMP-001', title='Data retention', category='Privacy', status='Compliant', next_audit=next_audit
+        )
+        cls.covered.assets.add(*cls.assets)
+        Compliance.objects.create(
+            id='COMP-002', title='Disposal', category='Environmental', status='Compliant', next_audit=next_audit
+        ).assets.add(cls.assets[0])
+        Compliance.objects.create(id='COMP-003', title='Encryption', category='Security', status='Non-Compliant', next_audit=next_audit)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.auditor)
+
+    def test_asset_totals(self):
+        expected = [('COMP-001', 3, '60.50'), ('COMP-002', 1, '10.00'), ('COMP-003', 0, None)]
+        for path in ('/compliance/', '/compliance/timeline/'):
+            rows = sorted(self.client.get(path).json(), key=lambda row: row['id'])
+            self.assertEqual([(row['id'], row['asset_count'], row['total_value']) for row in rows], expected, path)
+
+    def test_asset_pages(self):
+        first = self.client.get('/compliance/COMP-001/assets/', {'page_size': 2}).json()
+        self.assertEqual((first['count'], first['previous']), (3, None))
+        second = self.client.get(first['next']).json()
+        self.assertIsNone(second['next'])
+        self.assertEqual(
+            [asset['id'] for asset in first['results'] + second['results']], [asset.id for asset in self.assets]
+        )
+        self.assertEqual(self.client.get('/compliance/COMP-003/assets/').json()['results'], [])
+        self.assertEqual(self.client.get('/compliance/COMP-404/assets/').status_code, 404)
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class AssetRowSerializerTests(TestCase):
+    """The values()-based fast path must render byte for byte like AssetSerializer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        branch = Branch.objects.create(name='Main Branch', code='MB')
+        other_branch = Branch.objects.create(name='North Branch', code='NB', is_deleted=True)
+        category = Category.objects.create(name='Furniture', code='FU')
+        cls.admin = CustomUser.objects.create_user('admin', password='x', user_type='Admin', is_staff=True, is_superuser=True)
+        holder = CustomUser.objects.create_user('holder', email='h@example.com', password='x', branch=branch, department='HR')
+        drifter = CustomUser.objects.create_user('drifter', password='x')
+        today = timezone.now().date()
+        create_assets(
+            branch, category, 1, description='Desk \u00e9\u2028"quoted"', qr_code='qr_codes/qr_MB-FU.png',
+            photo='cas/ab/abcdef.jpg', purchase_price=Decimal('1234.5'), current_value=Decimal('0.10'),
+            purchase_date=today, next_audit_date=today, vendor='Acme', assigned_to=holder,
+        )
+        create_assets(other_branch, category, 1, description=None, status='Retired', condition='Poor', assigned_to=drifter)
+        create_assets(branch, category, 1, description='', purchase_price=Decimal('99999999.99'), current_value=Decimal('0'))
+
+    def test_matches_asset_serializer(self):
+        request = APIRequestFactory().get('/assets/')
+        for context in [{}, {'request': request}]:
+            with self.subTest(context=bool(context)):
+                expected = JSONRenderer().render(AssetSerializer(Asset.objects.all(), many=True, context=context).data)
+                rows = AssetRowSerializer(AssetRowSerializer.rows(Asset.objects.all()), many=True, context=context).data
+                self.assertEqual(JSONRenderer().render(rows), expected)
+                self.assertEqual(ORJSONRenderer().render(rows), expected)
+
+    def test_asset_list_response(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        expected = JSONRenderer().render(AssetSerializer(Asset.objects.all(), many=True).data)
+        self.assertEqual(client.get('/assets/').content, expected)
+
+    def test_renderer_matches_json_renderer(self):
+        data = {
+            'decimal': Decimal('12.50'), 'date': timezone.now().date(), 'datetime': timezone.now(),
+            'uuid': uuid.uuid4(), 1: [None, True, 1.5, 'x\u2029y'], 'nested': {'set': {1}},
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class ReferenceRegistryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for registry in (branches, categories):
+            registry.reset()
+            self.addCleanup(registry.reset)
+
+    def test_saves_and_restores_invalidate(self):
+        for registry, obj in [
+            (branches, Branch.objects.create(name='Main Branch', code='MB')),
+            (categories, Category.objects.create(name='Furniture', code='FU')),
+        ]:
+            with self.subTest(model=registry.model.__name__):
+                # Another worker's copy only learns about changes through the cached version.
+                other_worker = ReferenceRegistry(registry.model)
+                self.assertEqual((registry.get(obj.pk).code, other_worker.get(obj.pk).code), (obj.code, obj.code))
+                with self.captureOnCommitCallbacks(execute=True):
+                    obj.is_deleted = True
+                    obj.save()
+                self.assertEqual((registry.get(obj.pk), other_worker.get(obj.pk)), (None, None))
+                self.assertTrue(other_worker.get(obj.pk, include_deleted=True).is_deleted)
+                with self.captureOnCommitCallbacks(execute=True):
+                    obj.is_deleted = False
+                    obj.save()
+                self.assertEqual((registry.get(obj.pk).code, other_worker.get(obj.pk).code), (obj.code, obj.code))
+
+    def test_asset_serializer_reads_registries(self):
+        branch = Branch.objects.create(name='Main Branch', code='MB')
+        category = Category.objects.create(name='Furniture', code='FU')
+        holder = CustomUser.objects.create_user('holder', password='x', branch=branch)
+        asset = create_assets(branch, category, 1, assigned_to=holder)[0]
+        asset = Asset.objects.select_related('assigned_to').get(pk=asset.pk)
+        branches.get(branch.pk)
+        categories.get(category.pk)
+
+        with CaptureQueriesContext(connection) as captured:
+            serializer = AssetSerializer(data={
+                'branch_id': branch.pk, 'category_id': category.pk, 'asset_serial_number': 'MB-FU-NEW',
+                'qr_code_identifier': str(uuid.uuid4()),
+            })
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            data = AssetSerializer(asset).data
+        self.assertEqual((serializer.validated_data['branch'], serializer.validated_data['category']), (branch, category))
+        self.assertEqual((data['branch']['code'], data['category']['code']), ('MB', 'FU'))
+        self.assertEqual(data['assigned_to']['branch']['code'], 'MB')
+        tables = [f'"{model._meta.db_table}"' for model in (Branch, Category)]
+        self.assertEqual([query['sql'] for query in captured if any(table in query['sql'] for table in tables)], [])
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class AssetChangesTests(TestCase):
+    """/assets/changes/ pages through upserts and removals since a sync token."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.main = Branch.objects.create(name='Main Branch', code='MB')
+        cls.north = Branch.objects.create(name='North Branch', code='NB')
+        category = Category.objects.create(name='Furniture', code='FU')
+        cls.admin = CustomUser.objects.create_user('admin', password='x', user_type='Admin', is_staff=True, is_superuser=True)
+        cls.assets = create_assets(cls.main, category, 3)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def sync(self, since=None, **params):
+        if since:
+            params['since'] = since
+        response = self.client.get('/assets/changes/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_incremental_sync(self):
+        first = self.sync(page_size=2)
+        second = self.sync(first['next'], page_size=2)
+        self.assertEqual((first['has_more'], second['has_more']), (True, False))
+        self.assertEqual([row['id'] for row in first['results'] + second['results']], [asset.id for asset in self.assets])
+        token = second['next']
+        self.assertEqual(self.sync(token), {'results': [], 'deleted': [], 'next': token, 'has_more': False})
+
+        moved, deleted = self.assets[0].id, self.assets[1].id
+        response = self.client.post('/assignments/bulk/', {
+            'action': 'transfer', 'asset_ids': [moved], 'to_branch_id': self.north.id,
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assets[1].delete()
+
+        main = self.sync(token, branch=self.main.id)
+        self.assertEqual((main['results'], main['deleted']), ([], [moved, deleted]))
+        north = self.sync(token, branch=self.north.id)
+        self.assertEqual(([row['id'] for row in north['results']], north['deleted']), ([moved], []))
+        everywhere = self.sync(token)
+        self.assertEqual(([row['id'] for row in everywhere['results']], everywhere['deleted']), ([moved], [deleted]))
+        self.assertEqual(self.sync(everywhere['next'])['results'], [])
+
+    def test_invalid_token(self):
+        response = self.client.get('/assets/changes/', {'since': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class AssetBulkUpdateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.main = Branch.objects.create(name='Main Branch', code='MB')
+        cls.north = Branch.objects.create(name='North Branch', code='NB')
+        cls.category = Category.objects.create(name='Furniture', code='FU')
+        cls.admin = CustomUser.objects.create_user('admin', password='x', is_staff=True, is_superuser=True, branch=cls.main)
+        cls.main_assets = create_assets(cls.main, cls.category, 3)
+        cls.north_assets = create_assets(cls.north, cls.category, 2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_patch_applies_to_branch_scope(self):
+        response = self.client.post('/assets/bulk/', {
+            'category_id': self.category.id, 'patch': {'status': 'Retired', 'current_value': '0.50'},
+        }, format='json')
+        self.assertEqual(response.json(), {'matched': 3, 'updated': 3, 'fields': ['current_value', 'status']})
+        self.assertEqual(
+            set(Asset.objects.filter(status='Retired', current_value=Decimal('0.50')).values_list('branch_id', flat=True)),
+            {self.main.id}
+        )
+        self.assertEqual(Asset.objects.filter(version=0).count(), 2)
+
+    def test_rejects_invalid_patch_and_foreign_assets(self):
+        invalid = self.client.post('/assets/bulk/', {'asset_ids': [self.main_assets[0].id], 'patch': {'status': 'Lost'}}, format='json')
+        self.assertEqual(invalid.status_code, 400)
+        foreign = self.client.post('/assets/bulk/', {
+            'asset_ids': [self.main_assets[0].id, self.north_assets[0].id], 'patch': {'condition': 'Poor'},
+        }, format='json')
+        self.assertEqual(foreign.status_code, 403)
+        self.assertFalse(Asset.objects.filter(condition='Poor').exists())
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class AssignmentCreateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        branch = Branch.objects.create(name='Main Branch', code='MB')
+        cls.assets = create_assets(branch, Category.objects.create(name='Furniture', code='FU'), 2)
+        cls.admin = CustomUser.objects.create_user('admin', password='x', is_staff=True, is_superuser=True)
+        cls.first, cls.second = (CustomUser.objects.create_user(name, password='x') for name in ('first', 'second'))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def assign(self, user_id, asset_ids):
+        return self.client.post('/assignments/', {'user_id': user_id, 'asset_ids': asset_ids}, format='json')
+
+    def test_reassignment_closes_previous_holder(self):
+        asset = self.assets[0]
+        self.assertEqual(self.assign(self.first.id, [asset.id]).status_code, 201)
+        self.assertEqual(self.assign(self.second.id, [asset.id, asset.id]).status_code, 201)
+        self.assertEqual(self.assign(self.second.id, [asset.id]).status_code, 400)
+        open_rows = AssetHistory.objects.filter(asset=asset, unassigned_date__isnull=True)
+        self.assertEqual(list(open_rows.values_list('user_id', flat=True)), [self.second.id])
+        self.assertEqual(Asset.objects.get(id=asset.id).assigned_to_id, self.second.id)
+
+    def test_invalid_requests_change_nothing(self):
+        for user_id, asset_ids in [
+            (self.first.id, [self.assets[0].id, 0]), (0, [self.assets[0].id]),
+            (self.first.id, 5), (self.first.id, [{'x': 1}]), (self.first.id, []),
+        ]:
+            self.assertEqual(self.assign(user_id, asset_ids).status_code, 400, (user_id, asset_ids))
+        self.assertFalse(AssetHistory.objects.exists())
+        self.assertFalse(Asset.objects.filter(assigned_to__isnull=False).exists())
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class OutboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        branch = Branch.objects.create(name='Main Branch', code='MB')
+        category = Category.objects.create(name='Furniture', code='FU')
+        cls.admin = CustomUser.objects.create_user('admin', password='x', is_staff=True, is_superuser=True)
+        cls.holder = CustomUser.objects.create_user('holder', password='x')
+        cls.assets = create_assets(branch, category, 2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def feed(self, **params):
+        response = self.client.get('/outbox/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_set_based_writes_reach_the_feed(self):
+        asset_ids = [asset.id for asset in self.assets]
+        self.client.post('/assignments/', {'user_id': self.holder.id, 'asset_ids': asset_ids}, format='json')
+        compliance = Compliance.objects.create(id='COMP-1', title='Audit', category='Security', status='Compliant')
+        compliance.assets.add(*self.assets)
+
+        first = self.feed(limit=3)
+        rest = self.feed(after=first['next'])
+        self.assertEqual((first['has_more'], rest['has_more']), (True, False))
+        events = [(event['aggregate'], event['event']) for event in first['results'] + rest['results']]
+        self.assertEqual(events, [
+            ('assignment', 'created'), ('assignment', 'created'), ('asset', 'updated'), ('asset', 'updated'),
+            ('compliance', 'created'), ('compliance', 'linked'),
+        ])
+        self.assertEqual(first['results'][2]['payload']['assigned_to_id'], self.holder.id)
+        self.assertEqual(rest['results'][-1]['payload'], {'relation': 'assets', 'ids': asset_ids})
+
+    def test_clear_records_removed_ids(self):
+        first, second = self.assets
+        compliance = Compliance.objects.create(id='COMP-1', title='Audit', category='Security', status='Compliant')
+        other = Compliance.objects.create(id='COMP-2', title='Review', category='Security', status='Compliant')
+        compliance.assets.add(first, second)
+        other.assets.add(first)
+        after = OutboxEvent.objects.order_by('-id').values_list('id', flat=True).first()
+
+        first.compliances.clear()
+        compliance.assets.clear()
+        compliance.assets.clear()
+        events = [(event['aggregate_id'], event['event'], event['payload']['ids']) for event in self.feed(after=after)['results']]
+        self.assertEqual(events, [
+            ('COMP-1', 'unlinked', [first.id]), ('COMP-2', 'unlinked', [first.id]), ('COMP-1', 'unlinked', [second.id]),
+        ])
+
+    def test_user_deletion_versions_and_records_assets(self):
+        asset = self.assets[0]
+        self.client.post('/assignments/', {'user_id': self.holder.id, 'asset_ids': [asset.id]}, format='json')
+        version = Asset.objects.get(id=asset.id).version
+        after = OutboxEvent.objects.order_by('-id').values_list('id', flat=True).first()
+
+        CustomUser.objects.get(id=self.holder.id).delete()
+        asset.refresh_from_db()
+        self.assertIsNone(asset.assigned_to_id)
+        self.assertGreater(asset.version, version)
+        events = self.feed(after=after)['results']
+        self.assertEqual([(event['aggregate'], event['event']) for event in events], [('asset', 'updated'), ('assignment', 'updated')])
+        self.assertEqual((events[0]['payload']['assigned_to_id'], events[1]['payload']['user_id']), (None, None))
+
+    def test_events_do_not_use_up_asset_versions(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root + '/'))
+
+        def counter():
+            return ChangeCounter.objects.filter(name=ASSET_CHANGES).values_list('value', flat=True).first() or 0
+
+        start = counter()
+        Compliance.objects.create(id='COMP-1', title='Audit', category='Security', status='Compliant').assets.add(*self.assets)
+        self.assertEqual(counter(), start)
+        asset = Asset.objects.get(id=self.assets[0].id)
+        asset.description = 'Desk'
+        asset.save()
+        self.assertEqual((asset.version, counter()), (start + 1, start + 1))
+        self.assertEqual(self.feed()['results'][-1]['payload']['version'], start + 1)
+
+    def test_prune_and_compact(self):
+        old = OutboxEvent.objects.create(aggregate='asset', aggregate_id='0', event='deleted', payload={})
+        OutboxEvent.objects.filter(id=old.id).update(created_at=timezone.now() - timezone.timedelta(days=30))
+        self.client.post('/assets/bulk/', {'asset_ids': [self.assets[0].id], 'patch': {'status': 'Retired'}}, format='json')
+        self.client.post('/assets/bulk/', {'asset_ids': [self.assets[0].id], 'patch': {'status': 'Active'}}, format='json')
+        OutboxEvent.objects.exclude(id=old.id).update(created_at=timezone.now() - timezone.timedelta(days=2))
+
+        call_command('prune_outbox', stdout=StringIO())
+        remaining = self.feed()['results']
+        self.assertEqual([event['payload']['status'] for event in remaining], ['Active'])
+        self.assertEqual(self.client.get('/outbox/', {'after': 0}).status_code, 410)
+
+
+def open_snapshot(content):
+    db = sqlite3.connect(':memory:')
+    db.deserialize(gzip.decompress(content))
+    return db
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class AuditSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.create(name='Main Branch', code='MB')
+        cls.category = Category.objects.create(name='Furniture', code='FU')
+        cls.auditor = CustomUser.objects.create_user('auditor', password='x', user_type='Auditor', branch=cls.branch)
+        cls.assets = create_assets(cls.branch, cls.category, 3)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.auditor)
+
+    def test_snapshot_and_delta(self):
+        full = self.client.get('/audit/snapshot/')
+        self.assertEqual(full.status_code, 200)
+        version = int(full['X-Snapshot-Version'])
+        db = open_snapshot(full.content)
+        self.assertEqual(
+            db.execute('SELECT asset_id, serial_number, status FROM assets ORDER BY asset_id').fetchall(),
+            [(asset.id, asset.asset_serial_number, 'Active') for asset in self.assets]
+        )
+        not_modified = self.client.get('/audit/snapshot/', HTTP_IF_NONE_MATCH=full['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        updated, removed = self.assets[0].id, self.assets[1].id
+        self.client.force_authenticate(CustomUser.objects.create_user('admin', password='x', is_staff=True))
+        response = self.client.post('/assignments/bulk/', {'action': 'unassign', 'asset_ids': [updated]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assets[1].delete()
+        self.client.force_authenticate(self.auditor)
+
+        delta = self.client.get('/audit/snapshot/', {'since': version})
+        self.assertGreater(int(delta['X-Snapshot-Version']), version)
+        db = open_snapshot(delta.content)
+        self.assertEqual(db.execute('SELECT asset_id FROM assets').fetchall(), [(updated,)])
+        self.assertEqual(db.execute('SELECT asset_id FROM deleted').fetchall(), [(removed,)])
+        self.assertEqual(self.client.get('/audit/snapshot/', HTTP_IF_NONE_MATCH=full['ETag']).status_code, 200)
+
+    def test_category_change_retires_etag(self):
+        response = self.client.get('/audit/snapshot/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Electronics', code='EL')
+        changed = self.client.get('/audit/snapshot/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertGreater(int(changed['X-Categories-Version']), int(response['X-Categories-Version']))
+        meta = dict(open_snapshot(changed.content).execute('SELECT key, value FROM meta'))
+        self.assertEqual(meta['categories_version'], int(changed['X-Categories-Version']))
+        self.assertEqual(open_snapshot(changed.content).execute('SELECT count(*) FROM categories').fetchone(), (2,))
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class MediaFileTests(TestCase):
+    """/media/ only serves files referenced by an attachment or a visible asset."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.main = Branch.objects.create(name='Main Branch', code='MB')
+        north = Branch.objects.create(name='North Branch', code='NB')
+        category = Category.objects.create(name='Furniture', code='FU')
+        cls.clerk = CustomUser.objects.create_user('clerk', password='x', user_type='Basic', is_staff=True, branch=cls.main)
+        cls.mine = create_assets(cls.main, category, 1, qr_code='qr_codes/mine.png')[0]
+        cls.theirs = create_assets(north, category, 1, qr_code='qr_codes/theirs.png')[0]
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root + '/'))
+        for name in ('qr_codes/mine.png', 'qr_codes/theirs.png', 'partial_uploads/1.part'):
+            os.makedirs(os.path.join(media_root, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(media_root, name), 'wb') as out:
+                out.write(b'data')
+        self.client = APIClient()
+        self.client.force_authenticate(self.clerk)
+
+    def test_branch_scope_and_unreferenced_files(self):
+        response = self.client.get('/media/qr_codes/mine.png')
+        self.assertEqual((response.status_code, b''.join(response.streaming_content)), (200, b'data'))
+        for path in ('qr_codes/theirs.png', 'partial_uploads/1.part', 'qr_codes/../partial_uploads/1.part'):
+            self.assertEqual(self.client.get('/media/' + path).status_code, 404, path)
+
+        self.client.force_authenticate(CustomUser.objects.create_user('viewer', password='x', branch=self.main))
+        self.assertEqual(self.client.get('/media/qr_codes/mine.png').status_code, 403)
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class ChunkedUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        branch = Branch.objects.create(name='Main Branch', code='MB')
+        asset = create_assets(branch, Category.objects.create(name='Furniture', code='FU'), 1)[0]
+        cls.admin = CustomUser.objects.create_user('admin', password='x', is_staff=True, is_superuser=True)
+        cls.assignment = AssetHistory.objects.create(asset=asset, user=cls.admin)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root + '/', CHUNKED_UPLOAD_ROOT=media_root + '/partial_uploads/'))
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        response = self.client.post('/attachments/uploads/', {
+            'assignment_id': self.assignment.id, 'filename': 'receipt.txt', 'size': 10,
+        }, format='json')
+        self.url = f"/attachments/uploads/{response.json()['id']}/"
+
+    def send(self, offset, data, **extra):
+        return self.client.generic(
+            'PATCH', self.url, data, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset), **extra
+        )
+
+    def test_resume_after_short_part(self):
+        # The connection drops after 3 of the 6 announced bytes.
+        short = self.send(0, b'', CONTENT_LENGTH='6', **{'wsgi.input': BytesIO(b'abc')})
+        self.assertEqual((short.status_code, short.json()['offset']), (409, 3))
+        self.assertEqual(self.client.get(self.url).json()['offset'], 3)
+
+        self.assertEqual(self.send(0, b'abcdef').status_code, 409)
+        self.assertEqual(self.send(3, b'defghij').json()['offset'], 10)
+        response = self.client.post(self.url + 'complete/', {
+            'checksum': hashlib.sha256(b'abcdefghij').hexdigest(),
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        with Attachment.objects.get().file.open('rb') as stored:
+            self.assertEqual(stored.read(), b'abcdefghij')
+
+    def test_checksum_mismatch(self):
+        self.send(0, b'abcdefghij')
+        response = self.client.post(self.url + 'complete/', {'checksum': '0' * 64}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Attachment.objects.exists())
+        self.assertEqual(self.client.get(self.url).json()['offset'], 10)
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root + '/'))
+
+    def refcount(self, name):
+        return StoredBlob.objects.filter(name=name).values_list('refcount', flat=True).first()
+
+    def test_refcounts_follow_saves_replacements_and_deletes(self):
+        branch = Branch.objects.create(name='Main Branch', code='MB')
+        first, second = create_assets(branch, Category.objects.create(name='Furniture', code='FU'), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            first.photo.save('front.jpg', ContentFile(b'front'))
+            second.photo.save('copy.jpg', ContentFile(b'front'))
+        front = first.photo.name
+        self.assertEqual((second.photo.name, self.refcount(front)), (front, 2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.photo.save('back.jpg', ContentFile(b'back'))
+        self.assertEqual((self.refcount(front), self.refcount(first.photo.name)), (1, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertIsNone(self.refcount(front))
+        self.assertFalse(cas_storage.exists(front))
+        self.assertTrue(cas_storage.exists(first.photo.name))
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class AsyncViewTests(TestCase):
+    PATHS = [
+        'dashboard/', 'assets/?search=MB', 'analytics/asset-status/?category=Furniture', 'analytics/ownership-changes/',
+        'analytics/asset-value-trend/', 'analytics/category-distribution/', 'analytics/utilization-rate/',
+        'analytics/depreciation/', 'analytics/metrics/',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        branch = Branch.objects.create(name='Main Branch', code='MB')
+        category = Category.objects.create(name='Furniture', code='FU')
+        cls.clerk = CustomUser.objects.create_user('clerk', password='x', user_type='Basic', branch=branch)
+        cls.auditor = CustomUser.objects.create_user('auditor', password='x', user_type='Auditor', branch=branch)
+        create_assets(
+            branch, category, 3, description='Desk', purchase_date=datetime.date(2024, 5, 1),
+            purchase_price=Decimal('120.00'), current_value=Decimal('90.50'),
+        )
+
+    def bearer(self, user):
+        return {'Authorization': f'Bearer {issue_tokens(user).access_token}'}
+
+    async def test_permissions(self):
+        self.assertEqual((await self.async_client.get('/async/dashboard/')).status_code, 401)
+        response = await self.async_client.get('/async/assets/', headers=self.bearer(self.auditor))
+        self.assertEqual(response.status_code, 403)
+
+    async def test_same_bytes_as_sync_views(self):
+        headers = await sync_to_async(self.bearer)(self.clerk)
+        for path in self.PATHS:
+            expected = await sync_to_async(self.client.get)('/' + path, headers=headers)
+            response = await self.async_client.get('/async/' + path, headers=headers)
+            self.assertEqual((response.status_code, response.content), (200, expected.content), path)
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class DashboardStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.main = Branch.objects.create(name='Main Branch', code='MB')
+        cls.north = Branch.objects.create(name='North Branch', code='NB')
+        category = Category.objects.create(name='Furniture', code='FU')
+        cls.admin = CustomUser.objects.create_user('admin', password='x', user_type='Admin', is_staff=True)
+        cls.auditor = CustomUser.objects.create_user('auditor', password='x', user_type='Auditor', branch=cls.main)
+        cls.asset = create_assets(cls.main, category, 2, current_value=Decimal('100.00'))[0]
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root + '/'))
+        # build_snapshot closes stale connections, which would end the test transaction.
+        self.enterContext(mock.patch('assetManagementSystem.events.close_old_connections'))
+        self.enterContext(mock.patch('assetManagementSystem.events.COALESCE_SECONDS', 0))
+        self.broker = self.enterContext(mock.patch('assetManagementSystem.events.broker', events.DashboardBroker()))
+
+    async def connect(self, user, **params):
+        params['token'] = await sync_to_async(lambda: str(issue_tokens(user).access_token))()
+        return await self.async_client.get('/dashboard/stream/', params)
+
+    async def next_event(self, stream):
+        chunk = await asyncio.wait_for(anext(stream), 5)
+        event, data = re.fullmatch(r'event: (\w+)\ndata: (.*)\n\n', chunk.decode()).groups()
+        return event, json.loads(data)
+
+    async def close(self, *streams):
+        for stream in streams:
+            await stream.aclose()
+        for ticker in self.broker._tickers.values():
+            ticker.cancel()
+
+    def start_audit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            AuditSession.objects.create(created_by=self.auditor)
+
+    def transfer(self, branch):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.asset.branch = branch
+            self.asset.save()
+
+    async def test_rejects_anonymous_and_unknown_branches(self):
+        self.assertEqual((await self.async_client.get('/dashboard/stream/')).status_code, 401)
+        response = await self.connect(self.admin, branch=self.north.id + 100)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_audit_progress_only_for_auditors(self):
+        audited = aiter((await self.connect(self.auditor)).streaming_content)
+        plain = aiter((await self.connect(self.admin)).streaming_content)
+        event, snapshot = await self.next_event(audited)
+        self.assertEqual((event, snapshot['total_assets'], snapshot['audit_progress']), ('snapshot', 2, []))
+        event, snapshot = await self.next_event(plain)
+        self.assertEqual(event, 'snapshot')
+        self.assertNotIn('audit_progress', snapshot)
+
+        await sync_to_async(self.start_audit)()
+        event, delta = await self.next_event(audited)
+        self.assertEqual((event, list(delta), delta['audit_progress'][0]['total']), ('delta', ['audit_progress'], 2))
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(anext(plain), 0.2)
+        await self.close(audited, plain)
+
+    async def test_transfer_refreshes_both_branches(self):
+        source = aiter((await self.connect(self.admin, branch=self.main.id)).streaming_content)
+        target = aiter((await self.connect(self.admin, branch=self.north.id)).streaming_content)
+        self.assertEqual((await self.next_event(source))[1]['total_assets'], 2)
+        self.assertEqual((await self.next_event(target))[1]['total_assets'], 0)
+
+        await sync_to_async(self.transfer)(self.north)
+        for stream in (source, target):
+            event, delta = await self.next_event(stream)
+            self.assertEqual((event, delta['total_assets']), ('delta', 1))
+        await self.close(source, target)
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class TokenRevocationTests(TestCase):
+    def test_claim_change_revokes_tokens(self):
+        user = CustomUser.objects.create_user('clerk', password='x', user_type='Basic')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {issue_tokens(user).access_token}')
+        self.assertEqual(client.get('/settings/').json()['user_type'], 'Basic')
+
+        user.first_name = 'Clerk'
+        user.save()
+        self.assertEqual(client.get('/settings/').status_code, 200)
+
+        stale = CustomUser.objects.get(pk=user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.user_type = 'Auditor'
+            user.save()
+        self.assertEqual(client.get('/settings/').status_code, 401)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {issue_tokens(user).access_token}')
+        self.assertEqual(client.get('/settings/').json()['user_type'], 'Auditor')
+
+        # Saving an instance loaded before the change must not restore the old version.
+        with self.captureOnCommitCallbacks(execute=True):
+            stale.save()
+        self.assertEqual(client.get('/settings/').status_code, 401)
+        self.assertEqual(CustomUser.objects.get(pk=user.pk).token_version, 2)
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class ServerTimingMiddlewareTests(TestCase):
+    TIMING_RE = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries", serialize;dur=[\d.]+, render;dur=[\d.]+, total;dur=[\d.]+')
+
+    def test_server_timing_header(self):
+        Branch.objects.create(name='Main Branch', code='MB')
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.create_user('admin', password='x', is_staff=True))
+        with self.assertNoLogs('assetManagementSystem.performance'), CaptureQueriesContext(connection) as captured:
+            response = client.get('/branches/')
+        self.assertEqual(response.status_code, 200)
+        match = self.TIMING_RE.fullmatch(response['Server-Timing'])
+        self.assertIsNotNone(match, response['Server-Timing'])
+        self.assertEqual(int(match.group(1)), len(captured))
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_slow_request_log(self):
+        def view(request):
+            for _ in range(3):
+                Branch.objects.filter(code='MB').exists()
+            return HttpResponse('ok')
+
+        with self.assertLogs('assetManagementSystem.performance', 'WARNING') as logs:
+            ServerTimingMiddleware(view)(APIRequestFactory().get('/branches/'))
+        message, payload = logs.records[0].getMessage().split(' ', 1)
+        entry = json.loads(payload)
+        self.assertEqual((message, entry['path'], entry['status'], entry['queries']), ('slow_request', '/branches/', 200, 3))
+        self.assertEqual([query['count'] for query in entry['repeated_queries']], [3])
+        self.assertIn('"code"', entry['repeated_queries'][0]['sql'])
+
+
+@override_settings(ROOT_URLCONF='assetManagementSystem.urls')
+class ProfilingMiddlewareTests(TestCase):
+    def get(self, user, path):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {issue_tokens(user).access_token}', HTTP_X_PROFILE='1')
+        self.assertEqual(client.get(path).status_code, 200)
+
+    def test_header_requires_staff_and_secrets_are_masked(self):
+        self.get(CustomUser.objects.create_user('clerk', password='x'), '/settings/')
+        self.assertFalse(RequestProfile.objects.exists())
+
+        self.get(CustomUser.objects.create_user('admin', password='x', is_staff=True), '/settings/?token=abc&page=2')
+        profile = RequestProfile.objects.get()
+        self.assertEqual((profile.trigger, profile.query_string), ('header', 'token=********************&page=2'))
+
+
+class ReplicaRoutingTests(SimpleTestCase):
+    """Tests only ever have a mirror of the primary, so a replica alias is patched in."""
+
+    @mock.patch('assetManagementSystem.routers.replica_alias', return_value='replica')
+    def test_only_reads_in_replica_blocks_use_the_replica(self, replica_alias):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Asset))
+        with replica_reads():
+            self.assertEqual((router.db_for_read(Asset), router.db_for_write(Asset)), ('replica', 'default'))
+
+    @mock.patch('assetManagementSystem.routers.replica_alias', return_value='replica')
+    def test_write_pins_reads_to_primary(self, replica_alias):
+        user = CustomUser(id=987654, username='clerk')
+        self.addCleanup(cache.delete, f'db:primary_pin:{user.id}')
+        seen = []
+
+        @reads_from_replica
+        def view(request):
+            seen.append(ReplicaRouter().db_for_read(Asset))
+            return HttpResponse()
+
+        factory = APIRequestFactory()
+        read, write = factory.get('/analytics/'), factory.post('/assets/')
+        read.user = write.user = user
+        view(read)
+        ReplicaStickinessMiddleware(lambda request: HttpResponse())(write)
+        view(read)
+        self.assertEqual(seen, ['replica', None])
+
+    def test_mirror_of_the_primary_is_not_a_replica(self):
+        with override_settings(DATABASE_REPLICA_ALIAS='default'), replica_reads():
+            self.assertIsNone(replica_alias())
+            self.assertIsNone(ReplicaRouter().db_for_read(Asset))
+
+
+class StartupBudgetTests(SimpleTestCase):
+    """Worker boot in a fresh interpreter: WSGI application plus the app's URLs and views."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        result = subprocess.run(
+            [sys.executable, '-c', STARTUP_SCRIPT % LAZY_MODULES],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        cls.startup = json.loads(result.stdout.strip().splitlines()[-1])
+
+    def test_export_dependencies_load_lazily(self):
+        self.assertEqual(self.startup['loaded'], [], 'export/report dependencies must load on first use')
+
+    # ru_maxrss is in KiB on Linux only (bytes on macOS).
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'budgets are measured on Linux')
+    def test_startup_within_budget(self):
+        self.assertLess(self.startup['seconds'], STARTUP_BUDGET_SECONDS)
+        self.assertLess(self.startup['rss_kib'] / 1024, STARTUP_BUDGET_RSS_MIB)
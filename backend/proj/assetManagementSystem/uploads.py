@@ -0,0 +1,115 @@
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+from django.core.files import File
+
+READ_SIZE = 1024 * 1024
+MAX_PART_SIZE = 64 * 1024 * 1024
+
+# Running SHA-256 per upload, keyed by upload id: (offset hashed so far, hasher).
+# A worker that did not see the earlier parts rebuilds the state from disk.
+_hashers = {}
+_hashers_lock = threading.Lock()
+
+
+class UploadError(Exception):
+    pass
+
+
+class PartFile(File):
+    # Lets FileSystemStorage move the finished part into place instead of copying it.
+    def temporary_file_path(self):
+        return self.name
+
+
+def part_path(upload):
+    return os.path.join(settings.CHUNKED_UPLOAD_ROOT, f"{upload.id}.part")
+
+
+def received_bytes(upload):
+    try:
+        return os.path.getsize(part_path(upload))
+    except FileNotFoundError:
+        return 0
+
+
+def _hasher_at(upload, offset):
+    with _hashers_lock:
+        cached = _hashers.get(upload.id)
+    if cached and cached[0] == offset:
+        return cached[1]
+    hasher = hashlib.sha256()
+    remaining = offset
+    if remaining:
+        with open(part_path(upload), 'rb') as fh:
+            while remaining:
+                chunk = fh.read(min(READ_SIZE, remaining))
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                remaining -= len(chunk)
+    return hasher
+
+
+def write_part(upload, stream, offset, length):
+    """
+    Append ``length`` bytes from ``stream`` at ``offset`` and advance
+    ``upload.offset``, also when the part ends early. ``upload`` must be locked
+    with select_for_update() until its new offset is saved, so concurrent parts
+    for the same upload are applied one at a time.
+    """
+    if offset != upload.offset:
+        raise UploadError(f"Expected offset {upload.offset}, got {offset}")
+    if length <= 0 or length > MAX_PART_SIZE:
+        raise UploadError(f"Part size must be between 1 and {MAX_PART_SIZE} bytes")
+    if offset + length > upload.size:
+        raise UploadError("Part exceeds the declared upload size")
+
+    os.makedirs(settings.CHUNKED_UPLOAD_ROOT, exist_ok=True)
+    hasher = _hasher_at(upload, offset)
+    written = 0
+    with open(part_path(upload), 'ab') as fh:
+        # Drop bytes a failed request appended without recording its offset.
+        fh.truncate(offset)
+        while written < length:
+            chunk = stream.read(min(READ_SIZE, length - written))
+            if not chunk:
+                break
+            fh.write(chunk)
+            hasher.update(chunk)
+            written += len(chunk)
+    with _hashers_lock:
+        _hashers[upload.id] = (offset + written, hasher)
+    upload.offset = offset + written
+    if written != length:
+        raise UploadError(f"Connection closed after {written} of {length} bytes; resume from offset {upload.offset}")
+    return upload.offset
+
+
+def finish(upload, attachment, expected_checksum=None):
+    """
+    Verify the upload is complete and move the part file into
+    ``attachment.file``; returns the SHA-256. ``upload`` must be locked.
+    """
+    if upload.offset != upload.size or received_bytes(upload) != upload.size:
+        raise UploadError(f"Upload incomplete: {upload.offset} of {upload.size} bytes received")
+    checksum = _hasher_at(upload, upload.size).hexdigest()
+    if expected_checksum and expected_checksum.lower() != checksum:
+        raise UploadError(f"Checksum mismatch: received data hashes to {checksum}")
+    with open(part_path(upload), 'rb') as fh:
+        part = PartFile(fh, name=part_path(upload))
+        part.sha256 = checksum
+        attachment.file.save(upload.filename, part, save=False)
+    discard(upload)
+    return checksum
+
+
+def discard(upload):
+    with _hashers_lock:
+        _hashers.pop(upload.id, None)
+    try:
+        os.remove(part_path(upload))
+    except FileNotFoundError:
+        pass
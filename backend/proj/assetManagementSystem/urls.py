@@ -1,6 +1,6 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from . import views
+from . import views, events, async_views
 
 app_name = 'assetManagementSystem'
 
@@ -13,6 +13,7 @@ urlpatterns = [
     
     # Dashboard
     path('dashboard/', views.dashboard_view, name='dashboard'),
+    path('dashboard/stream/', events.dashboard_stream, name='dashboard_stream'),
     
     # Branches
     path('branches/', views.BranchListCreateView.as_view(), name='branch_list_create'),
@@ -26,6 +27,8 @@ urlpatterns = [
     
     # Assets
     path('assets/', views.AssetListCreateView.as_view(), name='asset_list_create'),
+    path('assets/changes/', views.AssetChangesView.as_view(), name='asset_changes'),
+    path('assets/bulk/', views.AssetBulkUpdateView.as_view(), name='asset_bulk_update'),
     path('assets/<uuid:asset_id>/', views.AssetDetailView.as_view(), name='asset_detail'),
     path('assets/<uuid:asset_id>/qr/', views.generate_asset_qr, name='generate_asset_qr'),
     path('assets/export/', views.asset_export, name='asset_export'),
@@ -35,23 +38,35 @@ urlpatterns = [
     path('audit/scan/', views.AuditSessionScanView.as_view(), name='scan_qr_code'),
     path('audit/end/', views.AuditSessionEndView.as_view(), name='end_audit'),
     path('audit/tasks/', views.audit_tasks_view, name='audit_tasks'),
+    path('audit/snapshot/', views.audit_snapshot, name='audit_snapshot'),
     
     # Compliance
     path('compliance/', views.ComplianceListCreateView.as_view(), name='compliance_list_create'),
-    path('compliance/<str:compliance_id>/', views.ComplianceDetailView.as_view(), name='compliance_detail'),
     path('compliance/timeline/', views.compliance_timeline, name='compliance_timeline'),
+    path('compliance/<str:compliance_id>/', views.ComplianceDetailView.as_view(), name='compliance_detail'),
+    path('compliance/<str:compliance_id>/assets/', views.ComplianceAssetListView.as_view(), name='compliance_assets'),
     path('compliance/<str:compliance_id>/report/', views.compliance_report, name='compliance_report'),
     
     # Assignments
     path('assignments/', views.AssignmentCreateView.as_view(), name='assign_asset'),
     path('assignments/<uuid:assignment_id>/', views.AssignmentDeleteView.as_view(), name='delete_assignment'),
+    path('assignments/bulk/', views.AssignmentBulkView.as_view(), name='bulk_assignment'),
     path('assignments/employees/', views.employees_with_assets, name='employees_with_assets'),
     path('assignments/<uuid:assignment_id>/agreement/', views.assignment_agreement, name='assignment_agreement'),
     
+    # Custody
+    path('custody/assets/<int:asset_id>/', views.asset_custody, name='asset_custody'),
+    path('custody/users/<int:user_id>/', views.user_custody, name='user_custody'),
+    path('custody/branches/<int:branch_id>/', views.branch_custody, name='branch_custody'),
+    
     # Attachments
     path('attachments/', views.AttachmentCreateView.as_view(), name='upload_attachment'),
     path('attachments/<uuid:assignment_id>/', views.AttachmentListView.as_view(), name='get_attachments'),
     path('attachments/<uuid:attachment_id>/delete/', views.AttachmentDeleteView.as_view(), name='delete_attachment'),
+    path('attachments/<int:attachment_id>/download/', views.AttachmentDownloadView.as_view(), name='download_attachment'),
+    path('attachments/uploads/', views.AttachmentUploadCreateView.as_view(), name='start_attachment_upload'),
+    path('attachments/uploads/<uuid:upload_id>/', views.AttachmentUploadDetailView.as_view(), name='attachment_upload'),
+    path('attachments/uploads/<uuid:upload_id>/complete/', views.AttachmentUploadCompleteView.as_view(), name='complete_attachment_upload'),
     
     # Analytics
     path('analytics/lifecycle/', views.analytics_lifecycle, name='analytics_lifecycle'),
@@ -64,6 +79,29 @@ urlpatterns = [
     path('analytics/depreciation/', views.analytics_depreciation, name='analytics_depreciation'),
     path('analytics/metrics/', views.analytics_metrics, name='analytics_metrics'),
     
+    # Media
+    path('media/<path:path>', views.media_file, name='media_file'),
+    
+    # Request profiling
+    path('profiles/', views.RequestProfileListView.as_view(), name='request_profiles'),
+    path('profiles/<int:profile_id>/', views.RequestProfileDetailView.as_view(), name='request_profile'),
+    
+    # Change outbox
+    path('outbox/', views.OutboxFeedView.as_view(), name='outbox_feed'),
+    
+    # Async (ASGI) versions of the high-concurrency read endpoints
+    path('async/dashboard/', async_views.dashboard, name='async_dashboard'),
+    path('async/assets/', async_views.asset_list, name='async_asset_list'),
+    path('async/assets/<int:asset_id>/', async_views.asset_detail, name='async_asset_detail'),
+    path('async/audit/scan/', async_views.audit_scan, name='async_scan_qr_code'),
+    path('async/analytics/asset-status/', async_views.analytics_asset_status, name='async_analytics_asset_status'),
+    path('async/analytics/ownership-changes/', async_views.analytics_ownership_changes, name='async_analytics_ownership_changes'),
+    path('async/analytics/asset-value-trend/', async_views.analytics_asset_value_trend, name='async_analytics_asset_value_trend'),
+    path('async/analytics/category-distribution/', async_views.analytics_category_distribution, name='async_analytics_category_distribution'),
+    path('async/analytics/utilization-rate/', async_views.analytics_utilization_rate, name='async_analytics_utilization_rate'),
+    path('async/analytics/depreciation/', async_views.analytics_depreciation, name='async_analytics_depreciation'),
+    path('async/analytics/metrics/', async_views.analytics_metrics, name='async_analytics_metrics'),
+    
     # Profile/Settings
     path('profile/', views.profile_view, name='profile'),
     path('settings/', views.settings_view, name='settings'),
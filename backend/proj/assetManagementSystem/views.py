@@ -6,19 +6,38 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.decorators import api_view, permission_classes
-from django.db.models import Count, Sum, Avg, Q
-from django.http import HttpResponse
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from io import BytesIO
-import pandas as pd
-from .models import Branch, Category, Asset, CustomUser, AuditSession, Compliance, AssetHistory, Attachment
+from rest_framework.pagination import PageNumberPagination
+from django.db import transaction
+from django.db.models import Count, Sum, Avg, Q, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.utils.encoders import JSONEncoder
+import datetime
+import json
+import posixpath
+from .models import (
+    Branch, Category, Asset, AssetTombstone, ChangeCounter, CustomUser, AuditSession, Compliance, AssetHistory,
+    Attachment, AttachmentUpload, OutboxEvent, RequestProfile, OUTBOX_PRUNED
+)
 from .serializers import (
-    BranchSerializer, CategorySerializer, AssetSerializer, UserSerializer,
-    AuditSessionSerializer, ComplianceSerializer, AssetHistorySerializer, AttachmentSerializer
+    BranchSerializer, CategorySerializer, AssetSerializer, AssetRowSerializer, UserSerializer,
+    AuditSessionSerializer, ComplianceSerializer, ComplianceSummarySerializer, AssetHistorySerializer,
+    AttachmentSerializer, AttachmentUploadSerializer, AssignmentCreateSerializer, BulkAssignmentSerializer,
+    BulkAssetUpdateSerializer, EmployeeAssetSummarySerializer, OutboxEventSerializer, RequestProfileSerializer
 )
+from . import uploads
+from .authentication import issue_tokens, revoke_tokens
+from .media import CAS_PREFIX, serve_file
+from .offline import branch_version, build_snapshot, cached_snapshot, snapshot_etag
+from .profiling import PROFILE_FORMATS
+from .registry import branches, categories
+from .routers import reads_from_replica
+from .storage import cas_storage
+from .signals import assets_bulk_changed
+from .sync import changes_page, format_token, parse_token, versioned
+from .outbox import record_instances, record_rows
 
 # Permission Helpers
 def is_auditor(user):
@@ -27,6 +46,15 @@ def is_auditor(user):
 def is_branch_user(user):
     return user.user_type == 'Basic' or user.is_superuser
 
+def scoped_assets(user, category='all'):
+    """Assets ``user`` may see, optionally limited to a category name."""
+    assets = Asset.objects.all()
+    if is_branch_user(user) and user.branch_id:
+        assets = assets.filter(branch_id=user.branch_id)
+    if category != 'all':
+        assets = assets.filter(category__name=category)
+    return assets
+
 class SuperuserOrAuditorPermission(IsAuthenticated):
     def has_permission(self, request, view):
         return super().has_permission(request, view) and (request.user.is_superuser or request.user.user_type == 'Auditor')
@@ -35,6 +63,11 @@ class SuperuserOrBranchUserPermission(IsAuthenticated):
     def has_permission(self, request, view):
         return super().has_permission(request, view) and (request.user.user_type == 'Basic' or request.user.is_superuser)
 
+class StandardPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
 # Authentication Views
 @api_view(['POST'])
 def login_view(request):
@@ -42,8 +75,7 @@ def login_view(request):
     password = request.data.get('password')
     user = authenticate(request, username=username, password=password)
     if user:
-        from rest_framework_simplejwt.tokens import RefreshToken
-        refresh = RefreshToken.for_user(user)
+        refresh = issue_tokens(user)
         return Response({
             'refresh': str(refresh),
             'access': str(refresh.access_token),
@@ -54,7 +86,9 @@ def login_view(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def logout_view(request):
-    # JWT logout handled on frontend by discarding tokens
+    # JWT logout handled on frontend by discarding tokens; all_devices revokes every issued token
+    if request.data.get('all_devices'):
+        revoke_tokens(request.user)
     return Response({'message': 'Logged out successfully'}, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
@@ -88,10 +122,9 @@ def register_view(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_view(request):
-    assets = Asset.objects.all()
-    if is_branch_user(request.user) and request.user.branch:
-        assets = assets.filter(branch=request.user.branch)
+    return Response(dashboard_summary(scoped_assets(request.user)))
 
+def dashboard_summary(assets):
     total_assets = assets.count()
     total_value = assets.aggregate(total_value=Sum('current_value'))['total_value'] or 0
     compliance_stats = Compliance.objects.aggregate(
@@ -100,12 +133,11 @@ def dashboard_view(request):
         non_compliant=Count('id', filter=Q(status='Non-Compliant')),
         avg_score=Avg('score')
     )
-
-    return Response({
+    return {
         'total_assets': total_assets,
         'total_value': total_value,
         'compliance_stats': compliance_stats
-    })
+    }
 
 # Branch Views
 class BranchListCreateView(APIView):
@@ -212,29 +244,11 @@ class AssetListCreateView(APIView):
     permission_classes = [SuperuserOrBranchUserPermission]
 
     def get(self, request):
-        assets = Asset.objects.all()
-        if is_branch_user(request.user) and request.user.branch:
-            assets = assets.filter(branch=request.user.branch)
-        
-        search_query = request.query_params.get('search', '')
-        branch_filter = request.query_params.get('branch', '')
-        category_filter = request.query_params.get('category', '')
-        status_filter = request.query_params.get('status', '')
-
-        if search_query:
-            assets = assets.filter(Q(asset_serial_number__icontains=search_query) | Q(description__icontains=search_query))
-        if branch_filter:
-            assets = assets.filter(branch__id=branch_filter)
-        if category_filter:
-            assets = assets.filter(category__id=category_filter)
-        if status_filter:
-            assets = assets.filter(status=status_filter)
-
-        serializer = AssetSerializer(assets, many=True)
-        return Response(serializer.data)
+        assets = search_assets(scoped_assets(request.user), request.query_params)
+        return Response(asset_rows(assets))
 
     def post(self, request):
-        if is_branch_user(request.user) and request.user.branch and request.data.get('branch_id') != str(request.user.branch.id):
+        if is_branch_user(request.user) and request.user.branch_id and request.data.get('branch_id') != str(request.user.branch_id):
             return Response({'error': 'You can only create assets for your branch'}, status=status.HTTP_403_FORBIDDEN)
         serializer = AssetSerializer(data=request.data)
         if serializer.is_valid():
@@ -242,6 +256,69 @@ class AssetListCreateView(APIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class AssetChangesView(APIView):
+    """
+    Incremental sync: assets created, updated or removed since ``since`` (the
+    ``next`` token of the previous page), oldest first. Without ``since`` the
+    first page of a full sync is returned. Clients keep requesting with the
+    returned token while ``has_more`` is true; ``results`` and ``deleted``
+    of one page can be applied in any order.
+    """
+    permission_classes = [SuperuserOrBranchUserPermission]
+    page_size = 200
+    max_page_size = 1000
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        try:
+            position = parse_token(since) if since else None
+            page_size = min(int(request.query_params.get('page_size', self.page_size)), self.max_page_size)
+        except ValueError:
+            return Response({'error': 'Invalid sync token or page size'}, status=status.HTTP_400_BAD_REQUEST)
+        if page_size < 1:
+            return Response({'error': 'Invalid sync token or page size'}, status=status.HTTP_400_BAD_REQUEST)
+
+        assets = Asset.objects.all()
+        tombstones = AssetTombstone.objects.all()
+        branch_id = request.query_params.get('branch', '')
+        if is_branch_user(request.user) and request.user.branch_id:
+            branch_id = request.user.branch_id
+        if branch_id:
+            assets = assets.filter(branch_id=branch_id)
+            tombstones = tombstones.filter(branch_id=branch_id)
+        else:
+            # Transferred assets stay in an unscoped feed; only deletions remove them.
+            tombstones = tombstones.filter(reason=AssetTombstone.DELETED)
+
+        rows, deleted, next_position, has_more = changes_page(
+            AssetRowSerializer.rows(assets, 'version'), tombstones, position, page_size
+        )
+        return Response({
+            'results': AssetRowSerializer(rows, many=True).data,
+            'deleted': deleted,
+            'next': format_token(next_position) if next_position else since,
+            'has_more': has_more,
+        })
+
+def search_assets(assets, params):
+    search_query = params.get('search', '')
+    branch_filter = params.get('branch', '')
+    category_filter = params.get('category', '')
+    status_filter = params.get('status', '')
+
+    if search_query:
+        assets = assets.filter(Q(asset_serial_number__icontains=search_query) | Q(description__icontains=search_query))
+    if branch_filter:
+        assets = assets.filter(branch__id=branch_filter)
+    if category_filter:
+        assets = assets.filter(category__id=category_filter)
+    if status_filter:
+        assets = assets.filter(status=status_filter)
+    return assets
+
+def asset_rows(assets):
+    return AssetRowSerializer(AssetRowSerializer.rows(assets), many=True).data
+
 class AssetDetailView(APIView):
     permission_classes = [IsAdminUser]
 
@@ -252,7 +329,7 @@ class AssetDetailView(APIView):
 
     def put(self, request, asset_id):
         asset = get_object_or_404(Asset, id=asset_id)
-        if is_branch_user(request.user) and request.user.branch and asset.branch != request.user.branch:
+        if is_branch_user(request.user) and request.user.branch_id and asset.branch_id != request.user.branch_id:
             return Response({'error': 'You can only edit assets in your branch'}, status=status.HTTP_403_FORBIDDEN)
         serializer = AssetSerializer(asset, data=request.data, partial=True)
         if serializer.is_valid():
@@ -262,40 +339,69 @@ class AssetDetailView(APIView):
 
     def delete(self, request, asset_id):
         asset = get_object_or_404(Asset, id=asset_id)
-        if is_branch_user(request.user) and request.user.branch and asset.branch != request.user.branch:
+        if is_branch_user(request.user) and request.user.branch_id and asset.branch_id != request.user.branch_id:
             return Response({'error': 'You can only delete assets in your branch'}, status=status.HTTP_403_FORBIDDEN)
         asset.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+class AssetBulkUpdateView(APIView):
+    """
+    Apply one validated field patch to every asset matching the filters with a
+    single UPDATE, instead of one AssetDetailView.put (and QR regeneration) per asset.
+    """
+    permission_classes = [IsAdminUser]
+    FILTERS = {
+        'asset_ids': 'id__in',
+        'branch_id': 'branch_id',
+        'category_id': 'category_id',
+        'status': 'status',
+        'vendor': 'vendor',
+    }
+
+    def post(self, request):
+        serializer = BulkAssetUpdateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        filters = {lookup: data[key] for key, lookup in self.FILTERS.items() if key in data}
+
+        with transaction.atomic():
+            assets = Asset.objects.filter(**filters)
+            if is_branch_user(request.user) and request.user.branch_id:
+                if 'asset_ids' in data and assets.exclude(branch_id=request.user.branch_id).exists():
+                    return Response({'error': 'You can only edit assets in your branch'}, status=status.HTTP_403_FORBIDDEN)
+                assets = assets.filter(branch_id=request.user.branch_id)
+            rows = list(assets.select_for_update().values_list('id', 'branch_id'))
+            if 'asset_ids' in data:
+                found = {asset_id for asset_id, _ in rows}
+                missing = [asset_id for asset_id in data['asset_ids'] if asset_id not in found]
+                if missing:
+                    return Response({'error': 'Assets not found', 'asset_ids': missing}, status=status.HTTP_400_BAD_REQUEST)
+
+            updated = assets.update(**versioned(**data['patch'])) if rows else 0
+            record_rows(Asset, [asset_id for asset_id, _ in rows])
+            branch_ids = {branch_id for _, branch_id in rows}
+            transaction.on_commit(lambda: assets_bulk_changed.send(sender=Asset, branch_ids=branch_ids))
+        return Response({'matched': len(rows), 'updated': updated, 'fields': sorted(data['patch'])})
+
 @api_view(['GET'])
 @permission_classes([SuperuserOrBranchUserPermission])
 def generate_asset_qr(request, asset_id):
     asset = get_object_or_404(Asset, id=asset_id)
-    if is_branch_user(request.user) and request.user.branch and asset.branch != request.user.branch:
+    if is_branch_user(request.user) and request.user.branch_id and asset.branch_id != request.user.branch_id:
         return Response({'error': 'You can only generate QR codes for assets in your branch'}, status=status.HTTP_403_FORBIDDEN)
 
-    buffer = BytesIO()
-    pdf = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-    elements = []
-    qr_width, qr_height = 200, 200
-    page_width, page_height = letter
-    x = (page_width - qr_width) / 2
-    y = (page_height - qr_height) / 2
-    elements.append(Image(asset.qr_code.path, width=qr_width, height=qr_height, hAlign='CENTER'))
-    pdf.build(elements)
-    buffer.seek(0)
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="sticker_{asset.asset_serial_number}.pdf"'
-    response.write(buffer.getvalue())
-    buffer.close()
-    return response
+    from .reports import sticker_pdf
+    buffer = sticker_pdf(asset.qr_code.path)
+    return FileResponse(buffer, as_attachment=True, filename=f"sticker_{asset.asset_serial_number}.pdf", content_type='application/pdf')
 
 @api_view(['GET'])
 @permission_classes([SuperuserOrBranchUserPermission])
+@reads_from_replica
 def asset_export(request):
     assets = Asset.objects.all()
-    if is_branch_user(request.user) and request.user.branch:
-        assets = assets.filter(branch=request.user.branch)
+    if is_branch_user(request.user) and request.user.branch_id:
+        assets = assets.filter(branch_id=request.user.branch_id)
 
     branch_filter = request.query_params.get('branch', '')
     category_filter = request.query_params.get('category', '')
@@ -308,24 +414,10 @@ def asset_export(request):
     if status_filter:
         assets = assets.filter(status=status_filter)
 
-    data = [
-        {
-            'serial_number': asset.asset_serial_number,
-            'description': asset.description,
-            'branch': asset.branch.name if asset.branch else 'N/A',
-            'category': asset.category.name if asset.category else 'N/A',
-            'status': asset.status,
-            'condition': asset.condition,
-            'current_value': str(asset.current_value),
-            'purchase_date': asset.purchase_date,
-            'vendor': asset.vendor,
-        }
-        for asset in assets
-    ]
-    df = pd.DataFrame(data)
+    from .exports import write_assets_csv
     response = HttpResponse(content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename="assets_export.csv"'
-    df.to_csv(response, index=False)
+    write_assets_csv(assets, response)
     return response
 
 # Audit Session Views
@@ -345,7 +437,7 @@ class AuditSessionScanView(APIView):
         audit_session_id = request.session.get('audit_session_id')
         try:
             asset = Asset.objects.get(qr_code_identifier=qr_code_identifier)
-            if is_auditor(request.user) and request.user.branch and asset.branch != request.user.branch:
+            if is_auditor(request.user) and request.user.branch_id and asset.branch_id != request.user.branch_id:
                 return Response({'error': 'Asset not in your branch'}, status=status.HTTP_403_FORBIDDEN)
             audit_session = AuditSession.objects.get(id=audit_session_id)
             audit_session.scanned_assets.add(asset)
@@ -368,115 +460,15 @@ class AuditSessionEndView(APIView):
             audit_session.save()
             scanned_assets = audit_session.scanned_assets.all()
             all_assets = Asset.objects.all()
-            if is_auditor(request.user) and request.user.branch:
-                all_assets = all_assets.filter(branch=request.user.branch)
+            if is_auditor(request.user) and request.user.branch_id:
+                all_assets = all_assets.filter(branch_id=request.user.branch_id)
             not_scanned_assets = all_assets.exclude(id__in=scanned_assets.values_list('id', flat=True))
 
-            buffer = BytesIO()
-            pdf = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-            elements = []
-            stylesheet = getSampleStyleSheet()
-            title_style = stylesheet['Title']
-            heading_style = stylesheet['Heading2']
-            body_style = stylesheet['BodyText']
-            summary_header_style = ParagraphStyle(
-                'SummaryHeader',
-                parent=stylesheet['Heading2'],
-                fontSize=16,
-                leading=20,
-                alignment=1
-            )
-
-            elements.append(Paragraph("Asset Audit Report", title_style))
-            elements.append(Spacer(1, 20))
-            session_data = [
-                [Paragraph(f"<b>Session ID:</b> {audit_session.id}", body_style)],
-                [Paragraph(f"<b>Start Time:</b> {audit_session.start_time.strftime('%Y-%m-%d %H:%M:%S')}", body_style)],
-                [Paragraph(f"<b>End Time:</b> {audit_session.end_time.strftime('%Y-%m-%d %H:%M:%S')}", body_style)]
-            ]
-            session_table = Table(session_data, colWidths=[(letter[0] - 60)])
-            session_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#cce5ff')),
-                ('BOX', (0, 0), (-1, -1), 0.5, colors.blue),
-                ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.blue),
-                ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                ('TOPPADDING', (0, 0), (-1, -1), 4),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-            ]))
-            elements.append(session_table)
-            elements.append(Spacer(1, 20))
-
+            from .reports import audit_report_pdf
             branch_count = scanned_assets.values('branch__name').annotate(count=Count('id'))
             summary_text = ", ".join([f"{item['count']} assets in {item['branch__name']}" for item in branch_count]) or "No scanned assets."
-            elements.append(Paragraph("Summary:", summary_header_style))
-            elements.append(Paragraph(summary_text, body_style))
-            elements.append(Spacer(1, 20))
-
-            elements.append(Paragraph("Scanned Assets", heading_style))
-            elements.append(Spacer(1, 12))
-            scanned_data = [["Description", "Serial Number", "Branch", "Category", "Photo"]]
-            for asset in scanned_assets:
-                photo_obj = Paragraph("No Photo", body_style)
-                if asset.photo:
-                    try:
-                        photo_obj = Image(asset.photo.path, width=50, height=50)
-                    except:
-                        pass
-                scanned_data.append([
-                    asset.description or 'N/A',
-                    asset.asset_serial_number,
-                    asset.branch.name if asset.branch else 'N/A',
-                    asset.category.name if asset.category else 'N/A',
-                    photo_obj
-                ])
-            scanned_table = Table(scanned_data, colWidths=[(letter[0] - 60 - 50) / 4] * 4 + [50])
-            scanned_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#003366')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 11),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#cce5ff')),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#99ccff')),
-            ]))
-            elements.append(scanned_table)
-            elements.append(Spacer(1, 20))
-
-            elements.append(Paragraph("Missing Assets", heading_style))
-            elements.append(Spacer(1, 12))
-            missing_data = [["Serial Number", "Description", "Branch", "Category"]]
-            for asset in not_scanned_assets:
-                missing_data.append([
-                    asset.asset_serial_number,
-                    asset.description or 'N/A',
-                    asset.branch.name if asset.branch else 'N/A',
-                    asset.category.name if asset.category else 'N/A'
-                ])
-            missing_table = Table(missing_data, colWidths=[(letter[0] - 60) / 4] * 4)
-            missing_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#003366')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 11),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#cce5ff')),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#99ccff')),
-            ]))
-            elements.append(missing_table)
-
-            def add_page_number(canvas, doc):
-                canvas.setFont("Helvetica", 9)
-                canvas.drawRightString(letter[0] - 30, 15, f"Page {canvas.getPageNumber()}")
-
-            pdf.build(elements, onFirstPage=add_page_number, onLaterPages=add_page_number)
-            buffer.seek(0)
-            response = HttpResponse(content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="audit_report_{audit_session.id}.pdf"'
-            response.write(buffer.getvalue())
-            buffer.close()
+            buffer = audit_report_pdf(audit_session, summary_text, scanned_assets, not_scanned_assets)
+            response = FileResponse(buffer, as_attachment=True, filename=f"audit_report_{audit_session.id}.pdf", content_type='application/pdf')
             if 'audit_session_id' in request.session:
                 del request.session['audit_session_id']
             return response
@@ -484,15 +476,23 @@ class AuditSessionEndView(APIView):
             return Response({'error': 'Invalid audit session'}, status=status.HTTP_400_BAD_REQUEST)
 
 # Compliance Views
+def with_asset_totals(compliances):
+    # Correlated totals instead of JOIN + GROUP BY, so filters on compliances keep their own index.
+    links = Compliance.assets.through.objects.filter(compliance_id=OuterRef('pk')).values('compliance_id')
+    return compliances.annotate(
+        asset_count=Coalesce(Subquery(links.annotate(count=Count('asset_id')).values('count')), 0),
+        total_value=Subquery(links.annotate(total=Sum('asset__current_value')).values('total')),
+    )
+
 class ComplianceListCreateView(APIView):
     permission_classes = [SuperuserOrAuditorPermission]
 
     def get(self, request):
-        compliances = Compliance.objects.all()
+        compliances = with_asset_totals(Compliance.objects.all())
         category_filter = request.query_params.get('category', '')
         if category_filter:
             compliances = compliances.filter(category=category_filter)
-        serializer = ComplianceSerializer(compliances, many=True)
+        serializer = ComplianceSummarySerializer(compliances, many=True)
         return Response(serializer.data)
 
     def post(self, request):
@@ -523,103 +523,69 @@ class ComplianceDetailView(APIView):
         compliance.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+class ComplianceAssetListView(APIView):
+    permission_classes = [SuperuserOrAuditorPermission]
+
+    def get(self, request, compliance_id):
+        compliance = get_object_or_404(Compliance, id=compliance_id)
+        assets = compliance.assets.select_related('assigned_to').order_by('id')
+        paginator = StandardPagination()
+        page = paginator.paginate_queryset(assets, request, view=self)
+        serializer = AssetSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
 @api_view(['GET'])
 @permission_classes([SuperuserOrAuditorPermission])
 def compliance_timeline(request):
-    compliances = Compliance.objects.filter(next_audit__lte=timezone.now().date() + timezone.timedelta(days=90))
-    serializer = ComplianceSerializer(compliances, many=True)
+    compliances = with_asset_totals(
+        Compliance.objects.filter(next_audit__lte=timezone.now().date() + timezone.timedelta(days=90))
+    ).order_by('next_audit')
+    serializer = ComplianceSummarySerializer(compliances, many=True)
     return Response(serializer.data)
 
 @api_view(['GET'])
 @permission_classes([SuperuserOrAuditorPermission])
+@reads_from_replica
 def compliance_report(request, compliance_id):
+    from .reports import asset_row, compliance_report_pdf
     compliance = get_object_or_404(Compliance, id=compliance_id)
-    buffer = BytesIO()
-    pdf = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-    elements = []
-    stylesheet = getSampleStyleSheet()
-    title_style = stylesheet['Title']
-    heading_style = stylesheet['Heading2']
-    body_style = stylesheet['BodyText']
-
-    elements.append(Paragraph(f"Compliance Report: {compliance.title}", title_style))
-    elements.append(Spacer(1, 20))
-    data = [
-        [Paragraph(f"<b>ID:</b> {compliance.id}", body_style)],
-        [Paragraph(f"<b>Category:</b> {compliance.category}", body_style)],
-        [Paragraph(f"<b>Status:</b> {compliance.status}", body_style)],
-        [Paragraph(f"<b>Score:</b> {compliance.score}", body_style)],
-        [Paragraph(f"<b>Requirements:</b> {compliance.completed}/{compliance.requirements}", body_style)],
-        [Paragraph(f"<b>Last Audit:</b> {compliance.last_audit or 'N/A'}", body_style)],
-        [Paragraph(f"<b>Next Audit:</b> {compliance.next_audit or 'N/A'}", body_style)],
-        [Paragraph(f"<b>Description:</b> {compliance.description or 'N/A'}", body_style)],
-    ]
-    table = Table(data, colWidths=[letter[0] - 60])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#cce5ff')),
-        ('BOX', (0, 0), (-1, -1), 0.5, colors.blue),
-        ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.blue),
-        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-
-    elements.append(Paragraph("Associated Assets", heading_style))
-    elements.append(Spacer(1, 12))
-    asset_data = [["Serial Number", "Description", "Branch", "Category"]]
-    for asset in compliance.assets.all():
-        asset_data.append([
-            asset.asset_serial_number,
-            asset.description or 'N/A',
-            asset.branch.name if asset.branch else 'N/A',
-            asset.category.name if asset.category else 'N/A'
-        ])
-    asset_table = Table(asset_data, colWidths=[(letter[0] - 60) / 4] * 4)
-    asset_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#003366')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#cce5ff')),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#99ccff')),
-    ]))
-    elements.append(asset_table)
-
-    def add_page_number(canvas, doc):
-        canvas.setFont("Helvetica", 9)
-        canvas.drawRightString(letter[0] - 30, 15, f"Page {canvas.getPageNumber()}")
-
-    pdf.build(elements, onFirstPage=add_page_number, onLaterPages=add_page_number)
-    buffer.seek(0)
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="compliance_report_{compliance.id}.pdf"'
-    response.write(buffer.getvalue())
-    buffer.close()
-    return response
+    buffer = compliance_report_pdf(compliance, [asset_row(asset) for asset in compliance.assets.all()])
+    return FileResponse(buffer, as_attachment=True, filename=f"compliance_report_{compliance.id}.pdf", content_type='application/pdf')
 
 # Assignment Views
 class AssignmentCreateView(APIView):
     permission_classes = [IsAdminUser]
 
     def post(self, request):
-        user_id = request.data.get('user_id')
-        asset_ids = request.data.get('asset_ids', [])
-        if not user_id or not asset_ids:
-            return Response({'error': 'User and at least one asset required'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        existing = AssetHistory.objects.filter(user_id=user_id, asset_id__in=asset_ids, unassigned_date__isnull=True)
-        if existing.exists():
-            return Response({'error': 'Some assets already assigned to this user'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        assignments = [AssetHistory(user_id=user_id, asset_id=asset_id) for asset_id in asset_ids]
-        AssetHistory.objects.bulk_create(assignments)
-        for asset_id in asset_ids:
-            asset = Asset.objects.get(id=asset_id)
-            asset.assigned_to_id = user_id
-            asset.save()
+        serializer = AssignmentCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        user_id = serializer.validated_data['user_id']
+        asset_ids = list(dict.fromkeys(serializer.validated_data['asset_ids']))
+
+        with transaction.atomic():
+            if not CustomUser.objects.filter(id=user_id).exists():
+                return Response({'error': 'User not found'}, status=status.HTTP_400_BAD_REQUEST)
+            assets = Asset.objects.select_for_update().filter(id__in=asset_ids)
+            found_ids = list(assets.values_list('id', flat=True))
+            missing = sorted(set(asset_ids) - set(found_ids))
+            if missing:
+                return Response({'error': 'Assets not found', 'asset_ids': missing}, status=status.HTTP_400_BAD_REQUEST)
+
+            open_rows = AssetHistory.objects.filter(asset_id__in=asset_ids, unassigned_date__isnull=True)
+            if open_rows.filter(user_id=user_id).exists():
+                return Response({'error': 'Some assets already assigned to this user'}, status=status.HTTP_400_BAD_REQUEST)
+
+            # An asset has one holder at a time: close the previous holders' assignments.
+            closed_ids = list(open_rows.values_list('id', flat=True))
+            open_rows.update(unassigned_date=timezone.now())
+            record_rows(AssetHistory, closed_ids)
+            assignments = [AssetHistory(user_id=user_id, asset_id=asset_id) for asset_id in asset_ids]
+            AssetHistory.objects.bulk_create(assignments)
+            # Set-based update: skips Asset.save() and its QR regeneration.
+            assets.update(**versioned(assigned_to_id=user_id))
+            record_instances(assignments, 'created')
+            record_rows(Asset, found_ids)
         return Response({'message': f'Assigned {len(asset_ids)} assets'}, status=status.HTTP_201_CREATED)
 
 class AssignmentDeleteView(APIView):
@@ -627,63 +593,186 @@ class AssignmentDeleteView(APIView):
 
     def delete(self, request, assignment_id):
         try:
-            assignment = AssetHistory.objects.get(id=assignment_id)
-            assignment.unassigned_date = timezone.now()
-            assignment.asset.assigned_to = None
-            assignment.asset.save()
-            assignment.save()
+            with transaction.atomic():
+                assignment = AssetHistory.objects.select_for_update().get(id=assignment_id)
+                assignment.unassigned_date = timezone.now()
+                assignment.save(update_fields=['unassigned_date'])
+                if Asset.objects.filter(id=assignment.asset_id, assigned_to_id=assignment.user_id).update(**versioned(assigned_to=None)):
+                    record_rows(Asset, [assignment.asset_id])
             return Response(status=status.HTTP_204_NO_CONTENT)
         except AssetHistory.DoesNotExist:
             return Response({'error': 'Assignment not found'}, status=status.HTTP_404_NOT_FOUND)
 
+class AssignmentBulkView(APIView):
+    permission_classes = [IsAdminUser]
+    SELECTOR_FILTERS = {
+        'asset_ids': 'id__in',
+        'user_id': 'assigned_to_id',
+        'branch_id': 'branch_id',
+        'category_id': 'category_id',
+    }
+
+    def post(self, request):
+        serializer = BulkAssignmentSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        action = data['action']
+        filters = {lookup: data[key] for key, lookup in self.SELECTOR_FILTERS.items() if key in data}
+        now = timezone.now()
+
+        with transaction.atomic():
+            assets = Asset.objects.filter(**filters)
+            if action == 'reassign':
+                assets = assets.exclude(assigned_to=data['to_user'])
+            rows = list(assets.select_for_update().values_list('id', 'branch_id'))
+            asset_ids = [asset_id for asset_id, _ in rows]
+            summary = {'action': action, 'matched': len(rows), 'closed': 0, 'opened': 0, 'updated': 0}
+
+            if action in ('unassign', 'reassign'):
+                closing = AssetHistory.objects.filter(asset__in=assets, unassigned_date__isnull=True)
+                closed_ids = list(closing.values_list('id', flat=True))
+                summary['closed'] = closing.update(unassigned_date=now)
+                record_rows(AssetHistory, closed_ids)
+            if action == 'reassign':
+                opened = AssetHistory.objects.bulk_create(
+                    [AssetHistory(asset_id=asset_id, user=data['to_user']) for asset_id in asset_ids],
+                    batch_size=1000
+                )
+                summary['opened'] = len(opened)
+                record_instances(opened, 'created')
+                summary['updated'] = assets.update(**versioned(assigned_to=data['to_user']))
+            elif action == 'unassign':
+                summary['updated'] = assets.update(**versioned(assigned_to=None))
+            else:
+                changes = versioned(branch=data['to_branch'])
+                summary['updated'] = assets.update(**changes)
+                AssetTombstone.objects.bulk_create([
+                    AssetTombstone(
+                        asset_id=asset_id, branch_id=branch_id, version=changes['version'],
+                        reason=AssetTombstone.TRANSFERRED
+                    )
+                    for asset_id, branch_id in rows if branch_id != data['to_branch'].id
+                ], batch_size=1000)
+            record_rows(Asset, asset_ids)
+
+            branch_ids = {branch_id for _, branch_id in rows}
+            if action == 'transfer':
+                branch_ids.add(data['to_branch'].id)
+            transaction.on_commit(lambda: assets_bulk_changed.send(sender=Asset, branch_ids=branch_ids))
+        return Response(summary)
+
+EMPLOYEE_ORDERING_FIELDS = ['username', 'department', 'asset_count', 'total_value', 'oldest_assignment']
+
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def employees_with_assets(request):
-    users = CustomUser.objects.filter(assigned_assets__isnull=False).distinct()
-    serializer = UserSerializer(users, many=True)
-    return Response(serializer.data)
+    oldest_assignment = AssetHistory.objects.filter(
+        user=OuterRef('pk'), unassigned_date__isnull=True
+    ).order_by('assigned_date').values('assigned_date')[:1]
+    users = CustomUser.objects.filter(assigned_assets__isnull=False).annotate(
+        asset_count=Count('assigned_assets'),
+        total_value=Sum('assigned_assets__current_value'),
+        oldest_assignment=Subquery(oldest_assignment),
+    )
+
+    branch_filter = request.query_params.get('branch', '')
+    department_filter = request.query_params.get('department', '')
+    if branch_filter:
+        users = users.filter(branch__id=branch_filter)
+    if department_filter:
+        users = users.filter(department=department_filter)
+
+    ordering = request.query_params.get('ordering', 'username')
+    if ordering.lstrip('-') not in EMPLOYEE_ORDERING_FIELDS:
+        return Response({'error': f"ordering must be one of: {', '.join(EMPLOYEE_ORDERING_FIELDS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    users = users.order_by(ordering, 'id')
+
+    paginator = StandardPagination()
+    page = paginator.paginate_queryset(users, request)
+    serializer = EmployeeAssetSummarySerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def assignment_agreement(request, assignment_id):
+    from .reports import assignment_agreement_pdf
     assignment = get_object_or_404(AssetHistory, id=assignment_id)
-    buffer = BytesIO()
-    pdf = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-    elements = []
-    stylesheet = getSampleStyleSheet()
-    title_style = stylesheet['Title']
-    body_style = stylesheet['BodyText']
-
-    elements.append(Paragraph("Asset Assignment Agreement", title_style))
-    elements.append(Spacer(1, 20))
-    data = [
-        [Paragraph(f"<b>User:</b> {assignment.user.username}", body_style)],
-        [Paragraph(f"<b>Asset:</b> {assignment.asset.asset_serial_number}", body_style)],
-        [Paragraph(f"<b>Assigned Date:</b> {assignment.assigned_date.strftime('%Y-%m-%d %H:%M:%S')}", body_style)],
-        [Paragraph(f"<b>Branch:</b> {assignment.asset.branch.name if assignment.asset.branch else 'N/A'}", body_style)],
-        [Paragraph(f"<b>Category:</b> {assignment.asset.category.name if assignment.asset.category else 'N/A'}", body_style)],
-    ]
-    table = Table(data, colWidths=[letter[0] - 60])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#cce5ff')),
-        ('BOX', (0, 0), (-1, -1), 0.5, colors.blue),
-        ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.blue),
-        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-    ]))
-    elements.append(table)
-
-    def add_page_number(canvas, doc):
-        canvas.setFont("Helvetica", 9)
-        canvas.drawRightString(letter[0] - 30, 15, f"Page {canvas.getPageNumber()}")
-
-    pdf.build(elements, onFirstPage=add_page_number, onLaterPages=add_page_number)
-    buffer.seek(0)
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="assignment_agreement_{assignment.id}.pdf"'
-    response.write(buffer.getvalue())
-    buffer.close()
-    return response
+    buffer = assignment_agreement_pdf(assignment)
+    return FileResponse(buffer, as_attachment=True, filename=f"assignment_agreement_{assignment.id}.pdf", content_type='application/pdf')
+
+# Custody Views
+CUSTODY_FIELDS = ['id', 'asset_id', 'user_id', 'assigned_date', 'unassigned_date']
+CUSTODY_RELATED_FIELDS = {
+    'asset_serial_number': F('asset__asset_serial_number'),
+    'username': F('user__username'),
+}
+
+def parse_instant(value):
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date or datetime: {value}")
+        parsed = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+def stream_json_array(rows, batch_size=500):
+    yield '['
+    batch = []
+    first = True
+    for row in rows:
+        batch.append(json.dumps(row, cls=JSONEncoder))
+        if len(batch) >= batch_size:
+            yield ('' if first else ',') + ','.join(batch)
+            first = False
+            batch = []
+    if batch:
+        yield ('' if first else ',') + ','.join(batch)
+    yield ']'
+
+def custody_response(request, **filters):
+    # Rows whose custody overlaps [start, end]; ?at= is the single instant start == end.
+    try:
+        at = parse_instant(request.query_params.get('at'))
+        start = at or parse_instant(request.query_params.get('start'))
+        end = at or parse_instant(request.query_params.get('end'))
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    if start and end and start > end:
+        return Response({'error': 'start must not be after end'}, status=status.HTTP_400_BAD_REQUEST)
+
+    history = AssetHistory.objects.filter(**filters)
+    if at and 'asset_id' in filters:
+        # An asset has one holder at a time: the latest assignment before `at` is the only candidate.
+        latest = history.filter(assigned_date__lte=at).order_by('-assigned_date').values('id')[:1]
+        history = AssetHistory.objects.filter(id__in=Subquery(latest))
+    elif end:
+        history = history.filter(assigned_date__lte=end)
+    if start:
+        history = history.filter(Q(unassigned_date__isnull=True) | Q(unassigned_date__gt=start))
+
+    rows = history.order_by('assigned_date', 'id').values(*CUSTODY_FIELDS, **CUSTODY_RELATED_FIELDS)
+    return StreamingHttpResponse(stream_json_array(rows.iterator(chunk_size=2000)), content_type='application/json')
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def asset_custody(request, asset_id):
+    return custody_response(request, asset_id=asset_id)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def user_custody(request, user_id):
+    return custody_response(request, user_id=user_id)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def branch_custody(request, branch_id):
+    return custody_response(request, asset__branch_id=branch_id)
 
 # Attachment Views
 class AttachmentCreateView(APIView):
@@ -710,21 +799,82 @@ class AttachmentDeleteView(APIView):
 
     def delete(self, request, attachment_id):
         attachment = get_object_or_404(Attachment, id=attachment_id)
-        attachment.file.delete()
+        # The stored bytes are released by the post_delete handler in storage.py.
         attachment.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+class AttachmentDownloadView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, attachment_id):
+        attachment = get_object_or_404(Attachment, id=attachment_id)
+        filename = f"attachment_{attachment.id}.{attachment.file_type}" if attachment.file_type else None
+        return serve_file(request, attachment.file.storage, attachment.file.name, as_attachment=True, filename=filename)
+
+class AttachmentUploadCreateView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = AttachmentUploadSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save(created_by=request.user)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class AttachmentUploadDetailView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, upload_id):
+        upload = get_object_or_404(AttachmentUpload, id=upload_id)
+        return Response(AttachmentUploadSerializer(upload).data)
+
+    def patch(self, request, upload_id):
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return Response({'error': 'Upload-Offset and Content-Length headers required'}, status=status.HTTP_400_BAD_REQUEST)
+        # The row lock serializes parts of the same upload; its offset is the resume point.
+        with transaction.atomic():
+            upload = get_object_or_404(AttachmentUpload.objects.select_for_update(), id=upload_id)
+            try:
+                uploads.write_part(upload, request.stream, offset, length)
+            except uploads.UploadError as exc:
+                AttachmentUpload.objects.filter(id=upload.id).update(offset=upload.offset)
+                return Response({'error': str(exc), 'offset': upload.offset}, status=status.HTTP_409_CONFLICT)
+            AttachmentUpload.objects.filter(id=upload.id).update(offset=upload.offset)
+        return Response(AttachmentUploadSerializer(upload).data)
+
+    def delete(self, request, upload_id):
+        with transaction.atomic():
+            upload = get_object_or_404(AttachmentUpload.objects.select_for_update(), id=upload_id)
+            uploads.discard(upload)
+            upload.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class AttachmentUploadCompleteView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, upload_id):
+        with transaction.atomic():
+            upload = get_object_or_404(AttachmentUpload.objects.select_for_update(), id=upload_id)
+            attachment = Attachment(assignment=upload.assignment)
+            try:
+                checksum = uploads.finish(upload, attachment, request.data.get('checksum'))
+            except uploads.UploadError as exc:
+                return Response({'error': str(exc), 'offset': upload.offset}, status=status.HTTP_409_CONFLICT)
+            attachment.save()
+            upload.delete()
+        data = AttachmentSerializer(attachment).data
+        data['checksum'] = checksum
+        return Response(data, status=status.HTTP_201_CREATED)
+
 # Analytics Views
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@reads_from_replica
 def analytics_lifecycle(request):
-    category = request.query_params.get('category', 'all')
-    assets = Asset.objects.all()
-    if is_branch_user(request.user) and request.user.branch:
-        assets = assets.filter(branch=request.user.branch)
-    if category != 'all':
-        assets = assets.filter(category__name=category)
-
+    assets = scoped_assets(request.user, request.query_params.get('category', 'all'))
     total = assets.count()
     in_use = assets.filter(status='Active').count() / total * 100 if total else 0
     under_maintenance = assets.filter(status='Under Maintenance').count() / total * 100 if total else 0
@@ -741,40 +891,29 @@ def analytics_lifecycle(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@reads_from_replica
 def analytics_asset_status(request):
-    category = request.query_params.get('category', 'all')
-    assets = Asset.objects.all()
-    if is_branch_user(request.user) and request.user.branch:
-        assets = assets.filter(branch=request.user.branch)
-    if category != 'all':
-        assets = assets.filter(category__name=category)
+    return Response(asset_status_counts(scoped_assets(request.user, request.query_params.get('category', 'all'))))
 
+def asset_status_counts(assets):
     status_counts = assets.values('status').annotate(count=Count('id'))
-    return Response([{'status': item['status'], 'count': item['count']} for item in status_counts])
+    return [{'status': item['status'], 'count': item['count']} for item in status_counts]
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@reads_from_replica
 def analytics_ownership_changes(request):
-    category = request.query_params.get('category', 'all')
-    assets = Asset.objects.all()
-    if is_branch_user(request.user) and request.user.branch:
-        assets = assets.filter(branch=request.user.branch)
-    if category != 'all':
-        assets = assets.filter(category__name=category)
+    return Response(ownership_changes(scoped_assets(request.user, request.query_params.get('category', 'all'))))
 
+def ownership_changes(assets):
     changes = AssetHistory.objects.filter(asset__in=assets).values('asset__branch__name').annotate(count=Count('id'))
-    return Response([{'branch': item['asset__branch__name'], 'count': item['count']} for item in changes])
+    return [{'branch': item['asset__branch__name'], 'count': item['count']} for item in changes]
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@reads_from_replica
 def analytics_ownership_period(request):
-    category = request.query_params.get('category', 'all')
-    assets = Asset.objects.all()
-    if is_branch_user(request.user) and request.user.branch:
-        assets = assets.filter(branch=request.user.branch)
-    if category != 'all':
-        assets = assets.filter(category__name=category)
-
+    assets = scoped_assets(request.user, request.query_params.get('category', 'all'))
     periods = AssetHistory.objects.filter(asset__in=assets, unassigned_date__isnull=False).values('asset__branch__name').annotate(
         avg_period=Avg('unassigned_date' - 'assigned_date')
     )
@@ -785,74 +924,74 @@ def analytics_ownership_period(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@reads_from_replica
 def analytics_asset_value_trend(request):
-    assets = Asset.objects.all()
-    if is_branch_user(request.user) and request.user.branch:
-        assets = assets.filter(branch=request.user.branch)
+    return Response(asset_value_trend(scoped_assets(request.user)))
 
+def asset_value_trend(assets):
     data = assets.values('purchase_date').annotate(total_value=Sum('current_value')).order_by('purchase_date')
-    return Response({
+    return {
         'labels': [item['purchase_date'].strftime('%Y-%m') for item in data],
         'datasets': [{'label': 'Asset Value', 'data': [item['total_value'] for item in data]}]
-    })
+    }
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@reads_from_replica
 def analytics_category_distribution(request):
-    assets = Asset.objects.all()
-    if is_branch_user(request.user) and request.user.branch:
-        assets = assets.filter(branch=request.user.branch)
+    return Response(category_distribution(scoped_assets(request.user)))
 
+def category_distribution(assets):
     data = assets.values('category__name').annotate(count=Count('id'))
-    return Response({
+    return {
         'labels': [item['category__name'] for item in data],
         'datasets': [{'label': 'Category Distribution', 'data': [item['count'] for item in data]}]
-    })
+    }
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@reads_from_replica
 def analytics_utilization_rate(request):
-    assets = Asset.objects.all()
-    if is_branch_user(request.user) and request.user.branch:
-        assets = assets.filter(branch=request.user.branch)
+    return Response(utilization_rate(scoped_assets(request.user)))
 
+def utilization_rate(assets):
     data = assets.filter(status='Active').values('branch__name').annotate(count=Count('id'))
-    return Response({
+    return {
         'labels': [item['branch__name'] for item in data],
         'datasets': [{'label': 'Utilization Rate', 'data': [item['count'] for item in data]}]
-    })
+    }
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@reads_from_replica
 def analytics_depreciation(request):
-    assets = Asset.objects.all()
-    if is_branch_user(request.user) and request.user.branch:
-        assets = assets.filter(branch=request.user.branch)
+    return Response(depreciation_summary(scoped_assets(request.user)))
 
+def depreciation_summary(assets):
     data = assets.values('category__name').annotate(
         total_purchase=Sum('purchase_price'),
         total_current=Sum('current_value')
     )
-    return Response({
+    return {
         'labels': [item['category__name'] for item in data],
         'datasets': [
             {'label': 'Purchase Value', 'data': [item['total_purchase'] for item in data]},
             {'label': 'Current Value', 'data': [item['total_current'] for item in data]}
         ]
-    })
+    }
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@reads_from_replica
 def analytics_metrics(request):
-    assets = Asset.objects.all()
-    if is_branch_user(request.user) and request.user.branch:
-        assets = assets.filter(branch=request.user.branch)
+    return Response(asset_metrics(scoped_assets(request.user)))
 
+def asset_metrics(assets):
     total_value = assets.aggregate(total=Sum('current_value'))['total'] or 0
     monthly_depreciation = assets.aggregate(
         total=Sum('purchase_price') - Sum('current_value')
     )['total'] or 0
-    return Response({
+    return {
         'total_asset_value': total_value,
         'monthly_depreciation': monthly_depreciation / 12 if monthly_depreciation else 0,
         'roi': 0,  # Placeholder: requires business logic
@@ -860,20 +999,108 @@ def analytics_metrics(request):
         'asset_lifespan': 0,  # Placeholder
         'efficiency_score': 0,  # Placeholder
         'maintenance_costs': 0  # Placeholder
-    })
+    }
+
+# Media Views
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def media_file(request, path):
+    # Only files referenced by an attachment or by an asset the user may see are served;
+    # partial uploads and anything else under MEDIA_ROOT are not.
+    path = posixpath.normpath(path)
+    if path.startswith(('..', '/', 'partial_uploads/')):
+        return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
+    assets = Asset.objects.filter(Q(photo=path) | Q(qr_code=path))
+    if is_branch_user(request.user) and request.user.branch_id:
+        assets = assets.filter(branch_id=request.user.branch_id)
+    if not (Attachment.objects.filter(file=path).exists() or assets.exists()):
+        return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
+    storage = cas_storage if path.startswith(CAS_PREFIX) else default_storage
+    return serve_file(request, storage, path)
+
+# Request Profiling Views
+class RequestProfileListView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        profiles = RequestProfile.objects.defer('data').order_by('-created_at')
+        path_filter = request.query_params.get('path', '')
+        if path_filter:
+            profiles = profiles.filter(path__startswith=path_filter)
+        paginator = StandardPagination()
+        page = paginator.paginate_queryset(profiles, request, view=self)
+        serializer = RequestProfileSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+class RequestProfileDetailView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id):
+        profile = get_object_or_404(RequestProfile, id=profile_id)
+        extension, content_type = PROFILE_FORMATS[profile.mode]
+        response = HttpResponse(bytes(profile.data), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="profile-{profile.id}.{extension}"'
+        return response
+
+    def delete(self, request, profile_id):
+        profile = get_object_or_404(RequestProfile, id=profile_id)
+        profile.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+# Change outbox
+class OutboxFeedView(APIView):
+    """
+    Outbox events after the ``after`` cursor (an event id), oldest first.
+    Consumers store ``next`` and poll with it. Without ``after`` the feed
+    starts at the oldest retained event; a cursor older than that gets 410
+    and must resynchronise from the API.
+    """
+    permission_classes = [IsAdminUser]
+    page_size = 500
+    max_page_size = 5000
+
+    def get(self, request):
+        pruned = ChangeCounter.objects.filter(name=OUTBOX_PRUNED).values_list('value', flat=True).first() or 0
+        try:
+            after = int(request.query_params.get('after', pruned))
+            limit = min(int(request.query_params.get('limit', self.page_size)), self.max_page_size)
+        except ValueError:
+            return Response({'error': 'Invalid cursor or limit'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'error': 'Invalid cursor or limit'}, status=status.HTTP_400_BAD_REQUEST)
+        if after < pruned:
+            return Response({'error': 'Cursor is older than the outbox retention period'}, status=status.HTTP_410_GONE)
+
+        events = list(OutboxEvent.objects.filter(id__gt=after).order_by('id')[:limit + 1])
+        has_more = len(events) > limit
+        events = events[:limit]
+        return Response({
+            'results': OutboxEventSerializer(events, many=True).data,
+            'next': events[-1].id if events else after,
+            'has_more': has_more,
+        })
 
 # User Profile/Settings Views
 @api_view(['GET', 'PUT'])
 @permission_classes([IsAuthenticated])
 def profile_view(request):
+    # request.user only carries token claims, so load the full row here.
+    user = CustomUser.objects.get(pk=request.user.pk)
     if request.method == 'GET':
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(user)
         return Response(serializer.data)
     else:
-        serializer = UserSerializer(request.user, data=request.data, partial=True)
+        token_version = user.token_version
+        serializer = UserSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            return Response(serializer.data)
+            data = serializer.data
+            if user.token_version != token_version:
+                # Changing a claim revoked the caller's tokens (see authentication.py); hand out fresh ones.
+                refresh = issue_tokens(user)
+                data['refresh'] = str(refresh)
+                data['access'] = str(refresh.access_token)
+            return Response(data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET'])
@@ -881,9 +1108,53 @@ def profile_view(request):
 def settings_view(request):
     return Response({
         'user_type': request.user.user_type,
-        'branch': BranchSerializer(request.user.branch).data if request.user.branch else None
+        'branch': branches.representation(request.user.branch_id, BranchSerializer) if request.user.branch_id else None
     })
 
+# Offline audit snapshots
+@api_view(['GET'])
+@permission_classes([SuperuserOrAuditorPermission])
+def audit_snapshot(request):
+    """
+    The branch's asset catalogue as a gzipped SQLite file (see offline.py).
+    ``?since=<version>`` returns a delta against an earlier snapshot; the
+    full snapshot honours If-None-Match with the branch and category versions
+    in its ETag.
+    """
+    branch_id = request.query_params.get('branch', '')
+    if is_auditor(request.user) and request.user.branch_id:
+        branch_id = request.user.branch_id
+    if not branch_id:
+        return Response({'error': 'Branch required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        branch_id = int(branch_id)
+        since = request.query_params.get('since')
+        since = int(since) if since else None
+    except ValueError:
+        return Response({'error': 'Invalid branch or snapshot version'}, status=status.HTTP_400_BAD_REQUEST)
+    if branches.get(branch_id, include_deleted=True) is None:
+        return Response({'error': 'Branch not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    version = branch_version(branch_id)
+    categories_version = categories.version()
+    etag = snapshot_etag(branch_id, version, categories_version)
+    if since is None:
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+        data = cached_snapshot(branch_id, version, categories_version)
+        filename = f'branch-{branch_id}-v{version}.sqlite3.gz'
+    else:
+        data = build_snapshot(branch_id, version, categories_version, base_version=since)
+        filename = f'branch-{branch_id}-v{since}-v{version}.sqlite3.gz'
+    response = HttpResponse(data, content_type='application/gzip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['ETag'] = etag
+    response['X-Snapshot-Version'] = version
+    response['X-Categories-Version'] = categories_version
+    return response
+
 # Audit Tasks View
 @api_view(['GET'])
 @permission_classes([SuperuserOrAuditorPermission])
@@ -891,7 +1162,7 @@ def audit_tasks_view(request):
     assets = Asset.objects.filter(
         next_audit_date__lte=timezone.now().date() + timezone.timedelta(days=30)
     )
-    if is_auditor(request.user) and request.user.branch:
-        assets = assets.filter(branch=request.user.branch)
-    serializer = AssetSerializer(assets, many=True)
+    if is_auditor(request.user) and request.user.branch_id:
+        assets = assets.filter(branch_id=request.user.branch_id)
+    serializer = AssetRowSerializer(AssetRowSerializer.rows(assets), many=True)
     return Response(serializer.data)
\ No newline at end of file
@@ -10,22 +10,34 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Deployment profile: 'development' (default) or 'production'.
+DJANGO_ENV = os.environ.get('DJANGO_ENV', 'development')
+PRODUCTION = DJANGO_ENV == 'production'
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-z#e#8v(5mi682kkt=781l%7-l&d_mh2$0o0xyv&d6#ep4uy!&w'
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    if PRODUCTION:
+        raise ImproperlyConfigured('DJANGO_SECRET_KEY must be set when DJANGO_ENV is production')
+    SECRET_KEY = 'django-insecure-z#e#8v(5mi682kkt=781l%7-l&d_mh2$0o0xyv&d6#ep4uy!&w'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# DEBUG also keeps every executed query in memory (connection.queries).
+DEBUG = os.environ.get('DJANGO_DEBUG', '0' if PRODUCTION else '1') == '1'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
 
 
 # Application definition
@@ -45,6 +57,8 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'assetManagementSystem.middleware.ServerTimingMiddleware',
+    'assetManagementSystem.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,17 +67,43 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'assetManagementSystem.middleware.ReplicaStickinessMiddleware',
 ]
 
+# Server-Timing header on every response (db, serialize, render, total) and a
+# structured log line for requests slower than SLOW_REQUEST_MS.
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', '1') == '1'
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', '500'))
+
+# Request profiling (off by default): profile this fraction of requests, plus
+# staff requests sending the trigger header. Profiles are listed and downloaded
+# at profiles/ (admin only). PROFILING_MODE is 'cprofile' or 'sample'.
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_MODE = os.environ.get('PROFILING_MODE', 'cprofile')
+PROFILING_SAMPLE_INTERVAL = 0.005
+PROFILING_TRIGGER_HEADER = 'X-Profile'
+PROFILING_MAX_PROFILES = 500
+
+# Outbox events (outbox/) older than OUTBOX_RETENTION_DAYS are removed by
+# manage.py prune_outbox; row events older than OUTBOX_COMPACT_AFTER_HOURS are
+# dropped once a later event for the same record exists.
+OUTBOX_RETENTION_DAYS = int(os.environ.get('OUTBOX_RETENTION_DAYS', '7'))
+OUTBOX_COMPACT_AFTER_HOURS = int(os.environ.get('OUTBOX_COMPACT_AFTER_HOURS', '24'))
+
 ROOT_URLCONF = 'proj.urls'
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',
 ]
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'assetManagementSystem.authentication.ClaimsJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'assetManagementSystem.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 }
+AUTH_USER_MODEL = 'assetManagementSystem.CustomUser'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -85,12 +125,91 @@ WSGI_APPLICATION = 'proj.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE selects 'sqlite' (default) or 'postgresql'. The production profile
+# runs SQLite in WAL mode, so readers never block the writer, with a busy
+# timeout instead of immediate "database is locked" errors and persistent
+# connections. PostgreSQL uses psycopg's connection pool.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'asset_management'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+                    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+                    'timeout': 10,
+                },
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+    if PRODUCTION:
+        DATABASES['default'].update({
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Seconds to wait for the write lock (sqlite3 busy timeout).
+                'timeout': 20,
+                # Take the write lock at BEGIN so transactions never fail on lock upgrade.
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA temp_store=MEMORY;'
+                    'PRAGMA cache_size=-65536;'
+                    'PRAGMA mmap_size=268435456;'
+                ),
+            },
+        })
+
+# Read replica for analytics, exports and reports. Set DB_REPLICA_HOST (PostgreSQL)
+# or DB_REPLICA_NAME (SQLite; a copy of the primary file works for local testing).
+DATABASE_REPLICA_ALIAS = 'replica'
+# How long a user's replica-routed reads stay on the primary after they write.
+DATABASE_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', '10'))
+if DB_ENGINE == 'postgresql' and os.environ.get('DB_REPLICA_HOST'):
+    DATABASES[DATABASE_REPLICA_ALIAS] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+elif DB_ENGINE != 'postgresql' and os.environ.get('DB_REPLICA_NAME'):
+    DATABASES[DATABASE_REPLICA_ALIAS] = {
+        **DATABASES['default'],
+        'NAME': os.environ['DB_REPLICA_NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['assetManagementSystem.routers.ReplicaRouter']
+
+
+# Cache
+# Token revocations, the Branch/Category registries and replica pinning keep
+# their state in the Django cache. The default LocMem cache is per process: with
+# several workers, a revocation or a Branch/Category change made in one worker
+# reaches the others only when their cached copy expires (up to 60 seconds), and
+# a replica pin only holds in the worker that set it. Set REDIS_URL to share one
+# cache between workers.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
     }
-}
 
 
 # Password validation
@@ -131,6 +250,12 @@ STATIC_URL = '/static/'
 STATIC_ROOT = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = 'media/'
+# Chunked attachment uploads are assembled here; keep it on the same filesystem
+# as MEDIA_ROOT so finished files are moved into place rather than copied.
+CHUNKED_UPLOAD_ROOT = MEDIA_ROOT + 'partial_uploads/'
+# Set to an nginx internal location (e.g. '/protected-media/') to let the proxy
+# send media bytes itself via X-Accel-Redirect.
+MEDIA_ACCEL_REDIRECT_PREFIX = None
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field